@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Throughput (Hamiltonians per second) of dense diagonalization of many small
+random-field Ising chains: one np.linalg.eigh per point, as in the default
+process_runs loop, versus one stacked eigh per batch (diagonalize_batch).
+
+    python benchmarks/bench_batched_eigh.py --N 4 6 8 --points 512 --batch 64
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import io
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils.helper import diagonalize_point, diagonalize_batch
+
+def random_points(N: int, count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [{"N": N, "JZZ": np.eye(N, k=1), "hX": rng.uniform(0.5, 1.5, N),
+             "hZ": rng.uniform(-0.1, 0.1, N)} for _ in range(count)]
+
+def loop(points: list):
+    for params in points:
+        diagonalize_point(params, dense_threshold=params["N"])
+
+def batched(points: list, batch: int):
+    for start in range(0, len(points), batch):
+        diagonalize_batch(points[start:start + batch])
+
+def timed(func) -> float:
+    # make_spin_builder reports every term it adds; keep it out of the timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        func()
+        return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--N", type=int, nargs="+", default=[4, 6, 8])
+    ap.add_argument("--points", type=int, default=512)
+    ap.add_argument("--batch", type=int, nargs="+", default=[16, 64, 256])
+    args = ap.parse_args()
+
+    print(f"{'N':>3} {'path':<12} {'H/s':>10} {'speedup':>8}")
+    for N in args.N:
+        points = random_points(N, args.points)
+        t_loop = timed(lambda: loop(points))
+        print(f"{N:>3} {'loop':<12} {len(points) / t_loop:>10.1f} {1.0:>8.2f}")
+        for batch in args.batch:
+            t = timed(lambda: batched(points, batch))
+            print(f"{N:>3} {f'batch={batch}':<12} {len(points) / t:>10.1f} {t_loop / t:>8.2f}")
+
+if __name__ == "__main__":
+    main()
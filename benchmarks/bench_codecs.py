@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Compression ratio and encode/decode throughput of the db.codecs pipelines
+on eigenvectors of a transverse-field Ising chain.
+
+    python benchmarks/bench_codecs.py --N 6 8 10 --codecs zlib f32+zlib sparse:1e-8+zlib
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils.helper import build_spin_hamiltonian
+from db import codecs
+
+DEFAULT_CODECS = ["zlib", "lzma", "f32", "f32+zlib", "sparse:1e-8+zlib", "f32+sparse:1e-6+lzma"]
+
+def tfim_eigvecs(N: int, h: float = 0.5) -> np.ndarray:
+    params = {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+    return np.linalg.eigh(build_spin_hamiltonian(params).toarray())[1]
+
+def best_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--N", type=int, nargs="+", default=[6, 8, 10])
+    ap.add_argument("--codecs", nargs="+", default=DEFAULT_CODECS)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'N':>3} {'codec':<24} {'ratio':>7} {'enc MB/s':>9} {'dec MB/s':>9} {'max err':>9}")
+    for N in args.N:
+        vecs = tfim_eigvecs(N)
+        mb = vecs.nbytes / 2**20
+        for spec in args.codecs:
+            data, info = codecs.encode(vecs, spec)
+            t_enc = best_time(lambda: codecs.encode(vecs, spec), args.repeat)
+            t_dec = best_time(lambda: codecs.decode(data, info, vecs.shape, str(vecs.dtype)), args.repeat)
+            print(f"{N:>3} {spec:<24} {vecs.nbytes / len(data):>7.2f} "
+                  f"{mb / t_enc:>9.1f} {mb / t_dec:>9.1f} {info['max_abs_error']:>9.1e}")
+
+if __name__ == "__main__":
+    main()
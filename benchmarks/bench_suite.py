@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Hamiltonian assembly, diagonalization, database I/O
+and import time.
+
+Every case runs in a fresh process, so that the reported peak RSS belongs
+to that case alone.  Results (best wall time over --repeat, peak RSS, nnz
+and case-specific figures) are written as JSON; --compare prints the time
+ratio against an earlier result file to spot regressions, and with
+--max-ratio the run fails (exit status 1) when a case got slower than
+that.  The startup suite times fresh interpreters importing the packages
+and also fails when a path loads a module it must not (e.g. scipy for a
+read-only database query).
+
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --suites assembly diag --quick --compare old.json
+    python benchmarks/bench_suite.py --suites startup --compare old.json --max-ratio 1.2
+"""
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+import numpy as np
+
+SUITES = ("assembly", "spinboson", "diag", "db", "sweep", "startup")
+
+# import paths timed by the startup suite: statement, modules it must not load
+STARTUP = {
+    "interpreter": ("pass", ()),
+    "package_roots": ("import core, builders, db, utils", ("numpy", "scipy")),
+    "db_query": ("from db import SpectrumDatabase\n"
+                 "db = SpectrumDatabase({path!r}, read_only=True)\n"
+                 "db.get_eigvals(db.get_run_param({{'N': 2}})[0])", ("scipy",)),
+    "core": ("from core import PauliFactory", ()),
+    "helper": ("from utils import process_runs", ()),
+}
+
+
+def couplings(N: int, interaction: str) -> np.ndarray:
+    """Nearest-neighbour chain or all-to-all upper-triangular couplings."""
+    if interaction == "nn":
+        return np.eye(N, k=1)
+    return np.triu(np.ones((N, N)), 1) / N
+
+
+def tfim_params(N: int, interaction: str = "nn", h: float = 0.7) -> dict:
+    # off-diagonal XX couplings, so that the interaction range shows in nnz
+    return {"N": N, "JXX": couplings(N, interaction), "hZ": h * np.ones(N)}
+
+
+def best_time(func, repeat: int):
+    """Best wall time over `repeat` calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+# ---- cases; each returns a dict of measurements and runs in its own process
+
+def case_assembly(N, interaction, backend, repeat):
+    from utils.helper import build_spin_hamiltonian
+    params = tfim_params(N, interaction)
+    t, H = best_time(lambda: build_spin_hamiltonian(params, backend=backend), repeat)
+    return {"time_s": t, "nnz": int(H.nnz), "dim": H.shape[0]}
+
+
+def case_pauli_factory(N, repeat):
+    from core.spin import PauliFactory
+
+    def run():
+        factory = PauliFactory(N)
+        return sum(factory.get(axis, i).nnz for axis in "XYZ" for i in range(N))
+    t, nnz = best_time(run, repeat)
+    return {"time_s": t, "nnz": int(nnz)}
+
+
+def case_spinboson(N, n_max, repeat):
+    from core.spin import PauliFactory
+    from core.boson import BosonMode
+    from builders.hambuilder import SpinBosonModelBuilder
+
+    def run():
+        builder = SpinBosonModelBuilder(PauliFactory(N), BosonMode(n_max))
+        builder.add_spin_field("Z", np.ones(N)).add_boson_term("n", 1.0)
+        builder.add_spin_boson("a", "X", 0.2).add_spin_boson("adag", "X", 0.2)
+        return builder.build()
+    t, H = best_time(run, repeat)
+    return {"time_s": t, "nnz": int(H.nnz), "dim": H.shape[0]}
+
+
+def case_dense(N, repeat):
+    from utils.helper import build_spin_hamiltonian
+    H = build_spin_hamiltonian(tfim_params(N)).toarray()
+    t, _ = best_time(lambda: np.linalg.eigh(H), repeat)
+    return {"time_s": t, "dim": H.shape[0]}
+
+
+def case_sparse(N, k, matrix_free, repeat):
+    from utils.helper import build_spin_hamiltonian
+    from utils.solvers import solve_sparse
+    H = build_spin_hamiltonian(tfim_params(N), matrix_free=matrix_free)
+    t, (_, _, stats) = best_time(lambda: solve_sparse(H, k), repeat)
+    out = {"time_s": t, "dim": H.shape[0], "matvecs": stats["matvecs"]}
+    if not matrix_free:
+        out["nnz"] = int(H.nnz)
+    return out
+
+
+def case_db(rows, dim, nev, repeat):
+    from db.database import SpectrumDatabase
+    rng = np.random.default_rng(0)
+    eigvals = np.sort(rng.standard_normal(nev))
+    eigvecs = rng.standard_normal((dim, nev))
+    params_list = [{"N": 0, "h": float(i)} for i in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+
+        def insert():
+            if os.path.exists(path):
+                os.remove(path)
+            db = SpectrumDatabase(path)
+            with db.batch(100):
+                for params in params_list:
+                    db.add_run(eigvals, eigvecs, params)
+            return db
+        t_insert, db = best_time(insert, repeat)
+
+        def query():
+            for params in params_list:
+                db.get_eigvals(db.get_run_param(params)[0])
+        t_query, _ = best_time(query, repeat)
+        size = os.path.getsize(path)
+    return {"time_s": t_insert, "insert_rows_per_s": rows / t_insert,
+            "query_time_s": t_query, "query_rows_per_s": rows / t_query,
+            "blob_bytes": eigvecs.nbytes, "file_bytes": size}
+
+
+def case_sweep(N, points, repeat):
+    from utils.helper import process_runs
+    params_list = [tfim_params(N, h=h) for h in np.linspace(0.1, 2.0, points)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sweep.db")
+
+        def run():
+            if os.path.exists(path):
+                os.remove(path)
+            process_runs(params_list, path, resume=False)
+        t, _ = best_time(run, repeat)
+    return {"time_s": t, "points_per_s": points / t}
+
+
+def case_startup(target, repeat):
+    from db.database import SpectrumDatabase
+    statement, forbidden = STARTUP[target]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        SpectrumDatabase(path).add_run(np.zeros(4), None, {"N": 2})
+        code = (statement.format(path=path) + "\nimport sys\n"
+                f"print(' '.join(m for m in {forbidden!r} if m in sys.modules))")
+        env = dict(os.environ, PYTHONPATH=SRC)
+
+        def run():
+            return subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                                  capture_output=True, text=True).stdout.split()
+        t, loaded = best_time(run, repeat)
+    return {"time_s": t, "loaded_forbidden": loaded}
+
+
+CASES = {
+    "assembly": case_assembly,
+    "pauli_factory": case_pauli_factory,
+    "spinboson": case_spinboson,
+    "dense": case_dense,
+    "sparse": case_sparse,
+    "db": case_db,
+    "sweep": case_sweep,
+    "startup": case_startup,
+}
+
+
+def _run_case(name, kwargs):
+    # the builders report every term they add; keep that out of the output
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = CASES[name](**kwargs)
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_bytes"] = rss if sys.platform == "darwin" else rss * 1024
+    return result
+
+
+def plan(suites, quick: bool, repeat: int) -> list:
+    """(suite, case name, kwargs) for every case of the selected suites."""
+    Ns = [8, 10, 12] if quick else [8, 10, 12, 14, 16]
+    cases = []
+    if "assembly" in suites:
+        for N in Ns:
+            cases.append(("assembly", "pauli_factory", dict(N=N, repeat=repeat)))
+            for interaction in ("nn", "all"):
+                for backend in ("bitops", "kron", "cached"):
+                    cases.append(("assembly", "assembly",
+                                  dict(N=N, interaction=interaction, backend=backend,
+                                       repeat=repeat)))
+    if "spinboson" in suites:
+        for N in Ns[:3]:
+            for n_max in (4, 16):
+                cases.append(("spinboson", "spinboson", dict(N=N, n_max=n_max, repeat=repeat)))
+    if "diag" in suites:
+        for N in ([6, 8, 10] if quick else [6, 8, 10, 12]):
+            cases.append(("diag", "dense", dict(N=N, repeat=repeat)))
+        for N in Ns:
+            for matrix_free in (False, True):
+                cases.append(("diag", "sparse", dict(N=N, k=6, matrix_free=matrix_free,
+                                                     repeat=repeat)))
+    if "db" in suites:
+        for rows in ([100, 1000] if quick else [100, 1000, 10000]):
+            for dim in (64, 1024):
+                cases.append(("db", "db", dict(rows=rows, dim=dim, nev=8, repeat=repeat)))
+    if "sweep" in suites:
+        cases.append(("sweep", "sweep", dict(N=8, points=50 if quick else 200, repeat=repeat)))
+    if "startup" in suites:
+        # interpreter start-up is noisy, so take the best of more runs
+        for target in STARTUP:
+            cases.append(("startup", "startup", dict(target=target, repeat=max(repeat, 5))))
+    return cases
+
+
+def case_key(rec: dict) -> str:
+    return rec["case"] + ":" + json.dumps(rec["params"], sort_keys=True)
+
+
+def environment() -> dict:
+    import scipy
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "scipy": scipy.__version__, "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    ap.add_argument("--quick", action="store_true", help="smaller sizes, for a fast check")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--output", default="bench_results.json")
+    ap.add_argument("--compare", help="earlier result file to compare times against")
+    ap.add_argument("--max-ratio", type=float,
+                    help="fail if a case is slower than this factor times its --compare time")
+    args = ap.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {case_key(r): r for r in json.load(f)["results"]}
+
+    results = []
+    failures = []
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'suite':<10} {'case':<14} {'params':<52} {'time [s]':>10} {'RSS [MB]':>9} {'nnz':>10}"
+          + ("   vs old" if baseline else ""))
+    for suite, name, kwargs in plan(args.suites, args.quick, args.repeat):
+        # a fresh process per case, so peak RSS is not inherited from earlier cases
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            measured = pool.submit(_run_case, name, kwargs).result()
+        params = {k: v for k, v in kwargs.items() if k != "repeat"}
+        rec = {"suite": suite, "case": name, "params": params, **measured}
+        results.append(rec)
+
+        line = (f"{suite:<10} {name:<14} {json.dumps(params)[:52]:<52} {rec['time_s']:>10.4f} "
+                f"{rec['peak_rss_bytes'] / 2**20:>9.1f} {rec.get('nnz', ''):>10}")
+        old = baseline.get(case_key(rec))
+        if old is not None:
+            ratio = rec["time_s"] / old["time_s"]
+            line += f"   {ratio:>6.2f}x"
+            if args.max_ratio is not None and ratio > args.max_ratio:
+                failures.append(f"{name} {json.dumps(params)}: {ratio:.2f}x slower")
+        if rec.get("loaded_forbidden"):
+            failures.append(f"{name} {json.dumps(params)}: imports {rec['loaded_forbidden']}")
+        print(line, flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=1)
+    print(f"Wrote {len(results)} results to {args.output}")
+    if failures:
+        print("Regressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
-#from .hambuilder import SpinModelBuilder, SpinBosonModelBuilder
+from core._lazy import lazy_exports
 
 __all__ = [
     "SpinModelBuilder",
     "SpinBosonModelBuilder",
-]
\ No newline at end of file
+]
+
+# submodules and exports are imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "SpinModelBuilder": "hambuilder",
+    "SpinBosonModelBuilder": "hambuilder",
+}, ("hambuilder",))
@@ -1,17 +1,94 @@
 import numpy as np
 import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator
 from core.spin import PauliFactory, SingleSiteTerm, TwoSiteTerm
-from core.boson import BosonMode, BosonTerm
-from core.spinboson import SpinBosonCouplingTerm
-from core.termbuilder import TermBuilderBase
+from core.boson import BosonTerm, as_modes, boson_dim, embed_mode
+from core.spinboson import SpinBosonCouplingTerm, site_couplings
+from core.excitation import assemble_excitation_hamiltonian, excitation_basis
+from core.termbuilder import TermBuilderBase, apply_delta, sum_terms
+from core.bitops import assemble_spin_hamiltonian, spin_linear_operator
+from core.opbasis import default_cache, term_signature
+from core.symmetry import Sector, assemble_sector_hamiltonian, detect_symmetries, enumerate_sectors
+
+BACKENDS = ("bitops", "kron", "cached")
+
+
+def _build_spin_part(factory: PauliFactory,
+                     onesite: TermBuilderBase,
+                     twosite: TermBuilderBase,
+                     backend: str) -> sp.csr_matrix:
+    """
+    Spin-only Hamiltonian from the one-site and two-site descriptors.
+
+    backend "bitops" assembles everything in one pass from the basis
+    integers; "kron" sums the TermClass matrices built from PauliFactory;
+    "cached" combines unit operators kept in core.opbasis.default_cache,
+    so points that only differ in coupling strengths share one basis.
+    """
+    if backend == "cached":
+        return default_cache.assemble(factory.N, onesite._descr, twosite._descr)
+    if backend == "bitops":
+        return assemble_spin_hamiltonian(factory.N,
+                                         onesite._descr,
+                                         twosite._descr)
+    return (onesite.build() + twosite.build()).tocsr()
+
+
+def _spin_delta(factory: PauliFactory,
+                onesite: TermBuilderBase,
+                twosite: TermBuilderBase,
+                one_changes: list,
+                two_changes: list,
+                backend: str) -> sp.csr_matrix:
+    """
+    Change of the spin-only Hamiltonian caused by signed descriptor changes
+    (see TermBuilderBase.changes); a removed term enters with sign -1.
+    """
+    if backend == "bitops":
+        fields = [(axis, sign * np.asarray(h)) for sign, (axis, h) in one_changes]
+        couplings = [(ops, sign * np.asarray(J)) for sign, (ops, J) in two_changes]
+        return assemble_spin_hamiltonian(factory.N, fields, couplings)
+    return sum_terms(onesite.shape,
+                     [(sign, onesite.term_matrix(d)) for sign, d in one_changes]
+                     + [(sign, twosite.term_matrix(d)) for sign, d in two_changes])
+
+
+def _pending_changes(builders: dict, cursors: dict):
+    """
+    Changes of every sub-builder since `cursors`, and their new versions.
+    The changes are None if any sub-builder needs a full rebuild.
+    """
+    pending, versions = {}, {}
+    for name, builder in builders.items():
+        changes, versions[name] = builder.changes(cursors.get(name, 0))
+        if changes is None:
+            return None, versions
+        pending[name] = changes
+    return pending, versions
+
+
+def _spin_operator(factory: PauliFactory,
+                   onesite: TermBuilderBase,
+                   twosite: TermBuilderBase) -> LinearOperator:
+    """Matrix-free spin-only Hamiltonian from the one-site and two-site descriptors."""
+    return spin_linear_operator(factory.N, onesite._descr, twosite._descr)
 
 class SpinBosonModelBuilder:
     """
     Integrates spin‐only, boson‐only, and spin–boson coupling builders.
+
+    `boson_mode` is a BosonMode or a sequence of them, each with its own
+    truncation; the space is modes ⊗ spins with mode 0 leftmost.  Boson
+    terms and couplings pick their mode with `mode=` (default 0).
     """
     def __init__(self,
                  factory: PauliFactory,
-                 boson_mode: BosonMode):
+                 boson_mode,
+                 backend: str = "bitops"):
+        assert backend in BACKENDS, f"backend must be one of {BACKENDS}"
+        self.backend = backend
+        self.modes = as_modes(boson_mode)
+        d_b = boson_dim(self.modes)
         # Sub‐builders:
         self.onesitespin_builder     = TermBuilderBase(SingleSiteTerm,
                                                (2**factory.N, 2**factory.N),
@@ -20,57 +97,116 @@ class SpinBosonModelBuilder:
                                                (2**factory.N, 2**factory.N),
                                                factory)
         self.boson_builder    = TermBuilderBase(BosonTerm,
-                                               (boson_mode.d_b, boson_mode.d_b),
-                                               boson_mode)
+                                               (d_b, d_b),
+                                               self.modes)
         self.coupling_builder = TermBuilderBase(SpinBosonCouplingTerm,
-                                               (boson_mode.d_b*2**factory.N,
-                                                boson_mode.d_b*2**factory.N),
+                                               (d_b*2**factory.N,
+                                                d_b*2**factory.N),
                                                factory,
-                                               boson_mode)
-        self._dirty    = True
+                                               self.modes)
+        self._cursors  = {}
         self._H_cached = None
 
+    def _builders(self) -> dict:
+        return {"onesite": self.onesitespin_builder, "twosite": self.twositespin_builder,
+                "boson": self.boson_builder, "coupling": self.coupling_builder}
+
     # spin‐only
     def add_spin_field(self, axis: str, h: np.ndarray):
         self.onesitespin_builder.add(axis, h)
-        self._dirty = True
         return self
 
     def add_spin_coupling(self, ops: str, J: np.ndarray):
         self.twositespin_builder.add(ops, J)
-        self._dirty = True
         return self
 
     # boson‐only
-    def add_boson_term(self, key: str, strength: float):
-        self.boson_builder.add(key, strength)
-        self._dirty = True
+    def add_boson_term(self, key: str, strength: float, mode: int = 0):
+        self.boson_builder.add(key, strength, mode)
         return self
 
-    # spin–boson
-    def add_spin_boson(self, bkey: str, s_axis: str, g: float):
-        self.coupling_builder.add(bkey, s_axis, g)
-        self._dirty = True
+    # spin–boson; g is a scalar (uniform) or a length-N array (site-resolved)
+    def add_spin_boson(self, bkey: str, s_axis: str, g, mode: int = 0):
+        self.coupling_builder.add(bkey, s_axis, g, mode)
         return self
 
-    def build(self) -> sp.csr_matrix:
-        if not self._dirty and self._H_cached is not None:
-            return self._H_cached
+    # terms are addressed by their position among the terms of the same kind
+    def update_spin_field(self, index: int, axis: str, h: np.ndarray):
+        self.onesitespin_builder.update(index, axis, h)
+        return self
+
+    def remove_spin_field(self, index: int):
+        self.onesitespin_builder.remove(index)
+        return self
+
+    def update_spin_coupling(self, index: int, ops: str, J: np.ndarray):
+        self.twositespin_builder.update(index, ops, J)
+        return self
+
+    def remove_spin_coupling(self, index: int):
+        self.twositespin_builder.remove(index)
+        return self
+
+    def update_boson_term(self, index: int, key: str, strength: float, mode: int = 0):
+        self.boson_builder.update(index, key, strength, mode)
+        return self
+
+    def remove_boson_term(self, index: int):
+        self.boson_builder.remove(index)
+        return self
+
+    def update_spin_boson(self, index: int, bkey: str, s_axis: str, g, mode: int = 0):
+        self.coupling_builder.update(index, bkey, s_axis, g, mode)
+        return self
+
+    def remove_spin_boson(self, index: int):
+        self.coupling_builder.remove(index)
+        return self
 
-        N = self.onesitespin_builder.args[0].N
+    def build(self) -> sp.csr_matrix:
+        """
+        Full H as CSR.  After the first build only the terms added, updated
+        or removed since the previous build are assembled and added to it.
+        """
+        factory = self.onesitespin_builder.args[0]
+        N = factory.N
         d_s = 2**N
         d_b = self.boson_builder.shape[0]
+        I_b = sp.identity(d_b, format="csr")
+        I_s = sp.identity(d_s, format="csr")
+
+        pending, versions = _pending_changes(self._builders(), self._cursors)
+        if self._H_cached is not None and pending is not None \
+                and not any(pending.values()):
+            return self._H_cached
+        if self._H_cached is not None and pending is not None and self.backend != "cached":
+            delta = sp.csr_matrix(self.coupling_builder.shape)
+            if pending["onesite"] or pending["twosite"]:
+                dH_s = _spin_delta(factory, self.onesitespin_builder, self.twositespin_builder,
+                                   pending["onesite"], pending["twosite"], self.backend)
+                delta = delta + sp.kron(I_b, dH_s, format="csr")
+            if pending["boson"]:
+                dH_b = sum_terms(self.boson_builder.shape,
+                                 [(sign, self.boson_builder.term_matrix(d))
+                                  for sign, d in pending["boson"]])
+                delta = delta + sp.kron(dH_b, I_s, format="csr")
+            if pending["coupling"]:
+                delta = delta + sum_terms(self.coupling_builder.shape,
+                                          [(sign, self.coupling_builder.term_matrix(d))
+                                           for sign, d in pending["coupling"]])
+            self._H_cached = apply_delta(self._H_cached, delta)
+            self._cursors = versions
+            return self._H_cached
 
         # 1) spin‐only part: one‐site + two‐site
-        H_s1 = self.onesitespin_builder.build()
-        H_s2 = self.twositespin_builder.build()
-        H_s = H_s1 + H_s2
-        I_b = sp.identity(d_b, format="csr")
+        H_s = _build_spin_part(factory,
+                               self.onesitespin_builder,
+                               self.twositespin_builder,
+                               self.backend)
         H_spin = sp.kron(I_b, H_s, format="csr")
 
         # 2) boson‐only part
         H_b = self.boson_builder.build()
-        I_s = sp.identity(d_s, format="csr")
         H_boson = sp.kron(H_b, I_s, format="csr")
 
         # 3) coupling part
@@ -79,32 +215,167 @@ class SpinBosonModelBuilder:
         # 4) sum
         H_tot = (H_spin + H_boson + H_coup).tocsr()
         self._H_cached = H_tot
-        self._dirty    = False
+        self._cursors  = versions
         return self._H_cached
 
+    def build_operator(self) -> LinearOperator:
+        """
+        Matrix-free H acting on the d_b·2^N space, never forming a kron product.
+
+        A vector is viewed as V of shape (d_b, 2^N), so that
+
+            (I_b ⊗ H_s) v  →  (H_s V^T)^T
+            (H_b ⊗ I_s) v  →  H_b V
+            (O_b ⊗ S) v    →  O_b (S V^T)^T,      S = Σ_i g_i σ^axis_i
+        """
+        factory = self.onesitespin_builder.args[0]
+        N = factory.N
+        d_s = 2**N
+        d_b = self.boson_builder.shape[0]
+
+        H_s = _spin_operator(factory,
+                             self.onesitespin_builder,
+                             self.twositespin_builder)
+        H_b = self.boson_builder.build()
+
+        # group couplings by spin operator so each Σ_i g_i σ^axis_i is applied once;
+        # a uniform g is folded into the boson operator
+        couplings = {}
+        for bkey, s_axis, g, mode in self.coupling_builder._descr:
+            O_b = embed_mode(self.modes, mode, self.modes[mode].get_boson(bkey))
+            if np.ndim(g) == 0:
+                key, O_b = (s_axis, None), g * O_b
+            else:
+                key = (s_axis, tuple(site_couplings(g, N)))
+            couplings[key] = couplings[key] + O_b if key in couplings else O_b
+        S_ops = {key: spin_linear_operator(
+                     N, [(key[0], np.ones(N) if key[1] is None else np.array(key[1]))], [])
+                 for key in couplings}
+
+        dtypes = [H_s.dtype, H_b.dtype] + [S.dtype for S in S_ops.values()] \
+                 + [O.dtype for O in couplings.values()]
+        dtype = np.result_type(*dtypes)
+
+        def matvec(v):
+            V = np.asarray(v).reshape(d_b, d_s)
+            out = H_s.matmat(V.T).T + H_b @ V
+            for key, O_b in couplings.items():
+                out = out + O_b @ S_ops[key].matmat(V.T).T
+            return out.reshape(np.shape(v))
+
+        return LinearOperator((d_b*d_s, d_b*d_s), matvec=matvec, dtype=dtype)
+
+    def excitation_basis(self, K: int):
+        """Basis (flat indices, occupations, spin states) of the block with excitation number K."""
+        return excitation_basis(self.onesitespin_builder.args[0].N, self.modes, K)
+
+    def build_excitation_block(self, K: int) -> sp.csr_matrix:
+        """
+        Block of H with total excitation number K = Σ_m n_m + (number of up
+        spins), built directly in the basis of excitation_basis(K) without
+        the full product space (see core.excitation).  Raises ValueError if
+        the registered terms do not conserve it.
+        """
+        return assemble_excitation_hamiltonian(self.onesitespin_builder.args[0].N,
+                                               self.modes,
+                                               self.onesitespin_builder._descr,
+                                               self.twositespin_builder._descr,
+                                               self.boson_builder._descr,
+                                               self.coupling_builder._descr,
+                                               K)
+
 
 class SpinModelBuilder:
-    def __init__(self, factory: PauliFactory):
+    def __init__(self, factory: PauliFactory, backend: str = "bitops"):
+        assert backend in BACKENDS, f"backend must be one of {BACKENDS}"
         dim = 2**factory.N
+        self.factory = factory
+        self.backend = backend
         self._onesitespin_builder = TermBuilderBase(SingleSiteTerm, (dim, dim), factory)
         self._twositespin_builder = TermBuilderBase(TwoSiteTerm,    (dim, dim), factory)
-        self._dirty = True
+        self._cursors = {}
         self._H_cached = None
 
     def add_spin_field(self, axis: str, h: np.ndarray):
         self._onesitespin_builder.add(axis, h)
-        self._dirty = True
         return self
 
     def add_spin_coupling(self, ops: str, J: np.ndarray):
         self._twositespin_builder.add(ops, J)
-        self._dirty = True
+        return self
+
+    # terms are addressed by their position among the terms of the same kind
+    def update_spin_field(self, index: int, axis: str, h: np.ndarray):
+        self._onesitespin_builder.update(index, axis, h)
+        return self
+
+    def remove_spin_field(self, index: int):
+        self._onesitespin_builder.remove(index)
+        return self
+
+    def update_spin_coupling(self, index: int, ops: str, J: np.ndarray):
+        self._twositespin_builder.update(index, ops, J)
+        return self
+
+    def remove_spin_coupling(self, index: int):
+        self._twositespin_builder.remove(index)
         return self
 
     def build(self):
-        if not self._dirty and self._H_cached is not None:
+        """
+        H as CSR.  After the first build only the terms added, updated or
+        removed since the previous build are assembled and added to it
+        (the "cached" backend always recombines its operator basis).
+        """
+        pending, versions = _pending_changes({"onesite": self._onesitespin_builder,
+                                              "twosite": self._twositespin_builder},
+                                             self._cursors)
+        if self._H_cached is not None and pending is not None \
+                and not any(pending.values()):
             return self._H_cached
-        H_spin = self._onesitespin_builder.build() + self._twositespin_builder.build()
-        self._H_cached = H_spin.tocsr()
-        self._dirty = False
+        if self._H_cached is not None and pending is not None and self.backend != "cached":
+            delta = _spin_delta(self.factory,
+                                self._onesitespin_builder,
+                                self._twositespin_builder,
+                                pending["onesite"], pending["twosite"],
+                                self.backend)
+            self._H_cached = apply_delta(self._H_cached, delta)
+        else:
+            H_spin = _build_spin_part(self.factory,
+                                      self._onesitespin_builder,
+                                      self._twositespin_builder,
+                                      self.backend)
+            self._H_cached = H_spin.tocsr()
+        self._cursors = versions
         return self._H_cached
+
+    def build_operator(self) -> LinearOperator:
+        """Matrix-free H as a LinearOperator; memory stays O(2^N)."""
+        return _spin_operator(self.factory,
+                              self._onesitespin_builder,
+                              self._twositespin_builder)
+
+    def term_signature(self):
+        """(signature, coeffs) of the registered terms, see core.opbasis.term_signature."""
+        return term_signature(self.factory.N,
+                              self._onesitespin_builder._descr,
+                              self._twositespin_builder._descr)
+
+    def symmetries(self) -> set:
+        """Symmetries ("U1", "Z2", "T") conserved by the registered terms."""
+        return detect_symmetries(self.factory.N,
+                                 self._onesitespin_builder._descr,
+                                 self._twositespin_builder._descr)
+
+    def sectors(self, symmetries=None) -> list:
+        """All symmetry sectors for `symmetries` (detected if None)."""
+        if symmetries is None:
+            symmetries = self.symmetries()
+        return enumerate_sectors(self.factory.N, symmetries)
+
+    def build_sector(self, sector: Sector) -> sp.csr_matrix:
+        """Block of H in `sector`, in the basis core.symmetry.sector_basis(N, sector)."""
+        return assemble_sector_hamiltonian(self.factory.N,
+                                           self._onesitespin_builder._descr,
+                                           self._twositespin_builder._descr,
+                                           sector)
@@ -1,9 +1,15 @@
-#from .spin import PauliFactory, SingleSiteTerm, TwoSiteTerm
-#from .boson import BosonMode, BosonTerm
-#from .spinboson import SpinBosonCouplingTerm  
+from ._lazy import lazy_exports
 
 __all__ = [
     "PauliFactory", "SingleSiteTerm", "TwoSiteTerm",
     "BosonMode", "BosonTerm",
-    "SpinBosonCouplingTerm",               
+    "SpinBosonCouplingTerm",
 ]
+
+# submodules and exports are imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "PauliFactory": "spin", "SingleSiteTerm": "spin", "TwoSiteTerm": "spin",
+    "BosonMode": "boson", "BosonTerm": "boson",
+    "SpinBosonCouplingTerm": "spinboson",
+}, ("bitops", "boson", "excitation", "instrument", "observables", "opbasis",
+    "spin", "spinboson", "symmetry", "termbuilder"))
@@ -0,0 +1,34 @@
+"""
+Lazily resolved package attributes (PEP 562).
+
+A package built with lazy_exports imports nothing when it is itself
+imported: `from core import PauliFactory` loads core.spin (and scipy) on
+first use only, so e.g. `from db import SpectrumDatabase` stays free of
+the numerical stack.
+"""
+import sys
+import importlib
+
+
+def lazy_exports(package: str, exports: dict, submodules=()):
+    """
+    Module-level __getattr__ and __dir__ for `package`, resolving
+    `exports` ({name: submodule}) and the `submodules` on first access.
+    A resolved export is stored on the package, so later lookups are
+    ordinary attribute reads.
+    """
+    submodules = frozenset(submodules)
+
+    def __getattr__(name):
+        if name in exports:
+            value = getattr(importlib.import_module(f"{package}.{exports[name]}"), name)
+            setattr(sys.modules[package], name, value)
+            return value
+        if name in submodules:
+            return importlib.import_module(f"{package}.{name}")
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports) | submodules)
+
+    return __getattr__, __dir__
@@ -0,0 +1,211 @@
+"""
+Bit-level action of Pauli strings on the computational basis.
+
+Basis state |s>, s = 0..2^N-1, follows the kron ordering of PauliFactory:
+site 0 is the most significant bit, and bit value 0 is spin up (σ^Z = +1).
+Every operator used by the spin terms maps one basis state to at most one
+other basis state, so a product of single-site operators is fully described
+by a flip mask and an amplitude per source state:
+
+    O |s> = amp(s) |s ^ mask>
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator
+
+SPIN_AXES = ("X", "Y", "Z", "+", "-")
+
+# axes that flip the bit of their site
+FLIP_AXES = {"X", "Y", "+", "-"}
+
+
+def basis_states(N: int) -> np.ndarray:
+    """All basis integers 0..2^N-1, in the narrowest integer type that fits."""
+    return np.arange(2**N, dtype=np.int32 if N < 31 else np.int64)
+
+
+def site_mask(N: int, site: int) -> int:
+    """Integer with only the bit of `site` set."""
+    return 1 << (N - 1 - site)
+
+
+def site_bits(states: np.ndarray, N: int, site: int) -> np.ndarray:
+    """Bit values (0 = up, 1 = down) of `site` for every state in `states`."""
+    return (states >> (N - 1 - site)) & 1
+
+
+def local_amplitude(axis: str, bits: np.ndarray) -> np.ndarray:
+    """
+    Amplitude <s'|σ^axis|s> for a single site, as a function of its bit.
+
+        X : 1            Z : 1 - 2b
+        Y : i(1 - 2b)    + : b        - : 1 - b
+    """
+    if axis == "X":
+        return np.ones(bits.shape, dtype=np.float64)
+    if axis == "Y":
+        return 1j * (1 - 2 * bits).astype(np.float64)
+    if axis == "Z":
+        return (1 - 2 * bits).astype(np.float64)
+    if axis == "+":
+        return bits.astype(np.float64)
+    if axis == "-":
+        return (1 - bits).astype(np.float64)
+    raise AssertionError("axis must be 'X','Y','Z','+', or '-'")
+
+
+def string_action(N: int,
+                  ops: str,
+                  sites: tuple,
+                  states: np.ndarray):
+    """
+    Action of the product Π_k σ^{ops[k]}_{sites[k]} (distinct sites) on `states`.
+
+    Returns
+    -------
+    mask : int
+        XOR mask applied to every source state.
+    amp : np.ndarray
+        Amplitude for every source state (zero where the string annihilates it).
+    """
+    mask = 0
+    amp = None
+    for axis, site in zip(ops, sites):
+        if axis in FLIP_AXES:
+            mask |= site_mask(N, site)
+        a = local_amplitude(axis, site_bits(states, N, site))
+        amp = a if amp is None else amp * a
+    return mask, amp
+
+
+def is_complex(axes) -> bool:
+    """True if any operator in `axes` has complex matrix elements."""
+    return any("Y" in a for a in axes)
+
+
+def spin_dtype(fields, couplings) -> np.dtype:
+    """
+    dtype of a Hamiltonian with these descriptors: complex if an operator
+    (Y) or any coefficient is complex, float64 otherwise.
+    """
+    axes = [a for a, _ in fields] + [o for o, _ in couplings]
+    coeffs = [np.asarray(c).dtype for _, c in fields] + [np.asarray(c).dtype for _, c in couplings]
+    return np.result_type(np.complex128 if is_complex(axes) else np.float64, *coeffs)
+
+
+def iter_spin_strings(N: int, fields, couplings):
+    """
+    Flatten field and coupling descriptors into (coeff, ops, sites) triples.
+
+    fields    : iterable of (axis, h)   with h of length N
+    couplings : iterable of (ops, J)    with J of shape (N, N); only the
+                upper triangle i<j is used, ops[0] acts on i and ops[1] on j.
+    """
+    for axis, h in fields:
+        for i in np.flatnonzero(h):
+            yield h[i], axis, (int(i),)
+    for ops, J in couplings:
+        rows, cols = np.nonzero(np.triu(J, k=1))
+        for i, j in zip(rows, cols):
+            yield J[i, j], ops, (int(i), int(j))
+
+
+def assemble_spin_hamiltonian(N: int, fields, couplings) -> sp.csr_matrix:
+    """
+    Build Σ h_i σ^a_i + Σ_{i<j} J_ij σ^a_i σ^b_j in one pass over the basis.
+
+    Diagonal strings (Z only) are accumulated into a single vector; every
+    flipping string contributes one COO block (rows = s ^ mask, cols = s).
+    All blocks are concatenated and converted once to CSR, which sums
+    duplicate entries.
+
+    Parameters
+    ----------
+    N : int
+        Number of spin-½ sites.
+    fields : iterable of (axis, h)
+    couplings : iterable of (ops, J)
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix of shape (2^N, 2^N)
+    """
+    fields    = list(fields)
+    couplings = list(couplings)
+    dim = 2**N
+    dtype = spin_dtype(fields, couplings)
+
+    states = basis_states(N)
+    diag = np.zeros(dim, dtype=dtype)
+    rows, cols, data = [], [], []
+
+    for coeff, ops, sites in iter_spin_strings(N, fields, couplings):
+        mask, amp = string_action(N, ops, sites, states)
+        if mask == 0:
+            diag += coeff * amp
+            continue
+        nz = np.flatnonzero(amp)
+        rows.append(states[nz] ^ mask)
+        cols.append(states[nz])
+        data.append(coeff * amp[nz])
+
+    nz = np.flatnonzero(diag)
+    rows.append(nz)
+    cols.append(nz)
+    data.append(diag[nz])
+
+    H = sp.coo_matrix((np.concatenate(data).astype(dtype, copy=False),
+                       (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(dim, dim)).tocsr()
+    H.eliminate_zeros()
+    return H
+
+
+def spin_linear_operator(N: int, fields, couplings) -> LinearOperator:
+    """
+    Matrix-free version of `assemble_spin_hamiltonian`.
+
+    Only the diagonal (one vector of length 2^N) is stored.  Flipping strings
+    are grouped by their XOR mask and their amplitudes are recomputed from
+    the basis integers on every product, so memory stays O(2^N) independent
+    of the number of terms:
+
+        (H v)[t] = diag[t] v[t] + Σ_mask amp_mask(t ^ mask) v[t ^ mask]
+
+    Returns
+    -------
+    scipy.sparse.linalg.LinearOperator of shape (2^N, 2^N)
+    """
+    fields    = list(fields)
+    couplings = list(couplings)
+    dim = 2**N
+    dtype = spin_dtype(fields, couplings)
+
+    states = basis_states(N)
+    diag = np.zeros(dim, dtype=dtype)
+    flips = {}
+    for coeff, ops, sites in iter_spin_strings(N, fields, couplings):
+        if all(a not in FLIP_AXES for a in ops):
+            diag += coeff * string_action(N, ops, sites, states)[1]
+        else:
+            mask = 0
+            for a, site in zip(ops, sites):
+                if a in FLIP_AXES:
+                    mask |= site_mask(N, site)
+            flips.setdefault(mask, []).append((coeff, ops, sites))
+
+    def matmat(V):
+        V = np.asarray(V)
+        out = diag[:, None] * V
+        for mask, strings in flips.items():
+            amp = None
+            for coeff, ops, sites in strings:
+                a = coeff * string_action(N, ops, sites, states)[1]
+                amp = a if amp is None else amp + a
+            out += (amp[:, None] * V)[states ^ mask]
+        return out
+
+    def matvec(v):
+        return matmat(np.asarray(v).reshape(dim, 1)).reshape(np.shape(v))
+
+    return LinearOperator((dim, dim), matvec=matvec, matmat=matmat, dtype=dtype)
@@ -1,10 +1,82 @@
 import numpy as np
 import scipy.sparse as sp
+from scipy.linalg import expm
+from . import instrument
+
+# process-wide cache: (n_max, key) -> immutable operator, shared by every mode;
+# parameterized keys ("D:<alpha>") are not kept, as a sweep over alpha would grow it forever
+_OPERATORS = {}
+
+BOSON_KEYS = ("a", "adag", "n", "n2", "I", "x", "p", "D")
+
+
+def _build_operator(n_max: int, key: str) -> sp.csr_matrix:
+    d = n_max + 1
+    root = np.sqrt(np.arange(1, d, dtype=np.float64))
+    name, _, arg = key.partition(":")
+    if name == "a":
+        return sp.diags(root, 1, shape=(d, d), format="csr")
+    if name == "adag":
+        return sp.diags(root, -1, shape=(d, d), format="csr")
+    if name == "n":
+        return sp.diags(np.arange(d, dtype=np.float64), 0, format="csr")
+    if name == "n2":
+        return sp.diags(np.arange(d, dtype=np.float64)**2, 0, format="csr")
+    if name == "I":
+        return sp.identity(d, format="csr")
+    if name == "x":
+        # (a + a†) / √2
+        return sp.diags([root, root], [1, -1], shape=(d, d), format="csr") / np.sqrt(2)
+    if name == "p":
+        # i(a† - a) / √2
+        return sp.diags([-1j * root, 1j * root], [1, -1], shape=(d, d), format="csr") / np.sqrt(2)
+    if name == "D":
+        # displacement exp(α a† - α* a) of the truncated mode, "D:<alpha>"
+        alpha = complex(arg)
+        gen = alpha * np.diag(root, -1) - np.conj(alpha) * np.diag(root, 1)
+        D = expm(gen)
+        return sp.csr_matrix(D.real if alpha.imag == 0 else D)
+    raise AssertionError(f"Unknown boson op '{key}'")
+
+
+def boson_operator(n_max: int, key: str) -> sp.csr_matrix:
+    """
+    Single-mode operator `key` for truncation n_max, from the process-wide cache.
+
+        a, adag, n, n2, I      ladder, number and identity operators
+        x, p                   quadratures (a + a†)/√2, i(a† - a)/√2
+        D:<alpha>              displacement exp(α a† - α* a), e.g. "D:0.5", "D:0.3+0.1j"
+
+    Operators are built once per (n_max, key), from their diagonals, and
+    returned read-only: they are shared by every BosonMode and builder.
+    Displacements depend on a continuous parameter and are built on every
+    call instead of being cached.
+    """
+    op = _OPERATORS.get((n_max, key))
+    if op is not None:
+        instrument.count("boson_op_hit")
+        return op
+    instrument.count("boson_op_miss")
+    op = _build_operator(n_max, key)
+    op.sum_duplicates()
+    for arr in (op.data, op.indices, op.indptr):
+        arr.flags.writeable = False
+    if ":" not in key:
+        _OPERATORS[(n_max, key)] = op
+    return op
+
+
+def clear_operator_cache():
+    _OPERATORS.clear()
+
 
 class BosonMode:
     """
     Represents a single bosonic mode truncated at n_max.
 
+    Operators are created on first use and shared through the cache of
+    boson_operator, so creating a BosonMode per run costs nothing.
+
     Attributes
     ----------
     n_max : int
@@ -17,8 +89,6 @@ class BosonMode:
         Creation operator on the boson space.
     n_op : scipy.sparse.csr_matrix
         Number operator a† a.
-    H_b : scipy.sparse.csr_matrix
-        On‐site boson Hamiltonian ω a†a.
     """
 
     def __init__(self, n_max: int):
@@ -27,55 +97,72 @@ class BosonMode:
         ----------
         n_max : int
             Maximum boson occupancy; Hilbert space dimension = n_max + 1.
-        omega : float
-            Frequency of this bosonic mode.
         """
         self.n_max = n_max
         self.d_b = n_max + 1
 
-        # Build a, a†, n_op immediately
-        self.a = self._build_annihilation()
-        self.adag = self.a.transpose().conj()
-        self.n_op = self.adag.dot(self.a)
+    @property
+    def a(self) -> sp.csr_matrix:
+        return boson_operator(self.n_max, "a")
 
-        # small‐op dict
-        self._ops = {
-            "a":    self.a,
-            "adag": self.adag,
-            "n":    self.n_op,
-            "I":    sp.identity(self.d_b, format="csr")
-        }
+    @property
+    def adag(self) -> sp.csr_matrix:
+        return boson_operator(self.n_max, "adag")
 
-    def _build_annihilation(self) -> sp.csr_matrix:
-        """
-        Construct the (n_max+1) × (n_max+1) annihilation operator a:
-            a_{i-1, i} = sqrt(i),  for i = 1..n_max
-        """
-        n = self.d_b
-        data = []
-        rows = []
-        cols = []
-        for i in range(1, n):
-            data.append(np.sqrt(i))
-            rows.append(i - 1)
-            cols.append(i)
-        mat = sp.csr_matrix((data, (rows, cols)), shape=(n, n))
-        return mat
+    @property
+    def n_op(self) -> sp.csr_matrix:
+        return boson_operator(self.n_max, "n")
 
     def get_boson(self,key: str) -> sp.csr_matrix:
-        assert key in self._ops, f"Unknown boson op '{key}'"
-        return self._ops[key]
+        assert key.partition(":")[0] in BOSON_KEYS, f"Unknown boson op '{key}'"
+        return boson_operator(self.n_max, key)
+
+
+def as_modes(boson_mode) -> tuple:
+    """A single BosonMode or a sequence of them, as a tuple of modes."""
+    if isinstance(boson_mode, BosonMode):
+        return (boson_mode,)
+    return tuple(boson_mode)
+
+
+def boson_dim(boson_mode) -> int:
+    """Dimension Π_m (n_max_m + 1) of the product space of the modes."""
+    return int(np.prod([m.d_b for m in as_modes(boson_mode)]))
+
+
+def embed_mode(boson_mode, index: int, op: sp.spmatrix) -> sp.csr_matrix:
+    """
+    `op` acting on mode `index` of the product space of the modes,
+    I ⊗ … ⊗ op ⊗ … ⊗ I, with mode 0 as the leftmost (slowest) factor.
+    """
+    modes = as_modes(boson_mode)
+    assert 0 <= index < len(modes), f"mode index must be in [0, {len(modes)})"
+    left = int(np.prod([m.d_b for m in modes[:index]]))
+    right = int(np.prod([m.d_b for m in modes[index + 1:]]))
+    out = op
+    if left > 1:
+        out = sp.kron(sp.identity(left, format="csr"), out, format="csr")
+    if right > 1:
+        out = sp.kron(out, sp.identity(right, format="csr"), format="csr")
+    return out.tocsr()
 
 
 class BosonTerm:
     """
     Builds H = strength * boson_mode.get_small(key) (d_b×d_b).
+
+    With several modes, `boson_mode` is the sequence of modes and the term
+    acts on mode `mode` of their product space.
     """
-    def __init__(self, boson_mode: BosonMode, key: str, strength: float):
+    def __init__(self, boson_mode, key: str, strength: float, mode: int = 0):
         self.boson_mode = boson_mode
         self.key        = key
         self.strength   = strength
+        self.mode       = mode
 
     def matrix(self) -> sp.csr_matrix:
-        O_b = self.boson_mode.get_boson(self.key)
-        return (self.strength * O_b).tocsr()
+        modes = as_modes(self.boson_mode)
+        O = modes[self.mode].get_boson(self.key)
+        # scale the data only; the index arrays stay shared with the cached operator
+        O_b = sp.csr_matrix((self.strength * O.data, O.indices, O.indptr), shape=O.shape)
+        return embed_mode(modes, self.mode, O_b)
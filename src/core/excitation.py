@@ -0,0 +1,154 @@
+"""
+Excitation-number-conserving blocks of spin-boson Hamiltonians.
+
+The product space is ordered as modes ⊗ spins (mode 0 slowest, spins
+fastest), so the flat index of |n_0, …, n_{M-1}; s> is
+
+    (Σ_m n_m · stride_m) · 2^N + s.
+
+For Tavis-Cummings-like models (a†σ⁻ + a σ⁺, diagonal boson terms,
+U(1)-symmetric spin terms) the total excitation number
+
+    K = Σ_m n_m + number of up spins
+
+is conserved.  The block of a given K is built directly on its basis,
+without forming the full Π_m d_m · 2^N space; its dimension for N spins
+and a single mode with n_max >= K is 2^N at most.
+"""
+import numpy as np
+import scipy.sparse as sp
+from .bitops import basis_states, iter_spin_strings, string_action
+from .boson import as_modes
+from .spinboson import site_couplings
+
+
+def _popcount(states: np.ndarray) -> np.ndarray:
+    counts = np.zeros(states.shape, dtype=np.int64)
+    s = states.astype(np.int64)
+    while np.any(s):
+        counts += s & 1
+        s = s >> 1
+    return counts
+
+
+def excitation_basis(N: int, boson_mode, K: int):
+    """
+    Basis of the excitation-number-K block.
+
+    Returns
+    -------
+    flat : np.ndarray
+        Sorted flat indices of the block states in the full product space.
+    occ : np.ndarray, shape (len(flat), n_modes)
+        Boson occupations of every state.
+    spins : np.ndarray
+        Spin basis integer of every state.
+    """
+    modes = as_modes(boson_mode)
+    dims = [m.d_b for m in modes]
+    states = basis_states(N).astype(np.int64)
+    n_up = N - _popcount(states)
+    by_up = {u: states[n_up == u] for u in range(N + 1)}
+
+    all_occ = np.indices(dims).reshape(len(dims), -1).T
+    flat, occ, spins = [], [], []
+    for p, o in enumerate(all_occ):
+        up = K - int(o.sum())
+        if 0 <= up <= N and len(by_up[up]):
+            s = by_up[up]
+            flat.append(p * 2**N + s)
+            occ.append(np.broadcast_to(o, (len(s), len(dims))))
+            spins.append(s)
+    if not flat:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(dims)), dtype=np.int64), \
+            np.zeros(0, dtype=np.int64)
+    return np.concatenate(flat), np.concatenate(occ), np.concatenate(spins)
+
+
+def _boson_action(op: sp.spmatrix, n: np.ndarray):
+    """
+    Action of a single-mode operator on occupations `n`, one band at a time.
+    Yields (delta, amp): |n> → amp |n + delta>, amp 0 where out of range.
+    """
+    O = op.toarray()
+    d = O.shape[0]
+    rows, cols = np.nonzero(O)
+    for delta in np.unique(rows - cols):
+        target = n + delta
+        valid = (target >= 0) & (target < d)
+        amp = np.zeros(n.shape, dtype=O.dtype)
+        amp[valid] = O[target[valid], n[valid]]
+        yield int(delta), amp
+
+
+def assemble_excitation_hamiltonian(N: int, boson_mode, fields, couplings,
+                                    boson_terms, spin_boson_terms, K: int) -> sp.csr_matrix:
+    """
+    Block of H with excitation number K, in the basis excitation_basis(N, boson_mode, K).
+
+    fields, couplings
+        Spin descriptors, as for core.bitops.assemble_spin_hamiltonian.
+    boson_terms
+        (key, strength, mode) descriptors of BosonTerm.
+    spin_boson_terms
+        (bkey, spin_axis, g, mode) descriptors of SpinBosonCouplingTerm.
+
+    Raises ValueError if a term leaves the block.
+    """
+    modes = as_modes(boson_mode)
+    dims = [m.d_b for m in modes]
+    strides = [int(np.prod(dims[m + 1:])) for m in range(len(dims))]
+    flat, occ, spins = excitation_basis(N, modes, K)
+    dim = len(flat)
+    base = flat - spins                       # boson part of the flat index, times 2^N
+    src = np.arange(dim)
+
+    # contributions are summed per (flat boson shift, spin mask) before the
+    # block check, since only the sum of e.g. XX + YY conserves K
+    groups = {}
+
+    def accumulate(shift, mask, amp):
+        key = (shift, mask)
+        groups[key] = amp if key not in groups else groups[key] + amp
+
+    # spin terms: bosons untouched
+    for coeff, ops, sites in iter_spin_strings(N, fields, couplings):
+        mask, amp = string_action(N, ops, sites, spins)
+        accumulate(0, mask, coeff * amp)
+
+    # boson terms: spins untouched
+    for key, strength, mode in boson_terms:
+        op = modes[mode].get_boson(key)
+        for delta, amp in _boson_action(op, occ[:, mode]):
+            accumulate(delta * strides[mode] * 2**N, 0, strength * amp)
+
+    # couplings: O_b on `mode` times Σ_i g_i σ^axis_i
+    for bkey, axis, g, mode in spin_boson_terms:
+        op = modes[mode].get_boson(bkey)
+        g_all = site_couplings(g, N)
+        for delta, bamp in _boson_action(op, occ[:, mode]):
+            for i in np.flatnonzero(g_all):
+                mask, samp = string_action(N, axis, (int(i),), spins)
+                accumulate(delta * strides[mode] * 2**N, mask, g_all[i] * bamp * samp)
+
+    rows, cols, vals = [], [], []
+    for (shift, mask), amp in groups.items():
+        nz = np.flatnonzero(np.abs(amp) > 1e-14)
+        if len(nz) == 0:
+            continue
+        target = base[nz] + shift + (spins[nz] ^ mask)
+        pos = np.minimum(np.searchsorted(flat, target), dim - 1)
+        if np.any(flat[pos] != target):
+            raise ValueError(f"Hamiltonian does not conserve the excitation number (K={K})")
+        rows.append(pos)
+        cols.append(src[nz])
+        vals.append(amp[nz])
+
+    if vals:
+        vals = np.concatenate(vals)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+    else:
+        vals, rows, cols = np.zeros(0), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    H = sp.coo_matrix((vals, (rows, cols)), shape=(dim, dim)).tocsr()
+    H.eliminate_zeros()
+    return H
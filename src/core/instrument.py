@@ -0,0 +1,158 @@
+"""
+Opt-in instrumentation of the hot paths.
+
+Probes in the library (PauliFactory.get, the builders, toarray, the
+eigensolvers, SpectrumDatabase.add_run and commits, the operator caches)
+report to the active Recorder, if any:
+
+    with recording() as rec:
+        H = builder.build()
+    rec.snapshot()   # {"build_time": 0.01, "build_calls": 1, "pauli_hit": 40, ...}
+
+Nothing is recorded by default.  A disabled probe costs one global
+lookup (`if instrument.recorder is not None`) or, for stages, entering a
+shared no-op context manager, so the hot paths are unaffected.
+
+Hooks, hook(kind, name, value) with kind "time", "count" or "value",
+see every event of the recorder they are registered on as it happens,
+e.g. to aggregate over a sweep or to stream to a monitor.
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+recorder = None   # the active Recorder, or None when instrumentation is off
+
+
+class Recorder:
+    """
+    Accumulates stage timers (total seconds and calls), counters and
+    peak values.
+
+    trace_memory
+        Also track the peak Python/numpy heap with tracemalloc, which is
+        exact but slows allocations down; the process peak RSS is always
+        recorded by snapshot() on POSIX systems.
+    """
+    def __init__(self, hooks=(), trace_memory: bool = False):
+        self.timers   = {}   # stage -> [seconds, calls]
+        self.counters = {}   # name  -> int
+        self.values   = {}   # name  -> max value seen
+        self.hooks    = list(hooks)
+        self.trace_memory = trace_memory
+
+    def add_time(self, name: str, seconds: float):
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [seconds, 1]
+        else:
+            t[0] += seconds
+            t[1] += 1
+        for hook in self.hooks:
+            hook("time", name, seconds)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        for hook in self.hooks:
+            hook("count", name, n)
+
+    def record(self, name: str, value: float):
+        """Keep the largest `value` reported under `name` (e.g. nnz, bytes)."""
+        if value > self.values.get(name, value - 1):
+            self.values[name] = value
+        for hook in self.hooks:
+            hook("value", name, value)
+
+    def snapshot(self) -> dict:
+        """
+        Flat {name: number}: "<stage>_time" and "<stage>_calls" per timer,
+        the counters, the peak values, and "peak_rss_bytes" of the process
+        (omitted where the resource module is unavailable, e.g. on Windows).
+        """
+        out = {}
+        for name, (seconds, calls) in self.timers.items():
+            out[f"{name}_time"] = seconds
+            out[f"{name}_calls"] = calls
+        out.update(self.counters)
+        out.update(self.values)
+        try:
+            import resource
+        except ImportError:   # not POSIX
+            resource = None
+        if resource is not None:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is in KiB on Linux and in bytes on macOS
+            out["peak_rss_bytes"] = rss if sys.platform == "darwin" else rss * 1024
+        if self.trace_memory and tracemalloc.is_tracing():
+            out["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        return out
+
+
+class _Stage:
+    __slots__ = ("rec", "name", "t0")
+
+    def __init__(self, rec: Recorder, name: str):
+        self.rec, self.name = rec, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rec.add_time(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager timing a block as stage `name` (a no-op when off)."""
+    if recorder is None:
+        return _NO_STAGE
+    return _Stage(recorder, name)
+
+
+def count(name: str, n: int = 1):
+    if recorder is not None:
+        recorder.count(name, n)
+
+
+def record(name: str, value: float):
+    if recorder is not None:
+        recorder.record(name, value)
+
+
+@contextmanager
+def recording(hooks=(), trace_memory: bool = False):
+    """
+    Activate a fresh Recorder for the block and yield it; the previously
+    active one (if any) is restored afterwards, so blocks may nest.
+    """
+    global recorder
+    previous = recorder
+    recorder = Recorder(hooks, trace_memory)
+    started = trace_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    elif trace_memory:
+        tracemalloc.reset_peak()
+    try:
+        yield recorder
+    finally:
+        if started:
+            recorder.values["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            recorder.trace_memory = False
+        recorder = previous
@@ -0,0 +1,118 @@
+"""
+Observables evaluated right after diagonalization, so that eigenvectors
+need not be stored.
+
+An observable spec is a name optionally followed by one argument after a
+colon, e.g. "gap", "magnetization", "zz" or "entanglement:3" (von Neumann
+entropy of the first 3 sites; the default cut is N // 2).  Each observable
+is a function
+
+    func(eigvals, states, N, previous, arg) -> scalar, array or None
+
+where `states` holds the lowest eigenvectors as columns in the full 2^N
+basis (site 0 = most significant bit, bit 0 = spin up) and `previous` is
+the ground state of the previous sweep point of the same N, or None.
+State-resolved observables return one entry per column of `states`.
+None means "not available" and is not stored.
+"""
+import numpy as np
+from .bitops import basis_states, site_bits
+
+
+def _z_diagonals(N: int) -> np.ndarray:
+    """(N, 2^N) array of σ^z_i eigenvalues ±1 on the basis states."""
+    states = basis_states(N)
+    return np.stack([1 - 2 * site_bits(states, N, i) for i in range(N)]).astype(np.float64)
+
+
+def gap(eigvals, states, N, previous, arg):
+    """E_1 - E_0 (needs at least two eigenvalues)."""
+    if len(eigvals) < 2:
+        return None
+    return float(eigvals[1] - eigvals[0])
+
+
+def magnetization(eigvals, states, N, previous, arg):
+    """<Σ_i σ^z_i> / N of every state; Σ_i σ^z_i is diagonal in the basis."""
+    if states is None:
+        return None
+    mz = _z_diagonals(N).sum(axis=0)
+    return (mz @ np.abs(states)**2) / N
+
+
+def zz_correlators(eigvals, states, N, previous, arg):
+    """<σ^z_i σ^z_j> of every state, shape (n_states, N, N)."""
+    if states is None:
+        return None
+    Z = _z_diagonals(N)
+    prob = np.abs(states)**2
+    return np.einsum("is,js,sk->kij", Z, Z, prob, optimize=True)
+
+
+def entanglement_entropy(eigvals, states, N, previous, arg):
+    """
+    Von Neumann entropy of sites [0, cut) for every state, from the
+    Schmidt values of the (2^cut, 2^(N-cut)) reshaped vector.
+    """
+    if states is None:
+        return None
+    cut = N // 2 if arg is None else int(arg)
+    assert 0 <= cut <= N, f"entanglement cut must lie in [0, {N}]"
+    psi = np.moveaxis(states, 1, 0).reshape(states.shape[1], 2**cut, 2**(N - cut))
+    lam = np.linalg.svd(psi, compute_uv=False)**2
+    logs = np.log(np.where(lam > 0, lam, 1.0))
+    return -np.sum(lam * logs, axis=1)
+
+
+def fidelity(eigvals, states, N, previous, arg):
+    """|<ψ_0(previous point)|ψ_0>| of the ground states of neighbouring sweep points."""
+    if states is None or previous is None or len(previous) != states.shape[0]:
+        return None
+    return float(abs(np.vdot(previous, states[:, 0])))
+
+
+OBSERVABLES = {
+    "gap":           gap,
+    "magnetization": magnetization,
+    "zz":            zz_correlators,
+    "entanglement":  entanglement_entropy,
+    "fidelity":      fidelity,
+}
+
+def register_observable(name: str, func):
+    """Make `func(eigvals, states, N, previous, arg)` available as observable `name`."""
+    assert ":" not in name, "observable names cannot contain ':'"
+    OBSERVABLES[name] = func
+
+
+def _parse(spec: str):
+    name, _, arg = spec.partition(":")
+    assert name in OBSERVABLES, f"Unknown observable '{name}'"
+    return OBSERVABLES[name], arg or None
+
+
+def evaluate_observables(specs, eigvals: np.ndarray, eigvecs: np.ndarray, N: int,
+                         n_states: int = 1, previous: np.ndarray = None) -> dict:
+    """
+    Evaluate the observables `specs` on one spectrum.
+
+    eigvecs : np.ndarray or None
+        Eigenvectors in the full 2^N basis; None (e.g. for symmetry-sector
+        blocks) leaves only the eigenvalue-based observables.
+    n_states : int
+        State-resolved observables use the lowest n_states eigenvectors.
+    previous : np.ndarray or None
+        Ground state of the previous sweep point, for "fidelity".
+
+    Returns {spec: value} for every observable that is available.
+    """
+    states = None
+    if eigvecs is not None:
+        states = np.asarray(eigvecs)[:, :n_states]
+    results = {}
+    for spec in specs:
+        func, arg = _parse(spec)
+        value = func(eigvals, states, N, previous, arg)
+        if value is not None:
+            results[spec] = value
+    return results
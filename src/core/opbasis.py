@@ -0,0 +1,151 @@
+"""
+Affine decomposition H(c) = Σ_t c_t O_t of the spin Hamiltonian.
+
+For a fixed N and term structure (which strings σ^a_i or σ^a_i σ^b_j carry a
+non-zero coefficient) the unit-strength operators O_t are computed once and
+stored on the union of their sparsity patterns, as a sparse matrix D of shape
+(nnz of H, number of terms).  The Hamiltonian of any point with the same
+structure is then
+
+    H.data = D @ c
+
+on the shared indices/indptr, i.e. a single sparse mat-vec instead of a
+rebuild.  OperatorBasisCache keeps such bases across sweep points with LRU
+eviction under a memory budget.
+"""
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+from .bitops import basis_states, is_complex, iter_spin_strings, string_action
+from . import instrument
+
+
+def term_signature(N: int, fields, couplings):
+    """
+    Split descriptors into a hashable structure and its coefficients.
+
+    Returns
+    -------
+    signature : tuple
+        (N, ((ops, sites), ...)) for every string with a non-zero coefficient.
+    coeffs : np.ndarray
+        The matching coefficients, in the same order.
+    """
+    strings = list(iter_spin_strings(N, fields, couplings))
+    signature = (N, tuple((ops, sites) for _, ops, sites in strings))
+    coeffs = np.array([c for c, _, _ in strings])
+    return signature, coeffs
+
+
+class OperatorBasis:
+    """
+    Unit-strength operators of one term structure on a shared CSR pattern.
+
+    Attributes
+    ----------
+    signature : tuple
+        See term_signature.
+    D : scipy.sparse.csr_matrix, shape (nnz, n_terms)
+        Column t holds the non-zeros of O_t, aligned with `indices`.
+    indices, indptr : np.ndarray
+        CSR pattern of the union of all O_t.
+    """
+
+    def __init__(self, signature: tuple):
+        N, strings = signature
+        self.signature = signature
+        dim = 2**N
+        self.shape = (dim, dim)
+        dtype = np.complex128 if is_complex([ops for ops, _ in strings]) else np.float64
+
+        states = basis_states(N).astype(np.int64)
+        keys, amps, terms = [], [], []
+        for t, (ops, sites) in enumerate(strings):
+            mask, amp = string_action(N, ops, sites, states)
+            nz = np.flatnonzero(amp)
+            keys.append((states[nz] ^ mask) * dim + states[nz])
+            amps.append(amp[nz])
+            terms.append(np.full(len(nz), t))
+
+        if strings:
+            keys = np.concatenate(keys)
+            amps = np.concatenate(amps).astype(dtype, copy=False)
+            terms = np.concatenate(terms)
+        else:
+            keys = np.zeros(0, dtype=np.int64)
+            amps = np.zeros(0, dtype=dtype)
+            terms = np.zeros(0, dtype=np.int64)
+        uniq, pos = np.unique(keys, return_inverse=True)
+        rows = uniq // dim
+        self.indices = (uniq % dim).astype(np.int32 if dim < 2**31 else np.int64)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=dim))]).astype(
+            self.indices.dtype)
+        self.D = sp.csr_matrix((amps, (pos, terms)), shape=(len(uniq), len(strings)))
+
+    @property
+    def nbytes(self) -> int:
+        return (self.D.data.nbytes + self.D.indices.nbytes + self.D.indptr.nbytes
+                + self.indices.nbytes + self.indptr.nbytes)
+
+    def assemble(self, coeffs: np.ndarray) -> sp.csr_matrix:
+        """H = Σ_t coeffs[t] O_t as CSR (the pattern arrays are copied)."""
+        data = self.D @ np.asarray(coeffs)
+        H = sp.csr_matrix((data, self.indices.copy(), self.indptr.copy()), shape=self.shape)
+        H.has_sorted_indices = True
+        return H
+
+
+class OperatorBasisCache:
+    """
+    LRU cache of OperatorBasis objects keyed by term signature.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget; least recently used bases are evicted beyond it.
+        A single basis larger than the budget is built but not kept.
+    """
+
+    def __init__(self, max_bytes: int = 2**30):
+        self.max_bytes = max_bytes
+        self._bases = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, signature: tuple) -> OperatorBasis:
+        basis = self._bases.get(signature)
+        if basis is not None:
+            self._bases.move_to_end(signature)
+            self.hits += 1
+            instrument.count("opbasis_hit")
+            return basis
+        self.misses += 1
+        instrument.count("opbasis_miss")
+        basis = OperatorBasis(signature)
+        if basis.nbytes <= self.max_bytes:
+            self._bases[signature] = basis
+            self.nbytes += basis.nbytes
+            while self.nbytes > self.max_bytes:
+                _, old = self._bases.popitem(last=False)
+                self.nbytes -= old.nbytes
+                self.evictions += 1
+        return basis
+
+    def assemble(self, N: int, fields, couplings) -> sp.csr_matrix:
+        """Spin Hamiltonian of the descriptors, reusing the cached basis."""
+        signature, coeffs = term_signature(N, fields, couplings)
+        return self.get(signature).assemble(coeffs)
+
+    def clear(self):
+        self._bases.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self._bases), "bytes": self.nbytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+# shared by every builder using backend="cached" in this process
+default_cache = OperatorBasisCache()
@@ -1,5 +1,60 @@
 import numpy as np
 import scipy.sparse as sp
+from collections import OrderedDict
+from .bitops import FLIP_AXES, basis_states, local_amplitude, site_bits, site_mask
+from . import instrument
+
+# default byte budget of a PauliFactory cache; N=20 would need ~1 GB for all of X, Y, Z
+DEFAULT_MAX_BYTES = 2**28
+
+class CompactPauli:
+    """
+    σ^axis_i on the 2^N-dimensional space without a CSR structure.
+
+    Diagonal operators (Z) keep the diagonal as a 1-D array; bit-flip
+    operators (X, Y, +, -) keep a permutation and a phase vector:
+
+        σ |s> = phase[s] |perm[s]>
+    """
+
+    def __init__(self, N: int, axis: str, site: int):
+        states = basis_states(N)
+        amp = local_amplitude(axis, site_bits(states, N, site))
+        self.dim  = 2**N
+        self.axis = axis
+        if axis in FLIP_AXES:
+            self.diag  = None
+            self.perm  = states ^ site_mask(N, site)
+            self.phase = amp
+        else:
+            self.diag  = amp
+            self.perm  = None
+            self.phase = None
+
+    @property
+    def nbytes(self) -> int:
+        if self.diag is not None:
+            return self.diag.nbytes
+        return self.perm.nbytes + self.phase.nbytes
+
+    def dot(self, v: np.ndarray) -> np.ndarray:
+        """σ v for a vector or a (2^N, k) block."""
+        v = np.asarray(v)
+        if self.diag is not None:
+            return self.diag.reshape((-1,) + (1,) * (v.ndim - 1)) * v
+        out = np.zeros(v.shape, dtype=np.result_type(self.phase.dtype, v.dtype))
+        out[self.perm] = self.phase.reshape((-1,) + (1,) * (v.ndim - 1)) * v
+        return out
+
+    def tocsr(self) -> sp.csr_matrix:
+        """Materialize as a CSR matrix (structural zeros dropped)."""
+        cols = np.arange(self.dim)
+        if self.diag is not None:
+            rows, data = cols, self.diag
+        else:
+            rows, data = self.perm, self.phase
+        nz = np.flatnonzero(data)
+        return sp.csr_matrix((data[nz], (rows[nz], cols[nz])), shape=(self.dim, self.dim))
 
 class PauliFactory:
     """
@@ -9,22 +64,19 @@ class PauliFactory:
         cache[axis][i] = (2^N × 2^N) sparse CSR for σ^axis on site i.
 
     Only computes each (axis, i) the first time .get(axis, i) is called.
+    CSR matrices are materialized from a CompactPauli form, which is kept
+    only when asked for through get_compact, so a factory used through
+    get() holds each operator once.  Least recently used entries are
+    evicted to stay within `max_bytes` (DEFAULT_MAX_BYTES unless given,
+    None for no limit); stats() reports hits, misses (one per lookup that
+    builds), evictions and cached bytes.
     """
 
-    def __init__(self, N: int):
+    def __init__(self, N: int, max_bytes: int = DEFAULT_MAX_BYTES):
 
         self.N = N
         self.dim = 2**N
-
-        # Pre‐define the 2×2 Pauli+I matrices (small, so we store them immediately):
-        self._pauli2 = {
-            "X": sp.csr_matrix(np.array([[0, 1], [1, 0]], dtype=np.float64)),
-            "Y": sp.csr_matrix(np.array([[0, -1j], [1j,  0]], dtype=np.complex128)),
-            "Z": sp.csr_matrix(np.array([[1,  0], [0, -1]], dtype=np.float64)),
-            "+": sp.csr_matrix(np.array([[0,  1], [0, 0]], dtype=np.float64)),
-            "-": sp.csr_matrix(np.array([[0,  0], [1, 0]], dtype=np.float64))
-        }
-        self._I2 = sp.identity(2, format="csr", dtype=np.float64)
+        self.max_bytes = max_bytes
 
         # Prepare empty caches for "X","Y","Z","+","-"
         self.cache = {
@@ -34,6 +86,52 @@ class PauliFactory:
             "+": {},     # will map i -> +_i
             "-": {}     # will map i -> -_i
         }
+        self._compact = {}
+
+        # (kind, axis, site) -> bytes, in least- to most-recently used order
+        self._lru = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _touch(self, key):
+        self._lru.move_to_end(key)
+        self.hits += 1
+        if instrument.recorder is not None:
+            instrument.recorder.count("pauli_hit")
+
+    def _store(self, key, nbytes: int):
+        self._lru[key] = nbytes
+        self.nbytes += nbytes
+        if self.max_bytes is None:
+            return
+        # `key` is the most recent entry, so it is never evicted here
+        while self.nbytes > self.max_bytes and len(self._lru) > 1:
+            (kind, axis, site), size = self._lru.popitem(last=False)
+            if kind == "csr":
+                del self.cache[axis][site]
+            else:
+                del self._compact[(axis, site)]
+            self.nbytes -= size
+            self.evictions += 1
+
+    def get_compact(self, axis: str, site: int) -> CompactPauli:
+        """σ^axis at `site` in CompactPauli form (diagonal or perm + phase)."""
+        assert axis in {"X", "Y", "Z", "+", "-"}, "axis must be 'X','Y','Z','+', or '-'"
+        assert 0 <= site < self.N, "site must be between 0 and N-1"
+
+        key = ("compact", axis, site)
+        if key in self._lru:
+            self._touch(key)
+            return self._compact[(axis, site)]
+        self.misses += 1
+        if instrument.recorder is not None:
+            instrument.recorder.count("pauli_miss")
+        op = CompactPauli(self.N, axis, site)
+        self._compact[(axis, site)] = op
+        self._store(key, op.nbytes)
+        return op
 
     def get(self, axis: str, site: int) -> sp.csr_matrix:
         """
@@ -49,19 +147,30 @@ class PauliFactory:
         assert 0 <= site < self.N, "site must be between 0 and N-1"
 
         # If it’s already cached, return it immediately
-        if site in self.cache[axis]:
+        key = ("csr", axis, site)
+        if key in self._lru:
+            self._touch(key)
             return self.cache[axis][site]
 
-        # Otherwise, build it now:
-        pauli2 = self._pauli2[axis]
-        op = None
-        for i in range(self.N):
-            factor = pauli2 if (i == site) else self._I2
-            op = factor if (op is None) else sp.kron(op, factor, format="csr")
+        # Otherwise, materialize it from a compact form that is not kept
+        # (unless get_compact already cached it):
+        self.misses += 1
+        if instrument.recorder is not None:
+            instrument.recorder.count("pauli_miss")
+        compact = self._compact.get((axis, site))
+        if compact is None:
+            compact = CompactPauli(self.N, axis, site)
+        op = compact.tocsr()
 
         # Cache, then return
-        self.cache[axis][site] = op.tocsr()
-        return self.cache[axis][site]
+        self.cache[axis][site] = op
+        self._store(key, op.data.nbytes + op.indices.nbytes + op.indptr.nbytes)
+        return op
+
+    def stats(self) -> dict:
+        """Cache counters: entries, bytes, hits, misses, evictions."""
+        return {"entries": len(self._lru), "bytes": self.nbytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
 
 class SingleSiteTerm:
     """
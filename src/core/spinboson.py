@@ -1,29 +1,45 @@
 import numpy as np
 import scipy.sparse as sp
 from .spin import PauliFactory, SingleSiteTerm
-from .boson import BosonMode
+from .boson import as_modes, embed_mode
+
+def site_couplings(g, N: int) -> np.ndarray:
+    """Per-site coupling strengths: a scalar g means g on every site."""
+    if np.ndim(g) == 0:
+        return np.full(N, g)
+    g = np.asarray(g)
+    assert g.shape == (N,), f"site-resolved coupling must have length {N}"
+    return g
+
 
 class SpinBosonCouplingTerm:
     """
-    Builds H = g * (O_b ⊗ Σ_i σ^spin_axis_i).
+    Builds H = O_b ⊗ Σ_i g_i σ^spin_axis_i.
+
+    `g` is a scalar (uniform coupling, g Σ_i σ^spin_axis_i) or a length-N
+    array of site-resolved strengths.  With several modes, `boson_mode` is
+    the sequence of modes and O_b acts on mode `mode` of their product space.
     """
     def __init__(self,
                  factory: PauliFactory,
-                 boson_mode: BosonMode,
+                 boson_mode,
                  bkey: str,
                  spin_axis: str,
-                 g: float):
+                 g,
+                 mode: int = 0):
         self.factory   = factory
         self.boson_mode= boson_mode
         self.bkey      = bkey
         self.spin_axis = spin_axis
         self.g         = g
+        self.mode      = mode
 
     def matrix(self) -> sp.csr_matrix:
         # Boson operator:
-        O_b = self.boson_mode.get_boson(self.bkey)
-        # Global spin operator Σ_i σ^spin_axis_i:
-        h_all = np.ones(self.factory.N)
-        O_s   = SingleSiteTerm(self.factory, self.spin_axis, h_all).matrix()
-        # Tensor and scale:
-        return (sp.kron(O_b, O_s, format="csr") * self.g).tocsr()
+        modes = as_modes(self.boson_mode)
+        O_b = embed_mode(modes, self.mode, modes[self.mode].get_boson(self.bkey))
+        # Spin operator Σ_i g_i σ^spin_axis_i:
+        g_all = site_couplings(self.g, self.factory.N)
+        O_s   = SingleSiteTerm(self.factory, self.spin_axis, g_all).matrix()
+        # Tensor:
+        return sp.kron(O_b, O_s, format="csr").tocsr()
@@ -0,0 +1,290 @@
+"""
+Symmetry sectors of the spin Hamiltonian.
+
+Supported symmetries (any combination):
+
+    "U1" : total magnetization, labelled by the number of down spins n_down
+    "Z2" : global spin flip P = Π_i σ^X_i, labelled by parity ±1
+    "T"  : translation by one site on a ring, labelled by momentum index m
+           (k = 2π m / N)
+
+Translation and spin flip generate an abelian group G whose elements
+g = T^l P^q act on basis integers.  A sector basis is made of orbit
+representatives (the smallest integer of each orbit) and each sector state is
+
+    |a_χ> = 1/sqrt(N_a) Σ_g χ(g)^* g|a>,    χ(T^l P^q) = e^{ikl} p^q.
+
+If H_j|a> = amp |s'> and g0|s'> = |b> with b a representative, then
+
+    <b_χ|H_j|a_χ> = amp χ(g0)^* sqrt(|orbit a| / |orbit b|).
+"""
+import numpy as np
+import scipy.sparse as sp
+from .bitops import FLIP_AXES, basis_states, site_mask, string_action, iter_spin_strings, spin_dtype
+
+SYMMETRIES = ("U1", "Z2", "T")
+
+
+class Sector:
+    """
+    Quantum numbers of one symmetry block.  A value of None means the
+    corresponding symmetry is not used.
+
+    Attributes
+    ----------
+    n_down : int or None
+        Number of down spins (U(1) magnetization 2·S^z = N - 2·n_down).
+    parity : int or None
+        Eigenvalue ±1 of the global spin flip.
+    momentum : int or None
+        Momentum index m, k = 2π m / N.
+    """
+
+    def __init__(self, n_down=None, parity=None, momentum=None):
+        assert parity in (None, 1, -1), "parity must be None, +1 or -1"
+        self.n_down   = n_down
+        self.parity   = parity
+        self.momentum = momentum
+
+    def quantum_numbers(self) -> dict:
+        """Non-trivial quantum numbers as a plain dict (JSON-serializable)."""
+        qn = {"n_down": self.n_down, "parity": self.parity, "momentum": self.momentum}
+        return {k: v for k, v in qn.items() if v is not None}
+
+    def __repr__(self):
+        qn = ", ".join(f"{k}={v}" for k, v in self.quantum_numbers().items())
+        return f"Sector({qn})"
+
+
+def _rotate(states: np.ndarray, N: int) -> np.ndarray:
+    """Translate every state by one site: site i → site i+1 (mod N)."""
+    return (states >> 1) | ((states & 1) << (N - 1))
+
+
+def _group_images(N: int, sector: Sector, states: np.ndarray):
+    """
+    Images g|s> of every state under every group element, with the characters.
+
+    Returns
+    -------
+    images : np.ndarray, shape (|G|, len(states))
+    chars : np.ndarray, shape (|G|,)
+    """
+    full = 2**N - 1
+    images, chars = [], []
+    rot = states
+    n_rot = N if sector.momentum is not None else 1
+    for l in range(n_rot):
+        phase = 1.0 if sector.momentum is None else np.exp(2j*np.pi*sector.momentum*l/N)
+        images.append(rot)
+        chars.append(phase)
+        if sector.parity is not None:
+            images.append(rot ^ full)
+            chars.append(phase * sector.parity)
+        rot = _rotate(rot, N)
+    return np.stack(images), np.asarray(chars)
+
+
+def _representatives(N: int, sector: Sector, states: np.ndarray):
+    """
+    Representative, group element index and orbit size for every state.
+
+    Returns
+    -------
+    rep : np.ndarray
+        Smallest integer in the orbit of each state.
+    g0 : np.ndarray
+        Index of the group element mapping the state onto `rep`.
+    orbit : np.ndarray
+        Orbit size of each state.
+    compatible : np.ndarray of bool
+        False if the state's projection onto the sector vanishes.
+    chars : np.ndarray
+        Characters of the group elements.
+    """
+    images, chars = _group_images(N, sector, states)
+    g0  = np.argmin(images, axis=0)
+    rep = images[g0, np.arange(len(states))]
+    fixed = images == states[None, :]
+    stab = fixed.sum(axis=0)
+    orbit = len(chars) // stab
+    compatible = np.abs(chars @ fixed) > 0.5
+    return rep, g0, orbit, compatible, chars
+
+
+def sector_basis(N: int, sector: Sector) -> np.ndarray:
+    """
+    Sorted representative basis integers of `sector`.
+
+    Eigenvectors of a sector block are expressed in this basis.
+    """
+    states = basis_states(N)
+    if sector.n_down is not None:
+        pop = np.zeros(len(states), dtype=np.int64)
+        for i in range(N):
+            pop += (states >> i) & 1
+        states = states[pop == sector.n_down]
+    if sector.parity is None and sector.momentum is None:
+        return states
+    rep, _, _, compatible, _ = _representatives(N, sector, states)
+    return states[(rep == states) & compatible]
+
+
+def _flip_groups(N: int, fields, couplings):
+    """Group spin strings by XOR mask: {mask: [(coeff, ops, sites), ...]}."""
+    groups = {}
+    for coeff, ops, sites in iter_spin_strings(N, fields, couplings):
+        mask = 0
+        for a, site in zip(ops, sites):
+            if a in FLIP_AXES:
+                mask |= site_mask(N, site)
+        groups.setdefault(mask, []).append((coeff, ops, sites))
+    return groups
+
+
+def assemble_sector_hamiltonian(N: int, fields, couplings, sector: Sector) -> sp.csr_matrix:
+    """
+    Build the block of H in `sector`, expressed in `sector_basis(N, sector)`.
+
+    Target states are located with a binary search on the sorted basis.
+    Raises ValueError if H does not conserve the magnetization of `sector`.
+    """
+    fields    = list(fields)
+    couplings = list(couplings)
+    basis = sector_basis(N, sector)
+    dim = len(basis)
+    use_group = sector.parity is not None or sector.momentum is not None
+    if use_group:
+        _, _, orbit_a, _, chars = _representatives(N, sector, basis)
+    complex_phase = sector.momentum is not None and (2*sector.momentum) % N != 0
+    # complex if the momentum phases or the operators and coefficients are
+    dtype = np.result_type(np.complex128 if complex_phase else np.float64,
+                           spin_dtype(fields, couplings))
+
+    cols_all = np.arange(dim)
+    rows, cols, data = [], [], []
+    for mask, strings in _flip_groups(N, fields, couplings).items():
+        amp = None
+        for coeff, ops, sites in strings:
+            a = coeff * string_action(N, ops, sites, basis)[1]
+            amp = a if amp is None else amp + a
+        nz = np.flatnonzero(np.abs(amp) > 1e-14)
+        if len(nz) == 0:
+            continue
+        target = basis[nz] ^ mask
+        amp = amp[nz]
+        if use_group:
+            target, g0, orbit_b, compatible, _ = _representatives(N, sector, target)
+            amp = amp * np.conj(chars[g0]) * np.sqrt(orbit_a[nz] / orbit_b)
+            keep = compatible
+            nz, target, amp = nz[keep], target[keep], amp[keep]
+        idx = np.minimum(np.searchsorted(basis, target), dim - 1)
+        found = basis[idx] == target
+        if not np.all(found):
+            raise ValueError(f"Hamiltonian does not conserve {sector!r}")
+        rows.append(idx)
+        cols.append(cols_all[nz])
+        data.append(amp)
+
+    if not data:
+        return sp.csr_matrix((dim, dim), dtype=dtype)
+    data = np.concatenate(data)
+    if dtype == np.float64 and np.iscomplexobj(data):
+        # real operators and coefficients; k = 0, π characters are real up to rounding
+        data = data.real
+    H = sp.coo_matrix((data.astype(dtype, copy=False),
+                       (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(dim, dim)).tocsr()
+    H.eliminate_zeros()
+    return H
+
+
+def _local_amplitude_table(N: int, ops: str, sites: tuple) -> np.ndarray:
+    """Amplitude of a string for every configuration of its own sites."""
+    states = np.zeros(2**len(sites), dtype=np.int64)
+    for k, site in enumerate(sites):
+        states |= ((np.arange(len(states)) >> k) & 1) << (N - 1 - site)
+    return string_action(N, ops, sites, states)[1], states
+
+
+def detect_symmetries(N: int, fields, couplings, tol: float = 1e-12) -> set:
+    """
+    Symmetries among SYMMETRIES that H commutes with, read off the descriptors.
+
+    "U1" : every flipping string group only connects states of equal magnetization.
+    "Z2" : strings use X, Y, Z only and each has an even number of Y/Z factors.
+    "T"  : fields are uniform and each coupling matrix, symmetrized over i<j,
+           is invariant under i → i+1 (mod N) (requires ops of the form "AA").
+    """
+    fields    = list(fields)
+    couplings = list(couplings)
+    found = set()
+
+    # U(1): all single-site flips break it; two-site flips must cancel on
+    # parallel spins (e.g. XX + YY, or +- / -+).
+    u1 = True
+    for mask, strings in _flip_groups(N, fields, couplings).items():
+        if mask == 0:
+            continue
+        sites = tuple(i for i in range(N) if mask & site_mask(N, i))
+        if len(sites) != 2:
+            u1 = False
+            break
+        total = 0
+        for coeff, ops, s in strings:
+            amp, states = _local_amplitude_table(N, ops, s)
+            total = total + coeff * amp
+        flipped = np.array([bin(int(x ^ mask)).count("1") - bin(int(x)).count("1")
+                            for x in states])
+        if np.any(np.abs(np.asarray(total)[flipped != 0]) > tol):
+            u1 = False
+            break
+    if u1:
+        found.add("U1")
+
+    # Z2 spin flip
+    z2 = True
+    for coeff, ops, sites in iter_spin_strings(N, fields, couplings):
+        if any(a in "+-" for a in ops) or sum(a in "YZ" for a in ops) % 2:
+            z2 = False
+            break
+    if z2:
+        found.add("Z2")
+
+    # translation on a ring
+    t = N > 1
+    for axis, h in fields:
+        if np.any(np.abs(np.asarray(h) - h[0]) > tol):
+            t = False
+    for ops, J in couplings:
+        if ops[0] != ops[1]:
+            if np.any(np.triu(J, k=1)):
+                t = False
+            continue
+        K = np.triu(J, k=1)
+        K = K + K.T
+        if np.any(np.abs(np.roll(K, (1, 1), axis=(0, 1)) - K) > tol):
+            t = False
+    if t:
+        found.add("T")
+    return found
+
+
+def enumerate_sectors(N: int, symmetries) -> list:
+    """
+    All sectors for the given set of symmetry names.
+
+    Parity is only a good quantum number inside a U(1) block when
+    n_down = N/2, so it is dropped for the other magnetization blocks.
+    """
+    symmetries = set(symmetries)
+    assert symmetries <= set(SYMMETRIES), f"symmetries must be a subset of {SYMMETRIES}"
+    n_values = range(N + 1) if "U1" in symmetries else (None,)
+    momenta  = range(N) if "T" in symmetries else (None,)
+    sectors = []
+    for n in n_values:
+        use_parity = "Z2" in symmetries and (n is None or 2*n == N)
+        for p in ((1, -1) if use_parity else (None,)):
+            for m in momenta:
+                sectors.append(Sector(n_down=n, parity=p, momentum=m))
+    return sectors
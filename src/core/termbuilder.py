@@ -1,11 +1,69 @@
 import numpy as np
 import scipy.sparse as sp
+from . import instrument
+
+
+def sum_terms(shape: tuple, signed_terms) -> sp.csr_matrix:
+    """
+    Σ sign · M over (sign, M) pairs, gathered in one COO buffer and
+    converted to CSR once (duplicates summed, exact zeros dropped).
+    """
+    rows, cols, data = [], [], []
+    for sign, M in signed_terms:
+        C = M.tocoo()
+        rows.append(C.row)
+        cols.append(C.col)
+        data.append(sign * C.data)
+    if not data:
+        return sp.csr_matrix(shape)
+    H = sp.coo_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=shape).tocsr()
+    H.eliminate_zeros()
+    return H
+
+
+def apply_delta(H: sp.csr_matrix, delta: sp.csr_matrix, rtol: float = 1e-14) -> sp.csr_matrix:
+    """
+    H + delta as CSR.  Entries cancelled by the delta are dropped, including
+    the rounding residue left when an old term is subtracted: at a position
+    of delta, |x| up to rtol times the larger of |H| and |delta| there.
+    Entries the delta does not touch are kept as they are, so the pattern
+    matches a fresh build.
+    """
+    out = (H + delta).tocsr()
+    D = delta.tocoo()
+    if D.nnz:
+        before = np.asarray(H[D.row, D.col]).ravel()
+        after = np.asarray(out[D.row, D.col]).ravel()
+        # exact zeros are not stored any more and go with eliminate_zeros
+        cancelled = (after != 0) & (np.abs(after) <= rtol * np.maximum(np.abs(before),
+                                                                       np.abs(D.data)))
+        if np.any(cancelled):
+            out[D.row[cancelled], D.col[cancelled]] = 0
+    out.eliminate_zeros()
+    return out
+
+
+def _copy_descr(descr: tuple) -> tuple:
+    """descr with its arrays copied, so later in-place edits by the caller do not leak in."""
+    return tuple(np.array(x, copy=True) if isinstance(x, (np.ndarray, list)) else x
+                 for x in descr)
+
 
 class TermBuilderBase:
     """
     Generic builder for terms with a `.matrix()` method.
-    Caches result until descriptors change.
+
+    The sum is maintained incrementally.  add, update and remove record
+    signed changes (+descr for a term that enters the sum, -descr for one
+    that leaves it) in a change log, and build() adds only the
+    contributions of the changes since the previous build to the cached
+    matrix.  Composite builders follow the same log through changes().
+    The log is bounded; a consumer that fell behind its start rebuilds
+    from the current descriptors.
     """
+    MAX_LOG = 64
+
     def __init__(self, TermClass, shape: tuple, *args):
         """
         TermClass(*args, *descr) must have .matrix() → CSR of size `shape`.
@@ -14,25 +72,79 @@ class TermBuilderBase:
         self.args       = args
         self.shape      = shape
         self._descr     = []
-        self._dirty     = True
+        self._log       = []    # (sign, descr), oldest first
+        self._log_start = 0     # version of self._log[0]
+        self._cursor    = 0     # version consumed by build()
         self._H_cached  = None
 
+    @property
+    def version(self) -> int:
+        """Number of changes recorded so far."""
+        return self._log_start + len(self._log)
+
+    @property
+    def _dirty(self) -> bool:
+        return self._H_cached is None or self._cursor < self.version
+
+    def _record(self, sign: int, descr: tuple):
+        self._log.append((sign, descr))
+        excess = len(self._log) - max(self.MAX_LOG, 4 * len(self._descr))
+        if excess > 0:
+            del self._log[:excess]
+            self._log_start += excess
+
+    def __len__(self) -> int:
+        return len(self._descr)
+
     def add(self, *descr):
-        """Register one term descriptor."""
+        """Register one term descriptor (its arrays are copied)."""
+        descr = _copy_descr(descr)
         self._descr.append(descr)
-        self._dirty = True
+        self._record(+1, descr)
         return self
 
+    def update(self, index: int, *descr):
+        """Replace the descriptor of term `index` (e.g. to change its strength)."""
+        old = self._descr[index]
+        descr = _copy_descr(descr)
+        self._descr[index] = descr
+        self._record(-1, old)
+        self._record(+1, descr)
+        return self
+
+    def remove(self, index: int):
+        """Drop term `index`; later terms move down by one."""
+        old = self._descr.pop(index)
+        self._record(-1, old)
+        return self
+
+    def changes(self, cursor: int):
+        """
+        Signed descriptors recorded since version `cursor`, and the current
+        version.  None instead of the list means they are no longer logged
+        and the caller must rebuild from the descriptors.
+        """
+        if cursor < self._log_start:
+            return None, self.version
+        return self._log[cursor - self._log_start:], self.version
+
+    def term_matrix(self, descr: tuple) -> sp.csr_matrix:
+        return self.TermClass(*self.args, *descr).matrix()
+
     def build(self) -> sp.csr_matrix:
         """Assemble and cache the sum of TermClass(*args, *descr).matrix()."""
-        if not self._dirty and self._H_cached is not None:
+        if not self._dirty:
+            instrument.count("term_build_cached")
             return self._H_cached
 
-        H = sp.csr_matrix(self.shape)
-        for descr in self._descr:
-            term = self.TermClass(*self.args, *descr).matrix()
-            H = H + term
-        self._H_cached = H.tocsr()
-        self._dirty    = False
+        with instrument.stage("term_build"):
+            changes, version = self.changes(self._cursor)
+            if self._H_cached is None or changes is None:
+                self._H_cached = sum_terms(self.shape,
+                                           [(1, self.term_matrix(d)) for d in self._descr])
+            else:
+                delta = sum_terms(self.shape,
+                                  [(sign, self.term_matrix(d)) for sign, d in changes])
+                self._H_cached = apply_delta(self._H_cached, delta)
+        self._cursor = version
         return self._H_cached
-
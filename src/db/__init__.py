@@ -1 +1,9 @@
-__all__ = ["SpectrumDatabase"]
\ No newline at end of file
+from core._lazy import lazy_exports
+
+__all__ = ["SpectrumDatabase", "BackgroundWriter"]
+
+# submodules and exports are imported on first access; none of them needs scipy
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "SpectrumDatabase": "database",
+    "BackgroundWriter": "writer",
+}, ("codecs", "database", "descriptors", "vectorstore", "writer"))
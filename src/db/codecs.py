@@ -0,0 +1,174 @@
+"""
+Array codecs for the BLOB columns of SpectrumDatabase.
+
+A codec spec is a "+"-separated pipeline of stages, each optionally taking
+one argument after a colon, e.g.
+
+    "zlib"                 lossless compression
+    "f32+lzma"             float32/complex64 downcast, then LZMA
+    "sparse:1e-8+zlib:9"   drop |x| < 1e-8, store (index, value) pairs, then zlib
+
+Array stages ("f32", "sparse") must come before byte stages ("zlib", "lzma").
+The spec and what each stage needs to undo itself (including the maximum
+absolute error of lossy stages) is returned as an info dict that is stored
+with the row, so decoding never depends on the current settings.
+"""
+import json
+import lzma
+import zlib
+import numpy as np
+
+class Float32Codec:
+    """Downcast float64 → float32 and complex128 → complex64."""
+    kind = "array"
+
+    def __init__(self, arg=None):
+        assert arg is None, "f32 takes no argument"
+
+    def encode(self, arr: np.ndarray, meta: dict) -> np.ndarray:
+        out = arr.astype(np.complex64 if np.iscomplexobj(arr) else np.float32)
+        meta["input_dtype"] = str(arr.dtype)
+        meta["max_abs_error"] = float(np.max(np.abs(out - arr))) if arr.size else 0.0
+        return out
+
+    def decode(self, arr: np.ndarray, meta: dict) -> np.ndarray:
+        return arr.astype(meta["input_dtype"])
+
+
+class SparseCodec:
+    """
+    Keep only entries with |x| >= threshold, stored as flat (index, value)
+    pairs; suited to eigenvectors localized in the basis.
+    """
+    kind = "array"
+
+    def __init__(self, arg=None):
+        self.threshold = 0.0 if arg is None else float(arg)
+
+    def encode(self, arr: np.ndarray, meta: dict) -> np.ndarray:
+        flat = arr.ravel()
+        keep = np.abs(flat) >= self.threshold if self.threshold > 0 else flat != 0
+        idx_dtype = np.uint32 if flat.size < 2**32 else np.int64
+        idx = np.flatnonzero(keep).astype(idx_dtype)
+        vals = flat[keep]
+        meta.update(input_dtype=str(arr.dtype), size=int(flat.size), nnz=int(len(idx)),
+                    index_dtype=np.dtype(idx_dtype).name,
+                    max_abs_error=float(np.max(np.abs(flat[~keep]))) if len(idx) < flat.size else 0.0)
+        return np.concatenate([idx.view(np.uint8), vals.view(np.uint8)])
+
+    def decode(self, arr: np.ndarray, meta: dict) -> np.ndarray:
+        idx_bytes = meta["nnz"] * np.dtype(meta["index_dtype"]).itemsize
+        idx = arr[:idx_bytes].view(meta["index_dtype"])
+        vals = arr[idx_bytes:].view(meta["input_dtype"])
+        out = np.zeros(meta["size"], dtype=meta["input_dtype"])
+        out[idx] = vals
+        return out
+
+
+class ZlibCodec:
+    kind = "bytes"
+
+    def __init__(self, arg=None):
+        self.level = 6 if arg is None else int(arg)
+
+    def encode(self, data: bytes, meta: dict) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decode(self, data: bytes, meta: dict) -> bytes:
+        return zlib.decompress(data)
+
+
+class LzmaCodec:
+    kind = "bytes"
+
+    def __init__(self, arg=None):
+        self.preset = 6 if arg is None else int(arg)
+
+    def encode(self, data: bytes, meta: dict) -> bytes:
+        return lzma.compress(data, preset=self.preset)
+
+    def decode(self, data: bytes, meta: dict) -> bytes:
+        return lzma.decompress(data)
+
+
+CODECS = {
+    "f32":    Float32Codec,
+    "sparse": SparseCodec,
+    "zlib":   ZlibCodec,
+    "lzma":   LzmaCodec,
+}
+
+def register_codec(name: str, cls):
+    """
+    Make a stage available in codec specs.  `cls(arg)` must provide `kind`
+    ("array" or "bytes") and encode(payload, meta) / decode(payload, meta).
+    """
+    assert cls.kind in ("array", "bytes"), "codec kind must be 'array' or 'bytes'"
+    CODECS[name] = cls
+
+
+def _parse(spec: str) -> list:
+    stages = []
+    for part in spec.split("+"):
+        name, _, arg = part.partition(":")
+        assert name in CODECS, f"Unknown codec '{name}'"
+        stages.append((part, CODECS[name](arg or None)))
+    kinds = [st.kind for _, st in stages]
+    assert kinds == sorted(kinds, key=lambda k: k == "bytes"), \
+        "array codecs must come before byte codecs"
+    return stages
+
+
+def encode(arr: np.ndarray, spec: str):
+    """
+    Encode `arr` with the pipeline `spec`.
+
+    Returns
+    -------
+    data : bytes
+    info : dict
+        JSON-serializable record needed by decode, with the overall
+        "max_abs_error" introduced by lossy stages.
+    """
+    stages = _parse(spec)
+    metas = []
+    payload = np.ascontiguousarray(arr)
+    for _, stage in stages:
+        meta = {}
+        if stage.kind == "array":
+            payload = stage.encode(payload, meta)
+            payload_dtype = str(payload.dtype)
+        else:
+            if isinstance(payload, np.ndarray):
+                payload_dtype = str(payload.dtype)
+                payload = payload.tobytes()
+            payload = stage.encode(payload, meta)
+        metas.append(meta)
+    if isinstance(payload, np.ndarray):
+        payload_dtype = str(payload.dtype)
+        payload = payload.tobytes()
+    info = {"spec": spec,
+            "payload_dtype": payload_dtype,
+            "stages": metas,
+            "max_abs_error": sum(m.get("max_abs_error", 0.0) for m in metas)}
+    return payload, info
+
+
+def decode(data: bytes, info: dict, shape: tuple, dtype: str) -> np.ndarray:
+    """Invert `encode`; returns an array of the original shape and dtype."""
+    stages = _parse(info["spec"])
+    payload = data
+    for (_, stage), meta in reversed(list(zip(stages, info["stages"]))):
+        if stage.kind == "bytes":
+            payload = stage.decode(payload, meta)
+        else:
+            if not isinstance(payload, np.ndarray):
+                payload = np.frombuffer(payload, dtype=info["payload_dtype"])
+            payload = stage.decode(payload, meta)
+    if not isinstance(payload, np.ndarray):
+        payload = np.frombuffer(payload, dtype=info["payload_dtype"])
+    return payload.astype(dtype, copy=False).reshape(shape)
+
+
+def dumps(info: dict) -> str:
+    return json.dumps(info, sort_keys=True, separators=(",", ":"))
@@ -1,11 +1,108 @@
+import os
+import time
 import sqlite3
 import json
+import hashlib
 import numpy as np
+from contextlib import contextmanager
+from .descriptors import META_COLUMNS, describe_run
+from .vectorstore import NpyVectorStore
+from . import codecs as _codecs
+from core import instrument
+
+# per-point status of a sweep
+STATUSES = ("pending", "running", "done", "failed")
+
+def canonical_params(params: dict) -> str:
+    """Sorted, spaceless JSON form of a param dict (numpy arrays as lists)."""
+    return json.dumps(params,sort_keys=True,separators=(",", ":"),default=lambda o: o.tolist())
+
+def params_key(params: dict) -> str:
+    """SHA-256 of the canonical params, used as the indexed lookup key."""
+    return hashlib.sha256(canonical_params(params).encode()).hexdigest()
 
 class SpectrumDatabase:
-    def __init__(self, path="spectra.db"):
-        self.conn = sqlite3.connect(path)
-        self._create_table()
+    def __init__(self, path="spectra.db", vector_dir=None, wal=False, read_only=False,
+                 codecs=None):
+        """
+        path : str
+            SQLite database file.
+        vector_dir : str or None
+            If given, eigenvectors of new runs are written as .npy files in this
+            directory instead of BLOBs; eigenvalues and metadata stay in SQLite.
+            Runs stored either way can always be read back.
+        wal : bool
+            Switch the file to write-ahead logging with relaxed fsync
+            (synchronous=NORMAL).  Commits get much cheaper, and readers
+            can query while a sweep is writing.
+        read_only : bool
+            Open an existing database for queries only; the schema is neither
+            created nor migrated.
+        codecs : dict or None
+            Codec spec per array column for new runs, e.g.
+            {"eigvecs": "f32+zlib", "eigvals": "zlib"} (see db.codecs).
+            The codec is recorded per row and decoded transparently on read.
+            Eigenvectors written to a vector_dir are always stored raw.
+        """
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(path)
+        # file references are stored relative to the database location
+        self._root = os.getcwd() if path == ":memory:" else os.path.dirname(os.path.abspath(path))
+        self.vector_store = None if vector_dir is None else NpyVectorStore(vector_dir)
+        self.codecs = dict(codecs or {})
+        assert set(self.codecs) <= {"eigvals", "eigvecs"}, "codecs keys must be 'eigvals'/'eigvecs'"
+        # write batching state, see batch()
+        self._batch_depth = 0
+        self._batch_size  = 1
+        self._uncommitted = 0
+        if wal and not read_only:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA cache_size=-65536")
+        if not read_only:
+            self._create_table()
+
+    def _commit(self):
+        """Commit now, or every `flush_size` writes inside a batch()."""
+        if self._batch_depth == 0:
+            with instrument.stage("db_commit"):
+                self.conn.commit()
+            return
+        self._uncommitted += 1
+        if self._uncommitted >= self._batch_size:
+            with instrument.stage("db_commit"):
+                self.conn.commit()
+            self._uncommitted = 0
+
+    @contextmanager
+    def batch(self, flush_size: int = 100):
+        """
+        Group writes into transactions of `flush_size` operations.
+
+            with db.batch(500):
+                for ...:
+                    db.add_run(...)
+
+        Pending writes are committed when the outermost block exits, also
+        when it exits with an exception, so completed work is never lost.
+        """
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self._batch_size = flush_size
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        """Commit writes held back by batch()."""
+        self.conn.commit()
+        self._uncommitted = 0
 
     def _create_table(self):
         sql = """
@@ -18,77 +115,695 @@ class SpectrumDatabase:
           eigvecs_shape    TEXT    NOT NULL,
           eigvecs_dtype    TEXT    NOT NULL,
           params           TEXT    NOT NULL,
+          sector           TEXT,
+          params_hash      TEXT,
+          eigvecs_file     TEXT,
+          eigvals_codec    TEXT,
+          eigvecs_codec    TEXT,
           created_at       DATETIME DEFAULT CURRENT_TIMESTAMP
         );"""
         self.conn.execute(sql)
+        # databases created before symmetry sectors / hashed keys existed
+        self._ensure_column("runs", "sector", "TEXT")
+        self._ensure_column("runs", "eigvecs_file", "TEXT")
+        self._ensure_column("runs", "eigvals_codec", "TEXT")
+        self._ensure_column("runs", "eigvecs_codec", "TEXT")
+        if self._ensure_column("runs", "params_hash", "TEXT"):
+            rows = self.conn.execute("SELECT id, params FROM runs").fetchall()
+            self.conn.executemany(
+                "UPDATE runs SET params_hash = ? WHERE id = ?",
+                [(hashlib.sha256(p.encode()).hexdigest(), i) for i, p in rows])
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_runs_params_hash ON runs(params_hash)")
+
+        # status of every point of a (possibly interrupted) sweep
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS points (
+          params_hash      TEXT    PRIMARY KEY,
+          params           TEXT    NOT NULL,
+          status           TEXT    NOT NULL,
+          error            TEXT,
+          updated_at       DATETIME DEFAULT CURRENT_TIMESTAMP
+        );""")
+
+        # typed, indexed descriptors of every run (see db.descriptors)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_meta (
+          run_id            INTEGER PRIMARY KEY REFERENCES runs(id),
+          N                 INTEGER,
+          method            TEXT,
+          interaction_range INTEGER,
+          n_down            INTEGER,
+          parity            INTEGER,
+          momentum          INTEGER
+        );""")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_scalars (
+          run_id           INTEGER NOT NULL REFERENCES runs(id),
+          name             TEXT    NOT NULL,
+          value            REAL    NOT NULL
+        );""")
+        # diagonalization cost of every run, to compare solver strategies
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS solver_stats (
+          run_id           INTEGER PRIMARY KEY REFERENCES runs(id),
+          solver           TEXT,
+          iterations       INTEGER,
+          matvecs          INTEGER,
+          wall_time        REAL,
+          warm_start       INTEGER
+        );""")
+        # observables evaluated at diagonalization time (see core.observables);
+        # `value` is set for scalars so they can be filtered in SQL
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_observables (
+          run_id           INTEGER NOT NULL REFERENCES runs(id),
+          name             TEXT    NOT NULL,
+          value            REAL,
+          data             BLOB    NOT NULL,
+          shape            TEXT    NOT NULL,
+          dtype            TEXT    NOT NULL,
+          PRIMARY KEY (run_id, name)
+        );""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_observables ON run_observables(name, value)")
+        # resource plan of a run (see utils.planner): the chosen strategy, its
+        # estimates, and those of every strategy considered as JSON
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_plans (
+          run_id           INTEGER PRIMARY KEY REFERENCES runs(id),
+          strategy         TEXT    NOT NULL,
+          memory_budget    INTEGER,
+          nnz_estimate     INTEGER,
+          memory_estimate  INTEGER,
+          time_estimate    REAL,
+          estimates        TEXT
+        );""")
+        # profiling record of a run (see core.instrument): stage times, counters, peaks
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_metrics (
+          run_id           INTEGER NOT NULL REFERENCES runs(id),
+          name             TEXT    NOT NULL,
+          value            REAL,
+          PRIMARY KEY (run_id, name)
+        );""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_name ON run_metrics(name, value)")
+        # quench dynamics: observables on a time grid (see utils.evolution)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS trajectories (
+          id               INTEGER PRIMARY KEY AUTOINCREMENT,
+          params           TEXT    NOT NULL,
+          params_hash      TEXT    NOT NULL,
+          initial_params   TEXT,
+          method           TEXT,
+          times            BLOB    NOT NULL,
+          created_at       DATETIME DEFAULT CURRENT_TIMESTAMP
+        );""")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS trajectory_observables (
+          trajectory_id    INTEGER NOT NULL REFERENCES trajectories(id),
+          name             TEXT    NOT NULL,
+          data             BLOB    NOT NULL,
+          shape            TEXT    NOT NULL,
+          dtype            TEXT    NOT NULL,
+          PRIMARY KEY (trajectory_id, name)
+        );""")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trajectories_params_hash ON trajectories(params_hash)")
+        # Chebyshev moments of the DOS (see utils.kpm)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS kpm_moments (
+          id               INTEGER PRIMARY KEY AUTOINCREMENT,
+          params           TEXT    NOT NULL,
+          params_hash      TEXT    NOT NULL,
+          moments          BLOB    NOT NULL,
+          scale            REAL    NOT NULL,
+          shift            REAL    NOT NULL,
+          dim              INTEGER NOT NULL,
+          e_min            REAL,
+          e_max            REAL,
+          n_random         INTEGER,
+          created_at       DATETIME DEFAULT CURRENT_TIMESTAMP
+        );""")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_kpm_params_hash ON kpm_moments(params_hash)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_meta_N_method ON run_meta(N, method)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_meta_sector ON run_meta(n_down, parity, momentum)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scalars ON run_scalars(name, value, run_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scalars_run ON run_scalars(run_id)")
+        # runs stored before descriptors existed
+        rows = self.conn.execute(
+            """SELECT id, params, sector FROM runs
+               WHERE id NOT IN (SELECT run_id FROM run_meta)""").fetchall()
+        for run_id, ptxt, stxt in rows:
+            self._insert_descriptors(run_id, json.loads(ptxt), None,
+                                     None if stxt is None else json.loads(stxt))
         self.conn.commit()
 
+    def _insert_descriptors(self, run_id: int, params: dict, method: str, sector: dict):
+        meta, scalars = describe_run(params, method, sector)
+        self.conn.execute(
+            f"""INSERT INTO run_meta (run_id, {", ".join(META_COLUMNS)})
+                VALUES (?{",?" * len(META_COLUMNS)})""",
+            (run_id, *[meta[c] for c in META_COLUMNS]))
+        self.conn.executemany(
+            "INSERT INTO run_scalars (run_id, name, value) VALUES (?,?,?)",
+            [(run_id, k, v) for k, v in scalars.items()])
+
+    def _ensure_column(self, table: str, column: str, decl: str) -> bool:
+        """Add `column` to an existing table if missing; True if it was added."""
+        cols = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+        if column not in cols:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+            return True
+        return False
+
     def add_run(self,
                 eigvals: np.ndarray,
                 eigvecs: np.ndarray,
-                params: dict) -> int:
+                params: dict,
+                sector: dict = None,
+                method: str = None,
+                stats: dict = None,
+                observables: dict = None,
+                plan: dict = None,
+                metrics: dict = None) -> int:
+        """
+        Store one spectrum.  `sector` holds the quantum numbers of a symmetry
+        block (e.g. {"n_down": 3, "momentum": 0}); eigenvectors of a block are
+        expressed in core.symmetry.sector_basis.  None means the full space.
+        `method` names the diagonalization path and is indexed with the other
+        descriptors for query_runs.  `stats` (solver, iterations, matvecs,
+        wall_time, warm_start) goes to the solver_stats table.  With a vector_dir the eigenvectors go to
+        a .npy file and the eigvecs BLOB is left empty.  `eigvecs` may be None
+        when only eigenvalues and `observables` ({name: scalar or array}, see
+        add_observables) are kept.  `plan` is the utils.planner.plan record
+        the diagonalization path was chosen by, stored in run_plans.
+        `metrics` ({name: number}, e.g. a core.instrument snapshot) goes to
+        run_metrics, with the serialization and insert time of this call
+        added as db_serialize_time and db_insert_time.
+        """
+        t0 = time.perf_counter()
         # serialize eigenvalues
-        ev_b    = eigvals.tobytes()
+        ev_b, ev_codec = self._encode(eigvals, "eigvals")
         ev_shape= json.dumps(eigvals.shape)
         ev_dtype= str(eigvals.dtype)
         # serialize eigenvectors
-        vec_b    = eigvecs.tobytes()
-        vec_shape= json.dumps(eigvecs.shape)
-        vec_dtype= str(eigvecs.dtype)
+        if eigvecs is None:
+            vec_b, vec_codec, vec_shape, vec_dtype = b"", None, "null", ""
+        else:
+            if self.vector_store is None:
+                vec_b, vec_codec = self._encode(eigvecs, "eigvecs")
+            else:
+                vec_b, vec_codec = b"", None
+            vec_shape= json.dumps(eigvecs.shape)
+            vec_dtype= str(eigvecs.dtype)
         # serialize params
-        pjson = json.dumps(params,sort_keys=True,separators=(",", ":"),default=lambda o: o.tolist())
+        pjson = canonical_params(params)
+        phash = hashlib.sha256(pjson.encode()).hexdigest()
+        sjson = None if sector is None else json.dumps(sector, sort_keys=True, separators=(",", ":"))
+        t_serialize = time.perf_counter() - t0
 
         cur = self.conn.cursor()
         cur.execute(
             """INSERT INTO runs
                (eigvals, eigvals_shape, eigvals_dtype,
                 eigvecs, eigvecs_shape, eigvecs_dtype,
-                params)
-             VALUES (?,?,?,?,?,?,?)""",
+                params, sector, params_hash,
+                eigvals_codec, eigvecs_codec)
+             VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
             (sqlite3.Binary(ev_b), ev_shape, ev_dtype,
              sqlite3.Binary(vec_b), vec_shape, vec_dtype,
-             pjson)
+             pjson, sjson, phash,
+             ev_codec, vec_codec)
         )
-        self.conn.commit()
-        return cur.lastrowid
+        run_id = cur.lastrowid
+        if self.vector_store is not None and eigvecs is not None:
+            try:
+                fpath = self.vector_store.write(run_id, eigvecs)
+            except Exception:
+                cur.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+                raise
+            cur.execute("UPDATE runs SET eigvecs_file = ? WHERE id = ?",
+                        (os.path.relpath(fpath, self._root), run_id))
+        self._insert_descriptors(run_id, params, method, sector)
+        if stats is not None:
+            cur.execute(
+                """INSERT INTO solver_stats
+                   (run_id, solver, iterations, matvecs, wall_time, warm_start)
+                   VALUES (?,?,?,?,?,?)""",
+                (run_id, stats.get("solver"), stats.get("iterations"), stats.get("matvecs"),
+                 stats.get("wall_time"), None if stats.get("warm_start") is None
+                 else int(stats["warm_start"])))
+        if observables:
+            self._insert_observables(run_id, observables)
+        if plan is not None:
+            chosen = plan["estimates"][plan["strategy"]]
+            cur.execute(
+                """INSERT INTO run_plans
+                   (run_id, strategy, memory_budget, nnz_estimate, memory_estimate,
+                    time_estimate, estimates)
+                   VALUES (?,?,?,?,?,?,?)""",
+                (run_id, plan["strategy"], plan.get("memory_budget"), plan.get("nnz"),
+                 chosen["memory"], chosen["time"],
+                 json.dumps({"dim": plan.get("dim"), "k": plan.get("k"),
+                             "spectrum": plan.get("spectrum"),
+                             "estimates": plan["estimates"]}, sort_keys=True)))
+        t_insert = time.perf_counter() - t0 - t_serialize
+        if metrics is not None:
+            self._insert_metrics(run_id, dict(metrics, db_serialize_time=t_serialize,
+                                              db_insert_time=t_insert))
+        if instrument.recorder is not None:
+            instrument.recorder.add_time("db_serialize", t_serialize)
+            instrument.recorder.add_time("db_insert", t_insert)
+        self._commit()
+        return run_id
+
+    def _insert_metrics(self, run_id: int, metrics: dict):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO run_metrics (run_id, name, value) VALUES (?,?,?)",
+            [(run_id, name, None if value is None else float(value))
+             for name, value in metrics.items()])
+
+    def _insert_observables(self, run_id: int, observables: dict):
+        rows = []
+        for name, value in observables.items():
+            arr = np.asarray(value)
+            scalar = float(arr.item()) if arr.size == 1 and np.isrealobj(arr) else None
+            rows.append((run_id, name, scalar, sqlite3.Binary(np.ascontiguousarray(arr).tobytes()),
+                         json.dumps(arr.shape), str(arr.dtype)))
+        self.conn.executemany(
+            """INSERT OR REPLACE INTO run_observables (run_id, name, value, data, shape, dtype)
+               VALUES (?,?,?,?,?,?)""", rows)
+
+    def add_observables(self, run_id: int, observables: dict):
+        """
+        Store observables of a run, {name: scalar or array}; an existing
+        entry of the same name is replaced.
+        """
+        self._insert_observables(run_id, observables)
+        self._commit()
+
+    def _encode(self, arr: np.ndarray, column: str):
+        """Bytes and codec record (None when raw) for one array column."""
+        spec = self.codecs.get(column)
+        if spec is None or spec == "raw":
+            return np.ascontiguousarray(arr).tobytes(), None
+        data, info = _codecs.encode(arr, spec)
+        return data, _codecs.dumps(info)
 
-    #takes run_id and returns the eigenspectrum
+    @staticmethod
+    def _decode(data: bytes, codec: str, shape: str, dtype: str) -> np.ndarray:
+        shape = tuple(json.loads(shape))
+        if codec is None:
+            return np.frombuffer(data, dtype=dtype).reshape(shape)
+        return _codecs.decode(data, json.loads(codec), shape, dtype)
+
+    def add_runs(self, records, flush_size: int = 100) -> list:
+        """
+        Bulk version of add_run, committing every `flush_size` runs.
+
+        records : iterable of dict
+            Keyword arguments of add_run (eigvals, eigvecs, params and
+            optionally sector, method, stats, observables, plan, metrics).
+
+        Returns the new run ids, in order.
+        """
+        with self.batch(flush_size):
+            return [self.add_run(**rec) for rec in records]
+
+    #takes run_id and returns the eigenspectrum; file-backed eigenvectors come back memory-mapped
     def get_run_id(self, run_id: int):
         
+        ev = self.get_eigvals(run_id)
+        if ev is None:
+            return None
+        return ev, self._open_eigvecs(run_id)
+
+    #takes run_id and returns only the eigenvalues
+    def get_eigvals(self, run_id: int):
+
         cur = self.conn.cursor()
         cur.execute(
-            """SELECT eigvals, eigvals_shape, eigvals_dtype,
-                      eigvecs, eigvecs_shape, eigvecs_dtype,
-                      params
-               FROM runs WHERE id = ?""",
+            "SELECT eigvals, eigvals_codec, eigvals_shape, eigvals_dtype FROM runs WHERE id = ?",
             (run_id,)
         )
         row = cur.fetchone()
         if row is None:
             return None
+        return self._decode(*row)
 
-        ev_b, ev_shape, ev_dtype, vec_b, vec_shape, vec_dtype, params_txt = row
-        # rebuild arrays
-        ev_shape  = tuple(json.loads(ev_shape))
-        ev = np.frombuffer(ev_b, dtype=ev_dtype).reshape(ev_shape)
+    #takes run_id and returns selected eigenvectors (columns) and/or basis rows
+    def get_eigvecs(self, run_id: int, indices=None, rows=None):
+        """
+        Read part of the eigenvector matrix of a run.
 
-        vec_shape = tuple(json.loads(vec_shape))
-        vec = np.frombuffer(vec_b, dtype=vec_dtype).reshape(vec_shape)
+        indices : int, slice or sequence, optional
+            Eigenvector (column) indices; an int returns a single vector.
+        rows : int, slice or sequence, optional
+            Basis-state (row) indices.
 
-        return ev, vec
+        For file-backed runs only the requested part is read from disk, so the
+        ground state (indices=0) costs O(dim) instead of O(dim·nev).
+        """
+        vec = self._open_eigvecs(run_id)
+        if vec is None:
+            return None
+        if indices is not None:
+            vec = vec[:, indices]
+        if rows is not None:
+            vec = vec[rows]
+        return np.array(vec)
 
-    #takes the param and returns the id
-    def get_run_param(self,params: dict):
+    def _open_eigvecs(self, run_id: int):
+        cur = self.conn.cursor()
+        cur.execute("SELECT eigvecs_file, eigvecs_shape, eigvecs_dtype FROM runs WHERE id = ?",
+                    (run_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        vec_file, vec_shape, vec_dtype = row
+        if vec_shape == "null":
+            return None
+        if vec_file is not None:
+            return NpyVectorStore.open(os.path.join(self._root, vec_file))
+        cur.execute("SELECT eigvecs, eigvecs_codec FROM runs WHERE id = ?", (run_id,))
+        vec_b, vec_codec = cur.fetchone()
+        return self._decode(vec_b, vec_codec, vec_shape, vec_dtype)
+
+    #takes run_id and returns the codec records of its array columns (None = raw)
+    def get_codecs(self, run_id: int):
+
+        row = self.conn.execute("SELECT eigvals_codec, eigvecs_codec FROM runs WHERE id = ?",
+                                (run_id,)).fetchone()
+        if row is None:
+            return None
+        return {name: None if c is None else json.loads(c)
+                for name, c in zip(("eigvals", "eigvecs"), row)}
+
+    #takes run_id and returns its solver statistics
+    def get_solver_stats(self, run_id: int):
+
+        cur = self.conn.execute(
+            "SELECT solver, iterations, matvecs, wall_time, warm_start FROM solver_stats WHERE run_id = ?",
+            (run_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        stats = dict(zip(("solver", "iterations", "matvecs", "wall_time", "warm_start"), row))
+        stats["warm_start"] = None if row[4] is None else bool(row[4])
+        return stats
+
+    #takes run_id and returns the resource plan its diagonalization path was chosen by
+    def get_plan(self, run_id: int):
+
+        row = self.conn.execute(
+            """SELECT strategy, memory_budget, nnz_estimate, estimates
+               FROM run_plans WHERE run_id = ?""", (run_id,)).fetchone()
+        if row is None:
+            return None
+        strategy, budget, nnz, estimates = row
+        return {"strategy": strategy, "memory_budget": budget, "nnz": nnz,
+                **json.loads(estimates)}
+
+    #takes run_id and returns its profiling metrics as {name: value}
+    def get_metrics(self, run_id: int) -> dict:
+
+        return dict(self.conn.execute(
+            "SELECT name, value FROM run_metrics WHERE run_id = ?", (run_id,)).fetchall())
+
+    #takes optional metric names and run ids and returns {name: {count, mean, min, max, total}} over the runs
+    def aggregate_metrics(self, names=None, run_ids=None) -> dict:
+
+        sql = "SELECT name, COUNT(value), AVG(value), MIN(value), MAX(value), SUM(value) FROM run_metrics"
+        conds, args = [], []
+        for column, values in (("name", names), ("run_id", run_ids)):
+            if values is not None:
+                values = list(values)
+                conds.append(f"{column} IN ({','.join('?' * len(values))})")
+                args += values
+        if conds:
+            sql += " WHERE " + " AND ".join(conds)
+        sql += " GROUP BY name"
+        return {name: {"count": n, "mean": mean, "min": lo, "max": hi, "total": total}
+                for name, n, mean, lo, hi, total in self.conn.execute(sql, args)}
+
+    #takes run_id and returns its stored observables as {name: value}, optionally only `names`
+    def get_observables(self, run_id: int, names=None) -> dict:
+
+        sql = "SELECT name, data, shape, dtype FROM run_observables WHERE run_id = ?"
+        args = [run_id]
+        if names is not None:
+            names = list(names)
+            sql += f" AND name IN ({','.join('?' * len(names))})"
+            args += names
+        out = {}
+        for name, data, shape, dtype in self.conn.execute(sql, args):
+            arr = self._decode(data, None, shape, dtype)
+            out[name] = arr.item() if arr.ndim == 0 else arr
+        return out
+
+    def add_trajectory(self, times: np.ndarray, observables: dict, params: dict,
+                       initial_params: dict = None, method: str = None) -> int:
+        """
+        Store the time evolution under `params` (the post-quench Hamiltonian)
+        of the ground state of `initial_params`.  `observables` maps names to
+        arrays whose first axis runs over `times`.
+        """
+        pjson = canonical_params(params)
+        ijson = None if initial_params is None else canonical_params(initial_params)
+        cur = self.conn.cursor()
+        cur.execute(
+            """INSERT INTO trajectories (params, params_hash, initial_params, method, times)
+               VALUES (?,?,?,?,?)""",
+            (pjson, hashlib.sha256(pjson.encode()).hexdigest(), ijson, method,
+             sqlite3.Binary(np.asarray(times, dtype=np.float64).tobytes())))
+        traj_id = cur.lastrowid
+        rows = []
+        for name, value in observables.items():
+            arr = np.ascontiguousarray(value)
+            rows.append((traj_id, name, sqlite3.Binary(arr.tobytes()),
+                         json.dumps(arr.shape), str(arr.dtype)))
+        cur.executemany(
+            """INSERT INTO trajectory_observables (trajectory_id, name, data, shape, dtype)
+               VALUES (?,?,?,?,?)""", rows)
+        self._commit()
+        return traj_id
+
+    #takes a trajectory id and returns (times, {name: array over times})
+    def get_trajectory(self, traj_id: int):
+
+        row = self.conn.execute("SELECT times FROM trajectories WHERE id = ?",
+                                (traj_id,)).fetchone()
+        if row is None:
+            return None
+        times = np.frombuffer(row[0], dtype=np.float64)
+        observables = {
+            name: self._decode(data, None, shape, dtype)
+            for name, data, shape, dtype in self.conn.execute(
+                """SELECT name, data, shape, dtype FROM trajectory_observables
+                   WHERE trajectory_id = ?""", (traj_id,))}
+        return times, observables
+
+    #takes the post-quench param (and optionally the initial one) and returns the trajectory ids
+    def get_trajectory_param(self, params: dict, initial_params: dict = None):
+
+        canonical = canonical_params(params)
+        phash = hashlib.sha256(canonical.encode()).hexdigest()
+        sql = "SELECT id FROM trajectories WHERE params_hash = ? AND params = ?"
+        args = [phash, canonical]
+        if initial_params is not None:
+            sql += " AND initial_params = ?"
+            args.append(canonical_params(initial_params))
+        return [row[0] for row in self.conn.execute(sql, args)]
+
+    def add_kpm_moments(self, moments: np.ndarray, params: dict, scale: float, shift: float,
+                        dim: int, e_min: float = None, e_max: float = None,
+                        n_random: int = None) -> int:
+        """
+        Store the normalized Chebyshev moments of H(params), with the
+        mapping H~ = (H - shift) / scale, the Hilbert space dimension and the
+        spectral bounds, which is all utils.kpm needs to rebuild the DOS and
+        thermodynamics.
+        """
+        pjson = canonical_params(params)
+        cur = self.conn.cursor()
+        cur.execute(
+            """INSERT INTO kpm_moments
+               (params, params_hash, moments, scale, shift, dim, e_min, e_max, n_random)
+               VALUES (?,?,?,?,?,?,?,?,?)""",
+            (pjson, hashlib.sha256(pjson.encode()).hexdigest(),
+             sqlite3.Binary(np.asarray(moments, dtype=np.float64).tobytes()),
+             float(scale), float(shift), int(dim),
+             None if e_min is None else float(e_min), None if e_max is None else float(e_max),
+             n_random))
+        self._commit()
+        return cur.lastrowid
+
+    #takes a moments id and returns {"moments", "scale", "shift", "dim", "e_min", "e_max", "n_random"}
+    def get_kpm_moments(self, kpm_id: int):
+
+        row = self.conn.execute(
+            """SELECT moments, scale, shift, dim, e_min, e_max, n_random
+               FROM kpm_moments WHERE id = ?""", (kpm_id,)).fetchone()
+        if row is None:
+            return None
+        return {"moments": np.frombuffer(row[0], dtype=np.float64),
+                **dict(zip(("scale", "shift", "dim", "e_min", "e_max", "n_random"), row[1:]))}
+
+    #takes the param and returns the ids of its stored moment sets
+    def get_kpm_param(self, params: dict):
+
+        canonical = canonical_params(params)
+        phash = hashlib.sha256(canonical.encode()).hexdigest()
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM kpm_moments WHERE params_hash = ? AND params = ?", (phash, canonical))]
+
+    #takes run_id and returns the quantum numbers of its symmetry sector
+    def get_sector(self, run_id: int):
+
+        cur = self.conn.cursor()
+        cur.execute("SELECT sector FROM runs WHERE id = ?", (run_id,))
+        row = cur.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    #takes the param and returns the id; with `sector` only that block matches
+    def get_run_param(self,params: dict, sector: dict = None):
 
         cur = self.conn.cursor()
         #convert the param dictionary to a sorted, spaceless, serializable JSON formatted strings
-        canonical = json.dumps(params,sort_keys=True,separators=(",", ":"),default=lambda o: o.tolist())
+        canonical = canonical_params(params)
+        #look up through the indexed hash; the text comparison only guards against collisions
+        phash = hashlib.sha256(canonical.encode()).hexdigest()
 
-        cur.execute("SELECT id FROM runs WHERE params = ?",(canonical,))
+        if sector is None:
+            cur.execute("SELECT id FROM runs WHERE params_hash = ? AND params = ?",(phash, canonical))
+        else:
+            sjson = json.dumps(sector, sort_keys=True, separators=(",", ":"))
+            cur.execute("SELECT id FROM runs WHERE params_hash = ? AND params = ? AND sector = ?",
+                        (phash, canonical, sjson))
         ids_full_match = [row[0] for row in cur.fetchall()]
 
         return ids_full_match
 
+    #removes every run stored for the param (e.g. partial results of an interrupted point)
+    def delete_runs(self, params: dict) -> int:
+
+        cur = self.conn.cursor()
+        key = params_key(params)
+        files = cur.execute("SELECT eigvecs_file FROM runs WHERE params_hash = ? AND eigvecs_file IS NOT NULL",
+                            (key,)).fetchall()
+        for table in ("run_meta", "run_scalars", "solver_stats", "run_observables", "run_plans",
+                      "run_metrics"):
+            cur.execute(f"""DELETE FROM {table} WHERE run_id IN
+                            (SELECT id FROM runs WHERE params_hash = ?)""", (key,))
+        cur.execute("DELETE FROM runs WHERE params_hash = ?", (key,))
+        n_deleted = cur.rowcount
+        self._commit()
+        for (vec_file,) in files:
+            NpyVectorStore.delete(os.path.join(self._root, vec_file))
+        return n_deleted
+
+    #selects runs by indexed descriptors, without reading any spectrum
+    def query_runs(self, sector: dict = None, **filters) -> list:
+        """
+        Return metadata of the runs matching every filter.
+
+        Filters on the typed columns (N, method, interaction_range, n_down,
+        parity, momentum) or on any parameter that was uniform at insert time
+        (e.g. hZ, JXX).  A value matches exactly; a (lo, hi) tuple matches the
+        closed interval, with None for an open end.  `sector` is a shortcut
+        for its quantum numbers.
+
+            db.query_runs(N=16, hZ=(0.2, 0.8))
+
+        Returns
+        -------
+        list of dict with keys "id", META_COLUMNS and "created_at".
+        """
+        if sector is not None:
+            filters = {**sector, **filters}
+
+        def condition(column, value, args):
+            if isinstance(value, tuple):
+                lo, hi = value
+                parts = []
+                if lo is not None:
+                    parts.append(f"{column} >= ?")
+                    args.append(lo)
+                if hi is not None:
+                    parts.append(f"{column} <= ?")
+                    args.append(hi)
+                return " AND ".join(parts) or "1"
+            args.append(value)
+            return f"{column} = ?"
+
+        joins, where, args = [], [], []
+        for k, (name, value) in enumerate(filters.items()):
+            if name in META_COLUMNS:
+                continue
+            alias = f"s{k}"
+            args.append(name)
+            joins.append(f"JOIN run_scalars {alias} ON {alias}.run_id = m.run_id "
+                         f"AND {alias}.name = ? AND "
+                         + condition(f"{alias}.value", value, args))
+        for name, value in filters.items():
+            if name in META_COLUMNS:
+                where.append(condition(f"m.{name}", value, args))
+
+        sql = (f"SELECT m.run_id, {', '.join('m.' + c for c in META_COLUMNS)}, r.created_at "
+               f"FROM run_meta m JOIN runs r ON r.id = m.run_id "
+               + " ".join(joins)
+               + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY m.run_id")
+        rows = self.conn.execute(sql, args).fetchall()
+        return [dict(zip(("id",) + META_COLUMNS + ("created_at",), row)) for row in rows]
+
+    #records the sweep status of a param point
+    def set_status(self, params: dict, status: str, error: str = None):
+
+        assert status in STATUSES, f"status must be one of {STATUSES}"
+        self.conn.execute(
+            """INSERT INTO points (params_hash, params, status, error, updated_at)
+               VALUES (?,?,?,?,CURRENT_TIMESTAMP)
+               ON CONFLICT(params_hash) DO UPDATE SET
+                 status = excluded.status,
+                 error = excluded.error,
+                 updated_at = excluded.updated_at""",
+            (params_key(params), canonical_params(params), status, error))
+        self._commit()
+
+    #records the same sweep status for many param points in one transaction
+    def register_points(self, params_list, status: str = "pending"):
+
+        assert status in STATUSES, f"status must be one of {STATUSES}"
+        self.conn.executemany(
+            """INSERT INTO points (params_hash, params, status, updated_at)
+               VALUES (?,?,?,CURRENT_TIMESTAMP)
+               ON CONFLICT(params_hash) DO UPDATE SET
+                 status = excluded.status,
+                 error = NULL,
+                 updated_at = excluded.updated_at""",
+            [(params_key(p), canonical_params(p), status) for p in params_list])
+        self._commit()
+
+    #returns the sweep status of a param point; runs stored without a status count as done
+    def get_status(self, params: dict):
+
+        key = params_key(params)
+        row = self.conn.execute("SELECT status FROM points WHERE params_hash = ?", (key,)).fetchone()
+        if row is not None:
+            return row[0]
+        row = self.conn.execute("SELECT 1 FROM runs WHERE params_hash = ? LIMIT 1", (key,)).fetchone()
+        return "done" if row is not None else None
+
+    #returns the number of points in each status
+    def status_counts(self) -> dict:
+
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM points GROUP BY status").fetchall()
+        return dict(rows)
+
 
 
 
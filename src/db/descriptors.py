@@ -0,0 +1,87 @@
+"""
+Scalar descriptors extracted from a param dict at insert time, so that runs
+can be selected with indexed SQL instead of comparing the params JSON.
+"""
+import numpy as np
+
+# typed columns of the run_meta table, besides run_id
+META_COLUMNS = ("N", "method", "interaction_range", "n_down", "parity", "momentum")
+
+
+def uniform_value(value):
+    """
+    Single number summarizing a parameter, or None.
+
+    • a scalar number is returned as is
+    • a field vector is uniform if all its entries are equal
+    • a coupling matrix is uniform if all its non-zero entries are equal
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    try:
+        arr = np.asarray(value)
+    except Exception:
+        return None
+    if arr.dtype.kind not in "biuf" or arr.size == 0:
+        return None
+    if arr.ndim == 2:
+        arr = arr[arr != 0]
+        if arr.size == 0:
+            return 0.0
+    arr = arr.ravel()
+    if np.all(arr == arr[0]):
+        return float(arr[0])
+    return None
+
+
+def interaction_range(params: dict):
+    """
+    Largest distance between two sites coupled by any N×N matrix of
+    `params`, measured on a ring: min(|i - j|, N - |i - j|).  A periodic
+    nearest-neighbour chain has range 1, like an open one.
+    """
+    N = params.get("N")
+    rng = None
+    for value in params.values():
+        if not isinstance(value, (list, np.ndarray)):
+            continue
+        arr = np.asarray(value)
+        if arr.ndim != 2 or arr.shape != (N, N) or arr.dtype.kind not in "biufc":
+            continue
+        i, j = np.nonzero(arr)
+        if len(i):
+            d = np.abs(i - j)
+            r = int(np.max(np.minimum(d, N - d)))
+            rng = r if rng is None else max(rng, r)
+    return rng
+
+
+def describe_run(params: dict, method: str = None, sector: dict = None):
+    """
+    Descriptors of one run.
+
+    Returns
+    -------
+    meta : dict
+        Values for META_COLUMNS.
+    scalars : dict
+        {param name: uniform value} for every parameter that reduces to a number.
+    """
+    sector = sector or {}
+    N = params.get("N")
+    meta = {
+        "N": None if N is None else int(N),
+        "method": method,
+        "interaction_range": interaction_range(params),
+        "n_down": sector.get("n_down"),
+        "parity": sector.get("parity"),
+        "momentum": sector.get("momentum"),
+    }
+    scalars = {}
+    for key, value in params.items():
+        v = uniform_value(value)
+        if v is not None:
+            scalars[key] = v
+    return meta, scalars
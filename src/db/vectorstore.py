@@ -0,0 +1,34 @@
+import os
+import numpy as np
+
+class NpyVectorStore:
+    """
+    Keeps eigenvector matrices outside the SQLite file, one `.npy` per run.
+
+    Matrices are written in Fortran order, so every eigenvector (a column)
+    is contiguous on disk and reading one of them from the memory map
+    touches O(dim) bytes, not the whole O(dim·nev) file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, run_id: int, eigvecs: np.ndarray) -> str:
+        """Write the matrix of `run_id` and return its absolute file path."""
+        path = os.path.join(self.directory, f"run_{run_id}.npy")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.asfortranarray(eigvecs))
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def open(path: str) -> np.ndarray:
+        """Read-only memory map of a stored matrix; nothing is read until indexed."""
+        return np.load(path, mmap_mode="r")
+
+    @staticmethod
+    def delete(path: str):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,87 @@
+import queue
+import threading
+from .database import SpectrumDatabase
+
+_STOP = object()
+
+class BackgroundWriter:
+    """
+    Runs SpectrumDatabase writes on a dedicated thread, so that the caller
+    never blocks on disk.
+
+    The thread owns its own connection (opened in WAL mode by default and
+    closed when the thread stops) and executes queued method calls in
+    submission order, committing every `flush_size` writes and whenever
+    the queue runs empty.
+
+        writer = BackgroundWriter("spectra.db")
+        writer.submit("add_run", eigvals, eigvecs, params, callback=print)
+        writer.close()
+
+    An exception raised by a queued call stops the writer; it is re-raised
+    by the next submit(), flush() or close().
+    """
+
+    def __init__(self, path="spectra.db", flush_size: int = 100, max_queue: int = 0, **db_kwargs):
+        db_kwargs.setdefault("wal", True)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run,
+                                        args=(path, flush_size, db_kwargs),
+                                        name="SpectrumDatabaseWriter",
+                                        daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        self._check()
+
+    def _run(self, path, flush_size, db_kwargs):
+        try:
+            db = SpectrumDatabase(path, **db_kwargs)
+        except BaseException as exc:
+            self._error = exc
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            with db.batch(flush_size):
+                while True:
+                    item = self._queue.get()
+                    try:
+                        if item is _STOP:
+                            return
+                        if self._error is None:
+                            name, args, kwargs, callback = item
+                            result = getattr(db, name)(*args, **kwargs)
+                            if callback is not None:
+                                callback(result)
+                        if self._queue.empty():
+                            db.flush()
+                    except BaseException as exc:
+                        self._error = exc
+                    finally:
+                        self._queue.task_done()
+        finally:
+            # the connection belongs to this thread, close it here after the last commit
+            db.conn.close()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError("background database writer failed") from self._error
+
+    def submit(self, name: str, *args, callback=None, **kwargs):
+        """Queue db.<name>(*args, **kwargs); callback(result) runs on the writer thread."""
+        self._check()
+        self._queue.put((name, args, kwargs, callback))
+
+    def flush(self):
+        """Block until every queued call has been executed and committed."""
+        self._queue.join()
+        self._check()
+
+    def close(self):
+        """Flush, commit and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._check()
@@ -1 +1,10 @@
-__all__ = [" build_spin_hamiltonian","process_runs"]
\ No newline at end of file
+from core._lazy import lazy_exports
+
+__all__ = ["build_spin_hamiltonian", "process_runs", "stream_runs"]
+
+# submodules and exports are imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "build_spin_hamiltonian": "helper",
+    "process_runs": "helper",
+    "stream_runs": "helper",
+}, ("evolution", "helper", "kpm", "parallel", "planner", "solvers"))
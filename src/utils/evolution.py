@@ -0,0 +1,114 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import eigh_tridiagonal
+from scipy.sparse.linalg import LinearOperator, aslinearoperator, expm_multiply
+
+METHODS = ("krylov", "expm_multiply")
+
+
+def _lanczos_basis(H, psi: np.ndarray, m: int):
+    """
+    Orthonormal Krylov basis V (dim × k, k <= m) of span{psi, H psi, ...},
+    with the Lanczos coefficients alpha (k,) and beta (k,), where beta[-1]
+    couples to the next (unbuilt) vector and is 0 on breakdown.
+    Full reorthogonalization keeps V orthonormal.
+    """
+    dim = psi.shape[0]
+    V = np.zeros((dim, m), dtype=np.complex128)
+    alpha = np.zeros(m)
+    beta = np.zeros(m)
+    V[:, 0] = psi
+    for j in range(m):
+        w = H @ V[:, j]
+        alpha[j] = np.vdot(V[:, j], w).real
+        w = w - V[:, :j + 1] @ (V[:, :j + 1].conj().T @ w)
+        w = w - V[:, :j + 1] @ (V[:, :j + 1].conj().T @ w)
+        beta[j] = np.linalg.norm(w)
+        if beta[j] < 1e-12 * max(1.0, abs(alpha[j])):
+            beta[j] = 0.0
+            return V[:, :j + 1], alpha[:j + 1], beta[:j + 1]
+        if j + 1 < m:
+            V[:, j + 1] = w / beta[j]
+    return V, alpha, beta
+
+
+def krylov_step(H, psi: np.ndarray, dt: float, krylov_dim: int = 30, tol: float = 1e-10):
+    """
+    One Lanczos-Krylov step of exp(-i H dt) psi with adaptive step size.
+
+    The Krylov basis does not depend on dt, so when the a-posteriori error
+    estimate beta_m |[exp(-i T dt)]_{m,0}| exceeds `tol` the step is halved
+    on the same basis.  Memory is O(krylov_dim · dim).
+
+    Returns
+    -------
+    phi : np.ndarray
+        The propagated state exp(-i H dt_done) psi.
+    dt_done : float
+        The step actually taken (<= dt).
+    """
+    norm = np.linalg.norm(psi)
+    V, alpha, beta = _lanczos_basis(H, psi / norm, krylov_dim)
+    if len(alpha) == 1:
+        w, Q = alpha, np.ones((1, 1))
+    else:
+        w, Q = eigh_tridiagonal(alpha, beta[:-1])
+    while True:
+        c = Q @ (np.exp(-1j * w * dt) * Q[0])
+        if beta[-1] * abs(c[-1]) <= tol or dt < 1e-14:
+            return norm * (V @ c), dt
+        dt /= 2
+
+
+def evolve(H, psi0: np.ndarray, times, method: str = "krylov",
+           krylov_dim: int = 30, tol: float = 1e-10):
+    """
+    Stream the states psi(t) = exp(-i H t) psi0 on a time grid.
+
+    H
+        Hermitian csr_matrix, dense array or LinearOperator, e.g. the output
+        of SpinModelBuilder / SpinBosonModelBuilder .build() or
+        .build_operator().
+    times
+        Ascending times >= 0, measured from psi0 at t = 0.
+    method
+        "krylov"         Lanczos propagator with adaptive sub-steps
+                         (krylov_step); only needs H @ v.
+        "expm_multiply"  scipy.sparse.linalg.expm_multiply per grid interval.
+
+    Only the current state and, for "krylov", a krylov_dim-vector basis are
+    held, so memory stays O(2^N) vectors and no 4^N object is formed.
+
+    Yields (t, psi) for every grid time; psi is reused between yields,
+    copy it to keep it.
+    """
+    assert method in METHODS, f"method must be one of {METHODS}"
+    times = np.asarray(times, dtype=np.float64)
+    assert np.all(times >= 0) and np.all(np.diff(times) >= 0), "times must be ascending and >= 0"
+
+    psi = np.array(psi0, dtype=np.complex128)
+    if method == "expm_multiply":
+        if sp.issparse(H):
+            A, trace = H, H.diagonal().sum()
+        else:
+            # H is Hermitian, so its adjoint (needed for the norm estimate) is H;
+            # the trace only sets a shift and may be left out
+            op = aslinearoperator(H)
+            A = LinearOperator(op.shape, matvec=op.matvec, rmatvec=op.matvec,
+                               matmat=op.matmat, dtype=op.dtype)
+            trace = 0.0
+    t = 0.0
+    dt_try = None
+    for target in times:
+        while target - t > 1e-14 * max(1.0, target):
+            if method == "expm_multiply":
+                dt = target - t
+                psi = expm_multiply(-1j * dt * A, psi, traceA=-1j * dt * trace)
+                t = target
+                continue
+            dt = target - t if dt_try is None else min(dt_try, target - t)
+            psi, dt_done = krylov_step(H, psi, dt, krylov_dim, tol)
+            t += dt_done
+            # grow again after a step that was accepted in full
+            dt_try = 2 * dt_done if dt_done == dt else dt_done
+        yield t, psi
@@ -1,20 +1,31 @@
 import numpy as np
-import sqlite3
-import json
-import scipy.sparse as sp
-from scipy.sparse.linalg import eigsh
-from core.spin import PauliFactory
+import time
+import traceback
+from functools import partial
+from contextlib import nullcontext
+from core.spin import DEFAULT_MAX_BYTES, PauliFactory
 from builders.hambuilder import SpinModelBuilder
-from db.database import SpectrumDatabase
+from db.database import SpectrumDatabase, params_key
+from utils.solvers import solve_sparse, order_for_warm_start
+from core.opbasis import OperatorBasis, default_cache
+from core import instrument
+from core.observables import evaluate_observables
+from utils.planner import STRATEGIES, available_memory, plan_point
+# the process pool, background writer, time evolution and KPM modules are
+# imported where they are used, so that serial sweeps and worker processes
+# start without them
 
-def build_spin_hamiltonian(params: dict):
+def make_spin_builder(params: dict, backend: str = "bitops",
+                      max_bytes: int = DEFAULT_MAX_BYTES) -> SpinModelBuilder:
     """
     params should contain:
       • "N"   : int, number of sites
       • "JXX", "JYY", "JZZ":  N×N coupling matrices (or missing/None)
       • "hX", "hY", "hZ":  length-N field arrays (or missing/None)
 
-    Returns the sparse Hamiltonian (csr_matrix).
+    Returns a SpinModelBuilder (assembly `backend`, see builders.hambuilder)
+    with all terms registered.  `max_bytes` bounds the operator cache of its
+    PauliFactory (used by the "kron" backend).
     """
     # 1) Required parameter
     N = params.get("N")
@@ -22,8 +33,8 @@ def build_spin_hamiltonian(params: dict):
         raise ValueError("Missing required parameter 'N'")
     
     # 2) Initialize factory & builder
-    factory = PauliFactory(N)
-    builder = SpinModelBuilder(factory)
+    factory = PauliFactory(N, max_bytes=max_bytes)
+    builder = SpinModelBuilder(factory, backend=backend)
 
     # 3) Add two-site couplings if provided
     for key, ops in [("JXX", "XX"), ("JYY", "YY"), ("JZZ", "ZZ")]:
@@ -32,7 +43,6 @@ def build_spin_hamiltonian(params: dict):
             J = np.asarray(J)
             if J.shape != (N, N):
                 raise ValueError(f"Parameter '{key}' must be shape ({N},{N})")
-            print(ops)
             builder.add_spin_coupling(ops, J)
 
     # 4) Add single-site fields if provided
@@ -42,17 +52,419 @@ def build_spin_hamiltonian(params: dict):
             h = np.asarray(h)
             if h.shape != (N,):
                 raise ValueError(f"Parameter '{key}' must have length {N}")
-            print(axis)
             builder.add_spin_field(axis, h)
 
-    # 5) Build & return
-    return builder.build()
+    return builder
 
-def process_runs(params_list, path="spectra.db", dense_threshold=12, sparse_k=6):
+def build_spin_hamiltonian(params: dict, matrix_free: bool = False, backend: str = "bitops"):
+    """
+    Build the Hamiltonian described by `params` (see make_spin_builder).
+
+    Returns the sparse Hamiltonian (csr_matrix), or a LinearOperator
+    applying it on the fly if matrix_free is True.
+    """
+    builder = make_spin_builder(params, backend)
+    if matrix_free:
+        with instrument.stage("build_operator"):
+            return builder.build_operator()
+    with instrument.stage("build"):
+        H = builder.build()
+    instrument.record("nnz", H.nnz)
+    return H
+
+def _dense_eigh(H: np.ndarray):
+    """Full spectrum with LAPACK, plus solver stats in the solve_sparse format."""
+    t0 = time.perf_counter()
+    with instrument.stage("eigh"):
+        eigvals, eigvecs = np.linalg.eigh(H)
+    stats = {"solver": "eigh", "iterations": None, "matvecs": None,
+             "wall_time": time.perf_counter() - t0, "warm_start": False}
+    return eigvals, eigvecs, stats
+
+def diagonalize_point(params: dict, dense_threshold=12, sparse_k=6,
+                      matrix_free=False, symmetries=None, solver="eigsh",
+                      which="SA", sigma=None, guess=None, backend="bitops",
+                      strategy=None) -> list:
+    """
+    Build and diagonalize the Hamiltonian of one parameter point.
+
+    Returns a list of spectra, one per symmetry sector (a single entry when
+    no symmetries are used).  Each entry is a dict with keys
+    "eigvals", "eigvecs", "sector" (quantum numbers or None), "method" and
+    "stats" (solver statistics).  `guess` holds eigenvectors of a nearby
+    point used to warm-start the sparse solver.  `strategy` (one of
+    utils.planner.STRATEGIES, e.g. chosen by plan_point) overrides
+    dense_threshold, matrix_free and symmetries.
+    See process_runs for the meaning of the other options.
+    """
+    N = params.get("N")
+    if N is None:
+        raise ValueError("Each params dict must include 'N'")
+
+    if strategy is not None:
+        assert strategy in STRATEGIES, f"strategy must be one of {STRATEGIES}"
+        dense = strategy in ("dense", "symmetry")
+        matrix_free = strategy == "matrix_free"
+        if strategy != "symmetry":
+            symmetries = None
+        elif symmetries is None:
+            symmetries = "auto"
+    else:
+        dense = N <= dense_threshold
+    if dense and symmetries is not None:
+        builder = make_spin_builder(params)
+        syms = builder.symmetries() if symmetries == "auto" else set(symmetries)
+        spectra = []
+        for sector in builder.sectors(syms):
+            with instrument.stage("build_sector"):
+                H_block = builder.build_sector(sector)
+            if H_block.shape[0] == 0:
+                continue
+            instrument.record("sector_dim", H_block.shape[0])
+            with instrument.stage("toarray"):
+                H_dense = H_block.toarray()
+            eigvals, eigvecs, stats = _dense_eigh(H_dense)
+            spectra.append({"eigvals": eigvals, "eigvecs": eigvecs,
+                            "sector": sector.quantum_numbers(), "method": "dense",
+                            "stats": stats})
+        return spectra
+
+    # Build Hamiltonian
+    H_spin = build_spin_hamiltonian(params, matrix_free=matrix_free and not dense,
+                                    backend=backend)
+    dim = H_spin.shape[0]
+
+    # Diagonalize
+    if dense:
+        # full spectrum
+        with instrument.stage("toarray"):
+            H_dense = H_spin.toarray()
+        eigvals, eigvecs, stats = _dense_eigh(H_dense)
+        method = 'dense'
+    else:
+        # sparse: few lowest modes (or closest to sigma)
+        k = min(sparse_k, dim - 2)
+        if guess is not None and np.shape(guess)[0] != dim:
+            guess = None
+        with instrument.stage(solver):
+            eigvals, eigvecs, stats = solve_sparse(H_spin, k, solver=solver, which=which,
+                                                   sigma=sigma, guess=guess)
+        instrument.count("matvecs", stats["matvecs"] or 0)
+        method = 'matrix_free' if matrix_free else 'sparse'
+
+    return [{"eigvals": eigvals, "eigvecs": eigvecs, "sector": None, "method": method,
+             "stats": stats}]
+
+def diagonalize_batch(params_batch, backend: str = "bitops") -> list:
+    """
+    Full spectra of several same-N points with one stacked eigh.
+
+    The dense Hamiltonians are written into a single (B, d, d) array and
+    diagonalized by one np.linalg.eigh call, so the per-point Python and
+    LAPACK setup cost is paid once per batch instead of once per point.
+    Points sharing a term structure are filled in together from one
+    core.opbasis.OperatorBasis, as a single product of its operator
+    matrix with the stacked coefficients.  With backend "cached" the
+    bases come from (and stay in) the process-wide default_cache; with the
+    other backends they are built for the batch and freed with it.
+
+    Returns one spectra list per point, in the format of diagonalize_point
+    without symmetries.  The batch wall time is shared evenly between the
+    points in their solver stats.
+    """
+    sizes = {params.get("N") for params in params_batch}
+    if None in sizes:
+        raise ValueError("Each params dict must include 'N'")
+    if len(sizes) != 1:
+        raise ValueError("All points of a batch must have the same N")
+
+    groups = {}   # term structure -> [(position in batch, coefficients)]
+    for b, params in enumerate(params_batch):
+        signature, coeffs = make_spin_builder(params, backend).term_signature()
+        groups.setdefault(signature, []).append((b, coeffs))
+    if backend == "cached":
+        bases = {signature: default_cache.get(signature) for signature in groups}
+    else:
+        bases = {signature: OperatorBasis(signature) for signature in groups}
+    dim = 2**sizes.pop()
+    dtype = np.result_type(np.float64, *[basis.D.dtype for basis in bases.values()])
+
+    t0 = time.perf_counter()
+    with instrument.stage("batch_fill"):
+        stack = np.zeros((len(params_batch), dim, dim), dtype=dtype)
+        for signature, members in groups.items():
+            basis = bases[signature]
+            positions = np.array([b for b, _ in members])
+            C = np.stack([coeffs for _, coeffs in members], axis=1)
+            rows = np.repeat(np.arange(dim), np.diff(basis.indptr))
+            stack[positions[:, None], rows, basis.indices] = (basis.D @ C).T
+    with instrument.stage("eigh_batched"):
+        eigvals, eigvecs = np.linalg.eigh(stack)
+    wall_time = (time.perf_counter() - t0) / len(params_batch)
+
+    return [[{"eigvals": eigvals[b], "eigvecs": eigvecs[b], "sector": None, "method": "dense",
+              "stats": {"solver": "eigh_batched", "iterations": None, "matvecs": None,
+                        "wall_time": wall_time, "warm_start": False}}]
+            for b in range(len(params_batch))]
+
+def _pending_points(db: SpectrumDatabase, indexed_params, resume: bool):
+    """
+    (index, params) pairs of a sweep that still need computing, lazily:
+    with `resume`, points already done in `db` and repeats are skipped.
+    """
+    seen = set()
+    for index, params in indexed_params:
+        key = params_key(params)
+        if resume and (key in seen or db.get_status(params) == "done"):
+            print(f"Skipped point {index}: N={params.get('N')}, already computed")
+            continue
+        seen.add(key)
+        yield index, params
+
+def _work_units(points, plan_options, dense_threshold: int, batch_size: int):
+    """
+    Group (index, params) pairs into work units, lists of (index, params, plan),
+    lazily.  Every point is planned once, here (plan None without the planner).
+    Points of the dense branch with equal N are collected into chunks of up to
+    `batch_size`, emitted when full and at the end; every other point forms a
+    unit of its own.
+    """
+    open_units = {}
+    for index, params in points:
+        plan = None if plan_options is None else _log_plan(index, params, plan_options)
+        N = params.get("N")
+        if plan is not None:
+            dense = plan["strategy"] == "dense"
+        else:
+            dense = N is not None and N <= dense_threshold
+        if batch_size <= 1 or N is None or not dense:
+            yield [(index, params, plan)]
+            continue
+        unit = open_units.setdefault(N, [])
+        unit.append((index, params, plan))
+        if len(unit) >= batch_size:
+            yield open_units.pop(N)
+    yield from open_units.values()
+
+def _log_plan(index: int, params: dict, plan_options: dict) -> dict:
+    """Plan one point for a sweep (plan_point(params, **plan_options)) and print the decision."""
+    plan = plan_point(params, **plan_options)
+    est = plan["estimates"][plan["strategy"]]
+    print(f"Planned point {index}: N={params['N']}, strategy={plan['strategy']}, "
+          f"spectrum={plan['spectrum']}, nnz~{plan['nnz']}, "
+          f"memory~{est['memory'] / 2**20:.1f} MB, time~{est['time']:.3g} s")
+    return plan
+
+def _plan_options(planner: bool, sparse_k: int, memory_budget, symmetries, spectrum: str,
+                  workers: int):
+    """plan_point options of a sweep, or None without the planner."""
+    if not planner:
+        return None
+    if memory_budget is None:
+        memory_budget = available_memory() // max(workers, 1)
+    return dict(sparse_k=sparse_k, memory_budget=memory_budget, symmetries=symmetries,
+                spectrum=spectrum)
+
+def _diagonalize_unit(params_group: list, guess=None, plans=None, metrics=False,
+                      trace_memory=False, **options) -> list:
+    """
+    Spectra lists of a work unit: one stacked eigh for batches, diagonalize_point
+    otherwise.  `plans` (one per point, from the planner) choose the strategy
+    and are attached to every spectrum; with `metrics` so is the
+    core.instrument snapshot of the unit.
+    """
+    if metrics:
+        with instrument.recording(trace_memory=trace_memory) as rec:
+            results = _diagonalize_unit(params_group, guess, plans, **options)
+        snapshot = rec.snapshot()
+        snapshot["unit_points"] = len(params_group)
+        for spectra in results:
+            for spec in spectra:
+                spec["metrics"] = snapshot
+        return results
+    if plans is None:
+        plans = [None] * len(params_group)
+    if len(params_group) > 1:
+        results = diagonalize_batch(params_group, backend=options.get("backend", "bitops"))
+    else:
+        strategy = None if plans[0] is None else plans[0]["strategy"]
+        results = [diagonalize_point(params_group[0], guess=guess, strategy=strategy, **options)]
+    for plan, spectra in zip(plans, results):
+        for spec in spectra:
+            spec["plan"] = plan
+    return results
+
+def _run_unit(unit, **options):
+    """_diagonalize_unit of a (params_group, plans) work unit, as one pool task."""
+    params_group, plans = unit
+    return _diagonalize_unit(params_group, plans=plans, **options)
+
+def _timed_unit(unit, **options):
+    """_run_unit and its wall time."""
+    t0 = time.perf_counter()
+    results = _run_unit(unit, **options)
+    return results, time.perf_counter() - t0
+
+def _sweep(units, write, store, options: dict, workers: int = 1, blas_threads: int = 1,
+           warm_start: bool = True, max_pending=None, ordered: bool = False):
+    """
+    Driver shared by process_runs and stream_runs: diagonalizes the work
+    units (see _work_units) in this process or in a pool of `workers`,
+    records the point statuses and stores the results.
+
+    Yields (unit, results, compute_time, run_ids) for every stored unit, in
+    the order of the units serially or with `ordered`, in completion order
+    otherwise; run_ids is filled once the writes have run (at once with a
+    direct writer).  In parallel mode a failed unit is marked failed and
+    yielded as (unit, None, None, error); serially the error propagates.
+    """
+    if workers <= 1:
+        previous = {}   # N -> eigenvectors of the last sparse solve
+        for unit in units:
+            group = [params for _, params, _ in unit]
+            for params in group:
+                write("set_status", params, "running")
+            N = group[0].get("N")
+            guess = previous.get(N) if warm_start and len(group) == 1 else None
+            try:
+                results, compute_time = _timed_unit((group, [plan for *_, plan in unit]),
+                                                    guess=guess, **options)
+            except Exception:
+                error = traceback.format_exc()
+                for params in group:
+                    write("set_status", params, "failed", error)
+                raise
+            spectra = results[0]
+            if len(group) == 1 and len(spectra) == 1 and spectra[0]["method"] != "dense":
+                previous[N] = spectra[0]["eigvecs"]
+            run_ids = []
+            store(group, results, callback=run_ids.extend)
+            yield unit, results, compute_time, run_ids
+        return
+
+    submitted = {}   # position among the submitted tasks -> unit
+
+    def tasks():
+        for pos, unit in enumerate(units):
+            submitted[pos] = unit
+            group = [params for _, params, _ in unit]
+            for params in group:
+                write("set_status", params, "running")
+            yield group, [plan for *_, plan in unit]
+
+    task = partial(_timed_unit, **options)
+    if ordered:
+        from utils.parallel import run_parallel
+        items = list(tasks())
+        finished = ((pos, items[pos], result, error)
+                    for pos, result, error in run_parallel(task, items, workers, blas_threads))
+    else:
+        from utils.parallel import run_parallel_unordered
+        finished = run_parallel_unordered(task, tasks(), workers, blas_threads, max_pending)
+    for pos, (group, _), result, error in finished:
+        unit = submitted.pop(pos)
+        if error is not None:
+            for index, params, _ in unit:
+                write("set_status", params, "failed", error)
+                print(f"Failed point {index}: N={params.get('N')}\n{error}")
+            yield unit, None, None, error
+            continue
+        results, compute_time = result
+        run_ids = []
+        store(group, results, callback=run_ids.extend)
+        yield unit, results, compute_time, run_ids
+
+def _direct_writer(db: SpectrumDatabase):
+    """Same interface as BackgroundWriter.submit, executing immediately."""
+    def write(name, *args, callback=None, **kwargs):
+        result = getattr(db, name)(*args, **kwargs)
+        if callback is not None:
+            callback(result)
+    return write
+
+def _store_points(write, params_group: list, results: list, callback=None):
+    """
+    Save every spectrum of a group of parameter points with one bulk insert;
+    callback(run_ids) receives the new run ids in the order of the spectra.
+    """
+    records, messages = [], []
+    for params, spectra in zip(params_group, results):
+        for spec in spectra:
+            sector = "" if spec["sector"] is None else f", sector={spec['sector']}"
+            messages.append(f"N={params['N']}, method={spec['method']}{sector}, "
+                            f"nev={len(spec['eigvals'])}")
+            records.append({"eigvals": spec["eigvals"], "eigvecs": spec["eigvecs"],
+                            "params": params, "sector": spec["sector"],
+                            "method": spec["method"], "stats": spec.get("stats"),
+                            "observables": spec.get("observables"), "plan": spec.get("plan"),
+                            "metrics": spec.get("metrics")})
+
+    def report(run_ids):
+        for run_id, message in zip(run_ids, messages):
+            print(f"Saved run {run_id}: {message}")
+        if callback is not None:
+            callback(run_ids)
+    write("add_runs", records, callback=report)
+
+def _make_store(write, resume: bool, observables, observable_states: int, store_eigvecs: bool,
+                metrics_hook=None):
+    """
+    store(params_group, results, callback=None) of a sweep: evaluates the
+    observables of every spectrum, drops the eigenvectors if they are not
+    kept, replaces partial results and marks the points done.  metrics_hook
+    is called as metrics_hook(run_id, params, metrics) for every stored run.
+    """
+    ground_states = {}   # N -> ground state of the last stored full-space point
+
+    def store(params_group, results, callback=None):
+        for params, spectra in zip(params_group, results):
+            for spec in spectra:
+                full = spec["sector"] is None
+                if observables:
+                    N = params["N"]
+                    values = evaluate_observables(
+                        observables, spec["eigvals"], spec["eigvecs"] if full else None, N,
+                        n_states=observable_states, previous=ground_states.get(N))
+                    if not full and "gap" in values:
+                        # the gap within one sector, not the gap of the spectrum
+                        values["sector_gap"] = values.pop("gap")
+                    spec["observables"] = values
+                    if full:
+                        ground_states[N] = np.array(spec["eigvecs"][:, 0])
+                if not store_eigvecs:
+                    spec["eigvecs"] = None
+        if resume:
+            for params in params_group:
+                write("delete_runs", params)
+        if metrics_hook is not None:
+            runs = [(params, spec.get("metrics")) for params, spectra in zip(params_group, results)
+                    for spec in spectra]
+            user_callback = callback
+
+            def callback(run_ids):
+                for run_id, (params, metrics) in zip(run_ids, runs):
+                    metrics_hook(run_id, params, metrics)
+                if user_callback is not None:
+                    user_callback(run_ids)
+        _store_points(write, params_group, results, callback)
+        for params in params_group:
+            write("set_status", params, "done")
+    return store
+
+def process_runs(params_list, path="spectra.db", dense_threshold=12, sparse_k=6,
+                 matrix_free=False, symmetries=None, workers=1, blas_threads=1,
+                 resume=True, vector_dir=None, wal=False, flush_size=1,
+                 background_writer=False, codecs=None, solver="eigsh", which="SA",
+                 sigma=None, warm_start=True, order_sweep=False, backend="bitops",
+                 dense_batch=1, observables=None, observable_states=1, store_eigvecs=True,
+                 planner=False, memory_budget=None, spectrum="auto", metrics=False,
+                 trace_memory=False, metrics_hook=None):
     """
     Loop over parameter dicts, build and diagonalize each Hamiltonian,
     use dense diagonalization for small N, sparse for larger N,
     and store the resulting eigenvalues in the SQLite database.
+    All points are read up front; see stream_runs to consume a generator
+    of points and iterate over the results while the sweep runs.
 
     params_list : list of dict
         Each dict must include 'N' and optional 'XX','YY','ZZ','HX','HY','HZ'.
@@ -62,47 +474,298 @@ def process_runs(params_list, path="spectra.db", dense_threshold=12, sparse_k=6)
         Maximum N for which to use dense diagonalization.
     sparse_k : int
         Number of smallest eigenvalues to compute when using sparse diagonalization.
+    matrix_free : bool
+        If True, the sparse branch hands eigsh a LinearOperator instead of a
+        CSR matrix, so memory stays O(2^N) for large N.
+    symmetries : None, "auto" or iterable of {"U1", "Z2", "T"}
+        Block-diagonalize the dense branch by symmetry sector.  "auto" uses
+        the symmetries detected from the parameters.  Every sector is stored
+        as its own run, tagged with its quantum numbers.
+    workers : int
+        Number of worker processes.  With workers > 1 the points are built and
+        diagonalized in a process pool while this process alone writes to the
+        database, in the order of params_list.  A failing point is reported
+        and skipped instead of stopping the sweep.
+    blas_threads : int
+        BLAS/OpenMP threads per worker process (parallel mode only).
+    resume : bool
+        Skip points already marked done in the database (looked up by the
+        hashed canonical params), and drop partial results of points left
+        running or failed by an interrupted sweep before recomputing them.
+        Every point's status (pending/running/done/failed) is recorded either way.
+    vector_dir : str or None
+        Write eigenvectors as memory-mappable .npy files in this directory
+        instead of SQLite BLOBs (see SpectrumDatabase).
+    wal : bool
+        Open the database in WAL mode, so it can be queried during the sweep.
+    flush_size : int
+        Number of writes grouped into one transaction (1 commits every write).
+    background_writer : bool
+        Hand all writes to a db.writer.BackgroundWriter thread (WAL mode),
+        so computation never waits on disk.
+    codecs : dict or None
+        Per-column codec specs for the stored arrays, e.g. {"eigvecs": "f32+zlib"}
+        (see db.codecs).
+    solver : {"eigsh", "shift_invert", "lobpcg"}
+        Sparse-branch eigensolver (see utils.solvers.solve_sparse).  Its
+        iteration count, operator applications and wall time are stored
+        per run in the solver_stats table.
+    which : str
+        eigsh target, "SA" for the lowest eigenvalues.
+    sigma : float or None
+        Target energy for "shift_invert".
+    warm_start : bool
+        Serial mode: start the sparse solver from the eigenvectors of the
+        previous point with the same N.
+    order_sweep : bool
+        Visit the points along a nearest-neighbour path in parameter space
+        (utils.solvers.order_for_warm_start) to maximize warm-start reuse.
+    backend : {"bitops", "kron", "cached"}
+        Hamiltonian assembly.  "cached" precomputes the unit operators of each
+        (N, term structure) once in core.opbasis.default_cache, shared by all
+        points and process_runs calls of this process, and assembles every
+        point as one linear combination.
+    dense_batch : int
+        With dense_batch > 1 (and no symmetries), points of the dense branch
+        with the same N are diagonalized together, up to dense_batch at a
+        time, by one stacked np.linalg.eigh (see diagonalize_batch) and
+        bulk-inserted.  Worthwhile for many small-N points.  In parallel
+        mode a batch is one task, and a failure marks all its points failed.
+    observables : iterable of str or None
+        Observable specs evaluated on every spectrum right after
+        diagonalization and stored in the run_observables table, e.g.
+        ["gap", "magnetization", "zz", "entanglement", "fidelity"]
+        (see core.observables).  State-resolved ones need full-space
+        eigenvectors and are skipped for symmetry-sector runs, whose "gap"
+        is stored as "sector_gap" since it is the gap within the sector
+        only; "fidelity" compares with the previously stored point of the
+        same N.
+    observable_states : int
+        State-resolved observables are evaluated on this many lowest states.
+    store_eigvecs : bool
+        If False only eigenvalues and observables are stored, which cuts
+        storage and I/O by a factor of about the Hilbert space dimension.
+    planner : bool
+        Choose dense, symmetry-sector, sparse or matrix-free diagonalization
+        per point with utils.planner.plan_point, from the estimated nnz,
+        memory and time of each, instead of the dense_threshold rule (and
+        the matrix_free flag).  Sectors are only considered with
+        `symmetries`.  The decision and the estimates are printed and
+        stored per run in the run_plans table.
+    memory_budget : int or None
+        Bytes one diagonalization may use when planning (default: the
+        memory available when process_runs starts, per worker).
+    spectrum : {"auto", "full", "lowest"}
+        What the planner may return.  Strategies are only ranked against
+        those with the same output: "full" keeps every eigenvalue (dense or
+        symmetry sectors), "lowest" the sparse_k lowest (sparse or
+        matrix-free), and "auto" the full spectrum whenever it fits the
+        memory budget, the sparse_k lowest otherwise (as dense_threshold
+        does by N).
+    metrics : bool
+        Profile every point with core.instrument: stage timers (build,
+        toarray, eigh, the sparse solver, ...), nnz, operator cache hits
+        and misses, matvecs and peak RSS are stored per run in the
+        run_metrics table (SpectrumDatabase.get_metrics / aggregate_metrics),
+        together with the serialization and insert time of the run.
+        Points of a dense batch share the metrics of their batch.
+    trace_memory : bool
+        With metrics, also record the peak heap of each point with
+        tracemalloc (exact per point, but slows allocations down).
+    metrics_hook : callable or None
+        Called as metrics_hook(run_id, params, metrics) after each run is
+        stored (on the writer thread with background_writer), e.g. to
+        aggregate over the sweep while it runs.
+
+    Returns
+    -------
+    list of (index, params, traceback) for the points that failed
+    (always empty in serial mode, where errors propagate).
     """
     # Initialize database
-    db = SpectrumDatabase(path)
+    db = SpectrumDatabase(path, vector_dir=vector_dir, wal=wal or background_writer,
+                          codecs=codecs)
+    options = dict(dense_threshold=dense_threshold, sparse_k=sparse_k,
+                   matrix_free=matrix_free, symmetries=symmetries,
+                   solver=solver, which=which, sigma=sigma, backend=backend)
+    plan_options = _plan_options(planner, sparse_k, memory_budget, symmetries, spectrum,
+                                 workers)
+    if metrics:
+        options.update(metrics=True, trace_memory=trace_memory)
 
-    for params in params_list:
-        N = params.get("N")
-        if N is None:
-            raise ValueError("Each params dict must include 'N'")
+    points = list(_pending_points(db, enumerate(params_list), resume))
+    if order_sweep:
+        points = [points[i] for i in order_for_warm_start([params for _, params in points])]
+    db.register_points([params for _, params in points], "pending")
 
-        # Build Hamiltonian
-        H_spin = build_spin_hamiltonian(params)
-        dim = H_spin.shape[0]
+    if background_writer:
+        from db.writer import BackgroundWriter
+        writer = BackgroundWriter(path, flush_size=flush_size, vector_dir=vector_dir,
+                                  codecs=codecs)
+        write = writer.submit
+        batch = nullcontext()
+    else:
+        writer = None
+        write = _direct_writer(db)
+        batch = db.batch(flush_size)
 
-        # Diagonalize
-        if N <= dense_threshold:
-            # full spectrum
-            H_dense = H_spin.toarray()
-            eigvals, eigvecs = np.linalg.eigh(H_dense)
-            method = 'dense'
-        else:
-            # sparse: few lowest modes
-            k = min(sparse_k, dim - 2)
-            eigvals, eigvecs = spla.eigsh(H_spin, k=k, which='SM')
-            idx = np.argsort(eigvals)
-            eigvals = eigvals[idx]
-            eigvecs = eigvecs[:, idx]
-            method = 'sparse'
+    store = _make_store(write, resume, observables, observable_states, store_eigvecs,
+                        metrics_hook)
+    units = _work_units(points, plan_options, dense_threshold,
+                        dense_batch if symmetries is None else 1)
+    failures = []
+    try:
+        with batch:
+            for unit, results, _, error in _sweep(units, write, store, options, workers,
+                                                  blas_threads, warm_start, ordered=True):
+                if results is None:
+                    failures += [(index, params, error) for index, params, _ in unit]
+        return failures
+    finally:
+        if writer is not None:
+            writer.close()
 
-        # Ensure params dict is JSON-serializable
-        #serial_params = {}
-        #for key, val in params.items():
-        #    if isinstance(val, np.ndarray):
-        #        serial_params[key] = val.tolist()
-        #    else:
-        #        serial_params[key] = val
+def stream_runs(params_iter, path="spectra.db", dense_threshold=12, sparse_k=6,
+                matrix_free=False, symmetries=None, workers=1, blas_threads=1,
+                max_pending=None, resume=True, vector_dir=None, wal=False, flush_size=1,
+                codecs=None, solver="eigsh", which="SA", sigma=None, warm_start=True,
+                backend="bitops", dense_batch=1, observables=None, observable_states=1,
+                store_eigvecs=True, planner=False, memory_budget=None, spectrum="auto",
+                metrics=False, trace_memory=False, metrics_hook=None):
+    """
+    Streaming version of process_runs.
+
+    `params_iter` may be any iterable, e.g. a generator producing the points
+    of a large grid on the fly: points are pulled only when there is room
+    for them, so at most `max_pending` work units (default 2 * workers) are
+    held or being computed at a time, and a point is dropped once stored.
+    Results are stored and yielded as they complete, in completion order
+    when workers > 1, as
+
+        (run_id, params, eigvals, timing)
+
+    one per stored run (one per symmetry sector with `symmetries`), where
+    timing = {"compute": s, "solver": s, "elapsed": s} gives the build and
+    diagonalization time of the point, the solver time alone, and the time
+    since the sweep started.  Stopping the iteration early commits what was
+    stored and cancels the queued work; the points not reached stay pending
+    or running and are recomputed by a resumed sweep.
+
+    Writes happen in the consuming thread, between yields (there is no
+    background writer); open the database with `wal` to query it from
+    elsewhere during the sweep.  Points failing in parallel mode are marked
+    failed and reported, but not yielded.  order_sweep is not available, as
+    it needs all points up front.  See process_runs for the other options.
+    """
+    db = SpectrumDatabase(path, vector_dir=vector_dir, wal=wal, codecs=codecs)
+    options = dict(dense_threshold=dense_threshold, sparse_k=sparse_k,
+                   matrix_free=matrix_free, symmetries=symmetries,
+                   solver=solver, which=which, sigma=sigma, backend=backend)
+    plan_options = _plan_options(planner, sparse_k, memory_budget, symmetries, spectrum,
+                                 workers)
+    if metrics:
+        options.update(metrics=True, trace_memory=trace_memory)
+    write = _direct_writer(db)
+    store = _make_store(write, resume, observables, observable_states, store_eigvecs,
+                        metrics_hook)
+    units = _work_units(_pending_points(db, enumerate(params_iter), resume), plan_options,
+                        dense_threshold, dense_batch if symmetries is None else 1)
+    t_start = time.perf_counter()
+
+    with db.batch(flush_size):
+        for unit, results, compute_time, run_ids in _sweep(units, write, store, options, workers,
+                                                           blas_threads, warm_start,
+                                                           max_pending):
+            if results is None:
+                continue
+            ids = iter(run_ids)
+            elapsed = time.perf_counter() - t_start
+            for (_, params, _), spectra in zip(unit, results):
+                for spec in spectra:
+                    timing = {"compute": compute_time / len(unit),
+                              "solver": spec["stats"]["wall_time"], "elapsed": elapsed}
+                    yield next(ids), params, spec["eigvals"], timing
+
+def quench_trajectory(initial_params: dict, final_params: dict, times,
+                      observables=("magnetization", "fidelity"), method="krylov",
+                      matrix_free=False, backend="bitops", dense_threshold=12,
+                      krylov_dim=30, tol=1e-10):
+    """
+    Quench from the ground state of `initial_params` to the Hamiltonian of
+    `final_params` (same N), streaming observables along the time grid.
+
+    The initial ground state comes from a dense eigh for N <= dense_threshold
+    (unless matrix_free) and from the sparse solver otherwise; the state is
+    then propagated by utils.evolution.evolve with `method`, so only O(2^N)
+    vectors are held.  `observables` are core.observables specs evaluated
+    on psi(t); "fidelity" gives the return amplitude |<psi(0)|psi(t)>|.
 
-        # Save spectrum + parameters
-        #run_id = db.add_run(eigvals, eigvecs, serial_params)
-        run_id = db.add_run(eigvals, eigvecs,params)
-        print(f"Saved run {run_id}: N={N}, method={method}, nev={len(eigvals)}")
+    Yields (t, {spec: value}) for every time of the grid.
+    """
+    from utils.evolution import evolve
+
+    N = initial_params.get("N")
+    if N is None or final_params.get("N") != N:
+        raise ValueError("Initial and final params must include the same 'N'")
+
+    H_i = build_spin_hamiltonian(initial_params, matrix_free=matrix_free, backend=backend)
+    if N <= dense_threshold and not matrix_free:
+        psi0 = np.linalg.eigh(H_i.toarray())[1][:, 0]
+    else:
+        psi0 = solve_sparse(H_i, 1)[1][:, 0]
+    del H_i
+    H_f = build_spin_hamiltonian(final_params, matrix_free=matrix_free, backend=backend)
+
+    no_eigvals = np.zeros(0)
+    for t, psi in evolve(H_f, psi0, times, method=method, krylov_dim=krylov_dim, tol=tol):
+        values = evaluate_observables(observables, no_eigvals, psi[:, None], N, previous=psi0)
+        # state-resolved observables carry a leading axis of length 1
+        yield t, {spec: v[0] if np.ndim(v) else v for spec, v in values.items()}
+
+def run_quench(initial_params: dict, final_params: dict, times, path=None, **options):
+    """
+    Run quench_trajectory over the whole grid and stack each observable into
+    an array over `times`.  With a database `path` the trajectory is stored
+    (SpectrumDatabase.add_trajectory) next to the spectra.
 
+    Returns (trajectory id or None, times, {spec: array}).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    series = {}
+    for _, values in quench_trajectory(initial_params, final_params, times, **options):
+        for spec, v in values.items():
+            series.setdefault(spec, []).append(v)
+    series = {spec: np.asarray(v) for spec, v in series.items()}
 
+    traj_id = None
+    if path is not None:
+        db = SpectrumDatabase(path)
+        traj_id = db.add_trajectory(times, series, final_params, initial_params=initial_params,
+                                    method=options.get("method", "krylov"))
+        print(f"Saved trajectory {traj_id}: N={final_params['N']}, steps={len(times)}")
+    return traj_id, times, series
 
+def kpm_point(params: dict, path=None, n_moments=256, n_random=10, matrix_free=True,
+              backend="bitops", seed=0):
+    """
+    Chebyshev moments of the Hamiltonian of one point (utils.kpm), from
+    H @ v products only, so N of 20-26 is reachable with matrix_free.
+    With a database `path` they are stored (SpectrumDatabase.add_kpm_moments),
+    and DOS / thermodynamic curves can later be rebuilt from the record with
+    utils.kpm.kpm_dos and kpm_thermodynamics.
+
+    Returns (moments id or None,
+             {"moments", "scale", "shift", "dim", "e_min", "e_max", "n_random"}).
+    """
+    from utils.kpm import chebyshev_moments
 
+    H = build_spin_hamiltonian(params, matrix_free=matrix_free, backend=backend)
+    moments, scale, shift, (e_min, e_max) = chebyshev_moments(
+        H, n_moments=n_moments, n_random=n_random, seed=seed)
+    record = {"moments": moments, "scale": scale, "shift": shift, "dim": H.shape[0],
+              "e_min": e_min, "e_max": e_max, "n_random": n_random}
+    kpm_id = None
+    if path is not None:
+        kpm_id = SpectrumDatabase(path).add_kpm_moments(params=params, **record)
+        print(f"Saved moments {kpm_id}: N={params['N']}, n_moments={n_moments}")
+    return kpm_id, record
@@ -0,0 +1,207 @@
+"""
+Kernel polynomial method: density of states and thermodynamics from
+Chebyshev moments, using only H @ v products.
+
+The spectrum is mapped onto [-1, 1] by H~ = (H - shift) / scale and the
+normalized moments
+
+    mu_n = Tr T_n(H~) / dim
+
+are estimated stochastically with random-phase vectors.  From the moments
+(and the Jackson kernel) the DOS, and with it Z(T), E(T), C(T) and S(T),
+are reconstructed at any energy or temperature without touching H again.
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, aslinearoperator
+
+
+def gershgorin_bounds(H):
+    """
+    (E_min, E_max) from the Gershgorin discs of an explicit (sparse or
+    dense) matrix: always enclosing the spectrum, but often loose.
+    """
+    H = sp.csr_matrix(H)
+    d = H.diagonal().real
+    radius = np.asarray(abs(H).sum(axis=1)).ravel() - np.abs(H.diagonal())
+    return float(np.min(d - radius)), float(np.max(d + radius))
+
+
+def spectral_bounds(H, n_lanczos: int = 40, seed: int = 0, margin: float = 0.05):
+    """
+    (E_min, E_max) enclosing the spectrum, from a short Lanczos run without
+    stored basis (three vectors): the extreme Ritz values widened by their
+    residual norms, then by `margin` times the width on each side, as the
+    residual estimate is not a guarantee.
+    """
+    op = aslinearoperator(H)
+    dim = op.shape[0]
+    rng = np.random.default_rng(seed)
+    v = rng.standard_normal(dim).astype(np.result_type(op.dtype, np.float64))
+    v /= np.linalg.norm(v)
+    v_prev = np.zeros_like(v)
+    alpha, beta = [], []
+    b = 0.0
+    for _ in range(min(n_lanczos, dim)):
+        w = op.matvec(v) - b * v_prev
+        a = np.vdot(v, w).real
+        w -= a * v
+        alpha.append(a)
+        b = np.linalg.norm(w)
+        if b < 1e-12:
+            break
+        beta.append(b)
+        v_prev, v = v, w / b
+    k = len(alpha)
+    T = np.diag(alpha) + np.diag(beta[:k - 1], 1) + np.diag(beta[:k - 1], -1)
+    ritz, S = np.linalg.eigh(T)
+    # residual of Ritz pair i is beta_k |S[k-1, i]|
+    last = beta[k - 1] if len(beta) >= k else 0.0
+    lo, hi = ritz[0] - last * abs(S[-1, 0]), ritz[-1] + last * abs(S[-1, -1])
+    pad = margin * max(hi - lo, 1e-12)
+    return lo - pad, hi + pad
+
+
+def chebyshev_moments(H, n_moments: int = 256, n_random: int = 10, bounds=None,
+                      epsilon: float = 0.01, seed: int = 0, n_lanczos: int = 40):
+    """
+    Stochastic estimate of the normalized Chebyshev moments of H.
+
+    H
+        Hermitian csr_matrix or LinearOperator (e.g. build_operator()).
+    n_random
+        Number of random-phase vectors in the trace estimate; the error
+        of each moment decreases as 1/sqrt(n_random · dim).
+    bounds
+        (E_min, E_max); estimated with spectral_bounds if None.  The
+        interval is widened by a relative `epsilon` so that H~ stays
+        strictly inside [-1, 1].
+
+    Vectors are processed one at a time, with the moment-doubling recursion
+    (n_moments / 2 products per vector), so memory is three 2^N vectors.
+
+    With the spectrum inside the interval every |mu_n| <= 1; a larger one
+    means the recursion diverged.  Estimated bounds are then replaced by
+    the Gershgorin bounds of an explicit matrix and the moments recomputed,
+    otherwise ValueError is raised.
+
+    Returns
+    -------
+    moments : np.ndarray, shape (n_moments,), moments[0] = 1
+    scale, shift : float
+        H~ = (H - shift) / scale.
+    bounds : (float, float)
+        The spectral bounds used.
+    """
+    op = aslinearoperator(H)
+    lo, hi = spectral_bounds(op, n_lanczos, seed) if bounds is None else bounds
+    moments, scale, shift = _moments(op, lo, hi, n_moments, n_random, epsilon, seed)
+    if not np.all(np.abs(moments) <= 1 + 1e-8) and bounds is None \
+            and not isinstance(H, LinearOperator):
+        lo, hi = gershgorin_bounds(H)
+        moments, scale, shift = _moments(op, lo, hi, n_moments, n_random, epsilon, seed)
+    if not np.all(np.abs(moments) <= 1 + 1e-8):
+        raise ValueError(f"Chebyshev moments diverge: spectrum not inside ({lo}, {hi})")
+    return moments, scale, shift, (lo, hi)
+
+
+def _moments(op, lo: float, hi: float, n_moments: int, n_random: int, epsilon: float,
+             seed: int):
+    """Normalized moments for the interval (lo, hi), and scale, shift."""
+    dim = op.shape[0]
+    scale = (hi - lo) / (2 - epsilon)
+    shift = (hi + lo) / 2
+
+    def apply(v):
+        return (op.matvec(v) - shift * v) / scale
+
+    rng = np.random.default_rng(seed)
+    half = (n_moments + 1) // 2
+    total = np.zeros(2 * half)
+    for _ in range(n_random):
+        if np.dtype(op.dtype).kind == "c":
+            r = np.exp(2j * np.pi * rng.random(dim))
+        else:
+            r = rng.choice([-1.0, 1.0], size=dim)
+        mu = np.zeros(2 * half)
+        a_prev, a_cur = r, apply(r)
+        mu[0] = np.vdot(r, r).real
+        mu[1] = np.vdot(r, a_cur).real
+        for n in range(1, half):
+            a_next = 2 * apply(a_cur) - a_prev
+            mu[2 * n] = 2 * np.vdot(a_cur, a_cur).real - mu[0]
+            mu[2 * n + 1] = 2 * np.vdot(a_cur, a_next).real - mu[1]
+            a_prev, a_cur = a_cur, a_next
+        total += mu
+    return total[:n_moments] / (n_random * dim), scale, shift
+
+
+def jackson_kernel(n_moments: int) -> np.ndarray:
+    """Jackson damping factors g_n, suppressing Gibbs oscillations."""
+    M = n_moments + 1
+    n = np.arange(n_moments)
+    return ((M - n) * np.cos(np.pi * n / M) + np.sin(np.pi * n / M) / np.tan(np.pi / M)) / M
+
+
+def _node_weights(moments: np.ndarray, n_points: int):
+    """Chebyshev–Gauss nodes x_k of [-1, 1] and the spectral weight of each."""
+    g = jackson_kernel(len(moments)) * moments
+    x = np.cos(np.pi * (np.arange(n_points) + 0.5) / n_points)
+    T = np.cos(np.outer(np.arange(len(moments)), np.arccos(x)))
+    weights = (g[0] + 2 * g[1:] @ T[1:]) / n_points
+    return x, weights
+
+
+def kpm_dos(moments: np.ndarray, scale: float, shift: float, energies=None,
+            n_points: int = 1024):
+    """
+    Density of states per state (integrates to 1) at `energies`
+    (default: n_points Chebyshev nodes over the spectral interval).
+
+    Returns (energies, rho).
+    """
+    g = jackson_kernel(len(moments)) * moments
+    if energies is None:
+        x = np.cos(np.pi * (np.arange(n_points) + 0.5) / n_points)[::-1]
+        energies = scale * x + shift
+    else:
+        energies = np.asarray(energies, dtype=np.float64)
+        x = np.clip((energies - shift) / scale, -1 + 1e-12, 1 - 1e-12)
+    T = np.cos(np.outer(np.arange(len(moments)), np.arccos(x)))
+    rho = (g[0] + 2 * g[1:] @ T[1:]) / (np.pi * np.sqrt(1 - x**2) * scale)
+    return energies, rho
+
+
+def kpm_thermodynamics(moments: np.ndarray, scale: float, shift: float, dim: int,
+                       temperatures, e_min: float = None, n_points: int = 2048) -> dict:
+    """
+    Canonical thermodynamics from the moments, by Chebyshev–Gauss
+    quadrature of the DOS (Boltzmann factors shifted by the lowest
+    energy for stability).
+
+    The kernel broadens every level by about pi·scale/n_moments, so the
+    curves are reliable for temperatures above that resolution.  Passing
+    the lower spectral bound `e_min` drops the kernel tail more than one
+    resolution below the ground state, whose exponentially enhanced
+    Boltzmann weight otherwise dominates at low temperature.
+
+    Returns {"energy", "specific_heat", "entropy", "free_energy"}, arrays
+    over `temperatures` (k_B = 1); energy and free energy are totals.
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    x, weights = _node_weights(moments, n_points)
+    E = scale * x + shift
+    if e_min is not None:
+        keep = E >= e_min - np.pi * scale / len(moments)
+        weights = weights[keep] * weights.sum() / weights[keep].sum()
+        E = E[keep]
+    E0 = E.min()
+    boltz = weights[None, :] * np.exp(-(E[None, :] - E0) / temperatures[:, None])
+    Z = boltz.sum(axis=1)
+    U = boltz @ E / Z
+    U2 = boltz @ E**2 / Z
+    F = E0 - temperatures * np.log(dim * Z)
+    return {"energy": U,
+            "specific_heat": (U2 - U**2) / temperatures**2,
+            "entropy": (U - F) / temperatures,
+            "free_energy": F}
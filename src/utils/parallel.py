@@ -0,0 +1,137 @@
+import os
+import traceback
+import multiprocessing as mp
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+# environment variables read by the common BLAS/OpenMP runtimes at load time
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                 "BLIS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@contextmanager
+def blas_threads_env(n_threads: int):
+    """
+    Temporarily set the BLAS thread-count variables, so that processes
+    spawned inside the block load their BLAS with `n_threads` threads.
+    """
+    saved = {k: os.environ.get(k) for k in BLAS_ENV_VARS}
+    for k in BLAS_ENV_VARS:
+        os.environ[k] = str(n_threads)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def _init_worker(n_threads: int):
+    # the env vars only help if BLAS was not loaded yet; threadpoolctl
+    # (optional) also caps an already loaded library
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(n_threads)
+
+
+def _call(func, index, item):
+    try:
+        return index, func(item), None
+    except Exception:
+        return index, None, traceback.format_exc()
+
+
+def run_parallel(func, items, workers: int, blas_threads: int = 1):
+    """
+    Apply `func` to every item in a spawn-based process pool.
+
+    Results are yielded as (index, result, error) in input order, as soon
+    as every earlier item has finished, so a single consumer sees the same
+    sequence whatever the completion order.  An exception in `func` does not
+    stop the pool: it is returned as a formatted traceback in `error`
+    (with result None).
+
+    Parameters
+    ----------
+    func : callable
+        Module-level (picklable) function of one argument.
+    items : list
+        Arguments, one per task.
+    workers : int
+        Number of worker processes.
+    blas_threads : int
+        BLAS/OpenMP threads per worker, to avoid oversubscribing the cores.
+    """
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=ctx,
+                             initializer=_init_worker,
+                             initargs=(blas_threads,)) as pool:
+        # workers are started on first submit, so they inherit the limits
+        with blas_threads_env(blas_threads):
+            futures = {pool.submit(_call, func, i, item): i for i, item in enumerate(items)}
+        done = {}
+        next_index = 0
+        for fut in as_completed(futures):
+            try:
+                index, result, error = fut.result()
+            except Exception:
+                # worker died (e.g. killed by the OOM killer)
+                index = futures[fut]
+                result, error = None, traceback.format_exc()
+            done[index] = (result, error)
+            while next_index in done:
+                result, error = done.pop(next_index)
+                yield next_index, result, error
+                next_index += 1
+
+
+def run_parallel_unordered(func, items, workers: int, blas_threads: int = 1,
+                           max_pending: int = None):
+    """
+    Streaming variant of run_parallel.
+
+    `items` may be any iterable, e.g. a generator: it is consumed lazily,
+    so that at most `max_pending` tasks (default 2 * workers) are queued or
+    running at any time, and results are yielded as soon as they finish, as
+    (index, item, result, error) in completion order.  Closing the generator
+    early cancels the tasks not started yet.
+    """
+    if max_pending is None:
+        max_pending = 2 * workers
+    assert max_pending >= 1, "max_pending must be at least 1"
+    items = enumerate(items)
+    ctx = mp.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers,
+                               mp_context=ctx,
+                               initializer=_init_worker,
+                               initargs=(blas_threads,))
+    pending = {}   # future -> (index, item)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                with blas_threads_env(blas_threads):
+                    pending[pool.submit(_call, func, index, item)] = (index, item)
+            if not pending:
+                return
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                index, item = pending.pop(fut)
+                try:
+                    _, result, error = fut.result()
+                except Exception:
+                    # worker died (e.g. killed by the OOM killer)
+                    result, error = None, traceback.format_exc()
+                yield index, item, result, error
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
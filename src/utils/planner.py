@@ -0,0 +1,277 @@
+"""
+Resource planner: choose how to diagonalize a point before building it.
+
+From the term descriptors alone (no matrix is formed) it estimates the
+number of nonzeros of H and, for every strategy,
+
+    "dense"        toarray + LAPACK eigh, full spectrum
+    "symmetry"     dense eigh of every symmetry sector
+    "sparse"       CSR matrix + eigsh for the k lowest states
+    "matrix_free"  LinearOperator + eigsh, O(2^N) memory
+
+the peak memory and the wall time.  The first two return every
+eigenvalue, the last two only the k lowest, so they are not
+interchangeable: plan() picks the fastest strategy whose memory fits the
+budget among those giving the requested spectrum ("full", "lowest", or
+"auto" for the full spectrum whenever it fits and the k lowest
+otherwise).  The time model is a rough one
+(calibrated on a single multi-core machine, see the constants below) and
+is only meant to rank the strategies; its figures are stored with every
+run planned by process_runs so they can be compared with the measured
+solver_stats afterwards.
+"""
+import os
+from math import comb
+import numpy as np
+from core.bitops import FLIP_AXES, iter_spin_strings, is_complex, site_mask
+from core.boson import as_modes, boson_dim, boson_operator
+from core.spinboson import site_couplings
+
+STRATEGIES = ("dense", "symmetry", "sparse", "matrix_free")
+FULL_SPECTRUM = ("dense", "symmetry")      # every eigenvalue
+LOWEST = ("sparse", "matrix_free")         # the k lowest eigenvalues
+SPECTRA = ("auto", "full", "lowest")
+
+DEFAULT_BUDGET = 4 * 2**30   # bytes, when the available memory cannot be read
+
+# time model, in seconds per elementary operation
+EIGH_RATE   = 3e10    # flop/s of a dense eigh with eigenvectors (9 d^3 flops)
+T_NNZ       = 1.5e-9  # one stored nonzero in a CSR product
+T_BUILD     = 2e-8    # one nonzero during assembly (COO buffer + tocsr)
+T_VECTOR    = 2e-9    # one entry of a Lanczos vector per iteration
+T_STRING    = 5e-9    # one Pauli string on one basis state, matrix-free
+
+
+def available_memory() -> int:
+    """Physical memory currently available, in bytes (DEFAULT_BUDGET if unknown)."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return DEFAULT_BUDGET
+
+
+def _spin_masks(N: int, fields, couplings):
+    """Distinct XOR masks of the flipping strings, whether any string is diagonal, and the string count."""
+    masks, diagonal, n_strings = set(), False, 0
+    for _, ops, sites in iter_spin_strings(N, fields, couplings):
+        n_strings += 1
+        mask = 0
+        for a, site in zip(ops, sites):
+            if a in FLIP_AXES:
+                mask |= site_mask(N, site)
+        if mask:
+            masks.add(mask)
+        else:
+            diagonal = True
+    return masks, diagonal, n_strings
+
+
+def estimate_spin(N: int, fields, couplings) -> dict:
+    """
+    Size of a spin Hamiltonian read off its descriptors, as for
+    core.bitops.assemble_spin_hamiltonian.
+
+    Every flipping string maps each basis state to exactly one other, so
+    all strings with the same XOR mask fill the same 2^N positions; the
+    nnz is 2^N per distinct mask plus 2^N for the diagonal.  It is an upper
+    bound, reached unless terms cancel (e.g. XX + YY on one pair, or
+    σ+/σ- strings that vanish on part of the basis).
+
+    Returns {"dim", "nnz", "n_strings", "n_masks", "complex"}.
+    """
+    fields, couplings = list(fields), list(couplings)
+    dim = 2**N
+    masks, diagonal, n_strings = _spin_masks(N, fields, couplings)
+    return {"dim": dim, "nnz": dim * (len(masks) + diagonal), "n_strings": n_strings,
+            "n_masks": len(masks),
+            "complex": is_complex([a for a, _ in fields] + [o for o, _ in couplings])}
+
+
+def _bands(n_max: int, key: str) -> set:
+    """Diagonals (row - col offsets) occupied by a single-mode operator."""
+    op = boson_operator(n_max, key).tocoo()
+    return set((op.row - op.col).tolist())
+
+
+def estimate_spinboson(builder) -> dict:
+    """
+    estimate_spin for a builders.hambuilder.SpinBosonModelBuilder, on the
+    full modes ⊗ spins space.
+
+    A term shifts the occupation of one mode by a band offset and the spins
+    by an XOR mask; every distinct (mode shift, mask) pair fills at most
+    `dim` positions.
+    """
+    modes = as_modes(builder.modes)
+    N = builder.onesitespin_builder.args[0].N
+    fields = builder.onesitespin_builder._descr
+    couplings = builder.twositespin_builder._descr
+    masks, diagonal, n_strings = _spin_masks(N, fields, couplings)
+    dim = boson_dim(modes) * 2**N
+
+    # (mode, occupation shift, spin mask), with mode None for shift 0
+    patterns = {(None, 0, mask) for mask in masks}
+    if diagonal:
+        patterns.add((None, 0, 0))
+    for key, _, mode in builder.boson_builder._descr:
+        for band in _bands(modes[mode].n_max, key):
+            patterns.add((mode if band else None, band, 0))
+            n_strings += 1
+    for bkey, axis, g, mode in builder.coupling_builder._descr:
+        g_all = site_couplings(g, N)
+        for band in _bands(modes[mode].n_max, bkey):
+            for i in np.flatnonzero(g_all):
+                mask = site_mask(N, int(i)) if axis in FLIP_AXES else 0
+                patterns.add((mode if band else None, band, mask))
+                n_strings += 1
+    complex_ = (is_complex([a for a, _ in fields] + [o for o, _ in couplings]
+                           + [axis for _, axis, _, _ in builder.coupling_builder._descr])
+                or any(boson_operator(modes[mode].n_max, key).dtype.kind == "c"
+                       for key, _, mode in builder.boson_builder._descr)
+                or any(boson_operator(modes[mode].n_max, bkey).dtype.kind == "c"
+                       for bkey, _, _, mode in builder.coupling_builder._descr))
+    return {"dim": dim, "nnz": dim * len(patterns), "n_strings": n_strings,
+            "n_masks": len(patterns), "complex": complex_}
+
+
+def sector_dims(N: int, symmetries) -> list:
+    """
+    Approximate block sizes for the symmetry names: binomial for U1, halved
+    by Z2 (at half filling only, see core.symmetry.enumerate_sectors) and
+    divided by N for T.
+    """
+    symmetries = set(symmetries)
+    blocks = [comb(N, n) for n in range(N + 1)] if "U1" in symmetries else [2**N]
+    if "Z2" in symmetries:
+        if "U1" in symmetries:
+            if N % 2 == 0:
+                half = blocks.pop(N // 2)
+                blocks += [half // 2, half - half // 2]
+        else:
+            blocks = [2**(N - 1)] * 2
+    if "T" in symmetries:
+        blocks = [-(-d // N) for d in blocks for _ in range(N)]
+    return blocks
+
+
+def estimate_costs(size: dict, k: int = 6, blocks=None) -> dict:
+    """
+    Peak memory (bytes) and wall time (s) of every strategy for a
+    Hamiltonian of `size` (estimate_spin / estimate_spinboson) when k
+    eigenpairs are needed from the iterative ones.  "symmetry" is included
+    only when `blocks` (sector dimensions) is given.
+
+    Returns {strategy: {"memory", "time"}}.
+    """
+    dim, nnz = size["dim"], size["nnz"]
+    item = 16 if size["complex"] else 8
+    ncv = min(dim, max(2 * k + 1, 20))
+    matvecs = 40 * k + 50
+    csr = nnz * (item + 4) + (dim + 1) * 4
+    assembly = nnz * (item + 16)              # COO buffer, alive next to the CSR
+    lanczos = (ncv + k) * dim * item
+
+    costs = {
+        # H, eigenvectors and the divide-and-conquer workspace, next to the CSR
+        "dense": {"memory": csr + 4 * dim**2 * item,
+                  "time": nnz * T_BUILD + 9 * dim**3 / EIGH_RATE},
+        "sparse": {"memory": max(csr + assembly, csr + lanczos),
+                   "time": nnz * T_BUILD + matvecs * (nnz * T_NNZ + ncv * dim * T_VECTOR)},
+        # diagonal, basis integers and a few work vectors
+        "matrix_free": {"memory": 6 * dim * 8 + lanczos,
+                        "time": matvecs * dim * (size["n_strings"] * T_STRING
+                                                 + (size["n_masks"] + ncv) * T_VECTOR)},
+    }
+    if blocks is not None:
+        blocks = [d for d in blocks if d]
+        largest = max(blocks)
+        costs["symmetry"] = {"memory": 6 * dim * 8 + 4 * largest**2 * item
+                                       + largest * nnz // dim * (item + 4),
+                             "time": nnz * T_BUILD * len(blocks) / max(dim // largest, 1)
+                                     + sum(9 * d**3 for d in blocks) / EIGH_RATE}
+    return costs
+
+
+def choose_strategy(costs: dict, memory_budget: int, k: int, dim: int,
+                    spectrum: str = "auto"):
+    """
+    Fastest strategy of `costs` whose memory fits `memory_budget`, among
+    those returning `spectrum`: FULL_SPECTRUM ones for "full", LOWEST ones
+    for "lowest" (they need k < dim - 1, else the full spectrum is
+    computed), and for "auto" the full spectrum if one of its strategies
+    fits, the k lowest otherwise.  Falls back to the one with the least
+    memory when none fits.
+    """
+    assert spectrum in SPECTRA, f"spectrum must be one of {SPECTRA}"
+    full = [s for s in costs if s in FULL_SPECTRUM]
+    lowest = [s for s in costs if s in LOWEST and k < dim - 1]
+    if spectrum == "auto":
+        fits = [s for s in full if costs[s]["memory"] <= memory_budget]
+        candidates = full if fits or not lowest else lowest
+    else:
+        candidates = full if spectrum == "full" or not lowest else lowest
+    if not candidates:
+        candidates = list(costs)
+    feasible = [s for s in candidates if costs[s]["memory"] <= memory_budget]
+    if feasible:
+        return min(feasible, key=lambda s: costs[s]["time"])
+    return min(candidates, key=lambda s: costs[s]["memory"])
+
+
+def plan(size: dict, k: int = 6, memory_budget: int = None, blocks=None,
+         strategies=None, spectrum: str = "auto") -> dict:
+    """
+    Estimate every strategy for a Hamiltonian of `size` and pick one.
+
+    memory_budget
+        Bytes available to one diagonalization (default available_memory()).
+    strategies
+        Restrict the choice to these strategies.
+    spectrum
+        "full", "lowest" (k eigenpairs) or "auto", see choose_strategy.
+
+    Returns {"strategy", "spectrum", "memory_budget", "dim", "nnz", "k",
+    "estimates"}, with estimates = {strategy: {"memory", "time",
+    "feasible"}} and spectrum the one the strategy returns ("full" or
+    "lowest").
+    """
+    if memory_budget is None:
+        memory_budget = available_memory()
+    costs = estimate_costs(size, k, blocks)
+    if strategies is not None:
+        costs = {s: c for s, c in costs.items() if s in strategies}
+    assert costs, f"strategies must name at least one of {STRATEGIES}"
+    strategy = choose_strategy(costs, memory_budget, k, size["dim"], spectrum)
+    for c in costs.values():
+        c["feasible"] = c["memory"] <= memory_budget
+    return {"strategy": strategy, "spectrum": "full" if strategy in FULL_SPECTRUM else "lowest",
+            "memory_budget": int(memory_budget), "dim": size["dim"], "nnz": size["nnz"],
+            "k": k, "estimates": costs}
+
+
+def plan_point(params: dict, sparse_k: int = 6, memory_budget: int = None,
+               symmetries=None, strategies=None, spectrum: str = "auto") -> dict:
+    """
+    plan() for a parameter point in the format of utils.helper.make_spin_builder.
+    "symmetry" is considered when `symmetries` is given ("auto" detects
+    them from the descriptors) and at least one is conserved.
+    """
+    from core.symmetry import detect_symmetries
+
+    N = params.get("N")
+    if N is None:
+        raise ValueError("Each params dict must include 'N'")
+    fields = [(axis, np.asarray(params[key])) for key, axis in
+              (("hX", "X"), ("hY", "Y"), ("hZ", "Z"))
+              if params.get(key) is not None and np.any(params[key])]
+    couplings = [(ops, np.asarray(params[key])) for key, ops in
+                 (("JXX", "XX"), ("JYY", "YY"), ("JZZ", "ZZ"))
+                 if params.get(key) is not None and np.any(params[key])]
+    blocks = None
+    if symmetries is not None:
+        syms = detect_symmetries(N, fields, couplings) if symmetries == "auto" \
+            else set(symmetries)
+        if syms:
+            blocks = sector_dims(N, syms)
+    return plan(estimate_spin(N, fields, couplings), sparse_k, memory_budget, blocks,
+                strategies, spectrum)
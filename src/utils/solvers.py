@@ -0,0 +1,144 @@
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, aslinearoperator, eigsh, lobpcg, splu
+
+SOLVERS = ("eigsh", "shift_invert", "lobpcg")
+
+
+class _CountingOperator(LinearOperator):
+    """Wraps an operator and counts how many vectors it has been applied to."""
+
+    def __init__(self, A):
+        self.A = aslinearoperator(A)
+        self.count = 0
+        super().__init__(self.A.dtype, self.A.shape)
+
+    def _matvec(self, v):
+        self.count += 1
+        return self.A.matvec(v)
+
+    def _matmat(self, V):
+        self.count += V.shape[1]
+        return self.A.matmat(V)
+
+
+def _start_block(guess, dim: int, k: int, dtype, seed: int = 0) -> np.ndarray:
+    """k starting vectors: the columns of `guess` first, random ones after."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((dim, k))
+    if guess is not None:
+        guess = np.asarray(guess).reshape(dim, -1)
+        m = min(k, guess.shape[1])
+        X = X.astype(np.result_type(X.dtype, guess.dtype))
+        X[:, :m] = guess[:, :m]
+    return X.astype(np.result_type(X.dtype, dtype), copy=False)
+
+
+def solve_sparse(H, k: int, solver: str = "eigsh", which: str = "SA", sigma: float = None,
+                 guess: np.ndarray = None, tol: float = None, maxiter: int = None):
+    """
+    Few eigenpairs of a sparse matrix or LinearOperator H.
+
+    solver
+        "eigsh"        ARPACK Lanczos with `which` ("SA" = lowest energies);
+                       the first column of `guess` is used as starting vector.
+        "shift_invert" ARPACK on (H - sigma)^-1 with a sparse LU factorization:
+                       the k eigenvalues closest to `sigma` (interior spectrum).
+                       Needs H as a sparse matrix.
+        "lobpcg"       block preconditioner-free LOBPCG for the lowest k,
+                       warm-started from the columns of `guess`.
+
+    `tol` defaults to each solver's own default (machine precision for ARPACK).
+
+    Returns
+    -------
+    eigvals : np.ndarray, sorted ascending
+    eigvecs : np.ndarray
+    stats : dict
+        "solver", "iterations" (solver iterations, or operator applications
+        where the solver does not report them), "matvecs", "wall_time",
+        "warm_start".
+    """
+    assert solver in SOLVERS, f"solver must be one of {SOLVERS}"
+    dim = H.shape[0]
+    op = _CountingOperator(H)
+    t0 = time.perf_counter()
+    iterations = None
+
+    if solver == "eigsh":
+        v0 = None if guess is None else np.asarray(guess).reshape(dim, -1)[:, 0]
+        eigvals, eigvecs = eigsh(op, k=k, which=which, v0=v0, tol=tol or 0, maxiter=maxiter)
+    elif solver == "shift_invert":
+        if sigma is None:
+            raise ValueError("shift_invert needs a target energy 'sigma'")
+        if not sp.issparse(H):
+            raise ValueError("shift_invert needs H as a sparse matrix, not a LinearOperator")
+        lu = splu(sp.csc_matrix(H - sigma * sp.identity(dim, dtype=H.dtype, format="csc")))
+        solves = _CountingOperator(LinearOperator(H.shape, matvec=lu.solve,
+                                                  dtype=np.result_type(H.dtype, np.float64)))
+        v0 = None if guess is None else np.asarray(guess).reshape(dim, -1)[:, 0]
+        eigvals, eigvecs = eigsh(H, k=k, sigma=sigma, which="LM", OPinv=solves,
+                                 v0=v0, tol=tol or 0, maxiter=maxiter)
+        iterations = solves.count
+    else:
+        X = _start_block(guess, dim, k, H.dtype)
+        eigvals, eigvecs, history = lobpcg(op, X, largest=False, tol=tol,
+                                           maxiter=maxiter or 500,
+                                           retResidualNormsHistory=True)
+        iterations = len(history)
+
+    idx = np.argsort(eigvals)
+    stats = {"solver": solver,
+             "iterations": op.count if iterations is None else iterations,
+             "matvecs": op.count,
+             "wall_time": time.perf_counter() - t0,
+             "warm_start": guess is not None}
+    return eigvals[idx], eigvecs[:, idx], stats
+
+
+def _numeric_vector(params: dict) -> np.ndarray:
+    """All numeric entries of a param dict, flattened in sorted-key order."""
+    parts = []
+    for key in sorted(params):
+        try:
+            arr = np.asarray(params[key], dtype=np.float64).ravel()
+        except (TypeError, ValueError):
+            continue
+        parts.append(arr)
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def order_for_warm_start(params_list) -> list:
+    """
+    Visiting order (list of indices) that keeps consecutive points close.
+
+    Points are grouped by N; inside a group a greedy nearest-neighbour
+    path over the flattened numeric parameters is built, starting from the
+    first point of the group in input order.
+    """
+    params_list = list(params_list)
+    groups = {}
+    for i, params in enumerate(params_list):
+        groups.setdefault(params.get("N"), []).append(i)
+
+    order = []
+    for N in sorted(groups, key=lambda n: (n is None, n)):
+        idx = groups[N]
+        vecs = [_numeric_vector(params_list[i]) for i in idx]
+        if len({len(v) for v in vecs}) != 1:
+            # different parameter layouts; no meaningful distance
+            order.extend(idx)
+            continue
+        X = np.stack(vecs)
+        left = np.ones(len(idx), dtype=bool)
+        cur = 0
+        for _ in range(len(idx)):
+            order.append(idx[cur])
+            left[cur] = False
+            if not left.any():
+                break
+            d = np.sum((X - X[cur])**2, axis=1)
+            d[~left] = np.inf
+            cur = int(np.argmin(d))
+    return order
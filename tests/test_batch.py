@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from core.opbasis import default_cache
+from utils.helper import diagonalize_batch, diagonalize_point
+
+
+def tfim(N, h):
+    return {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+
+
+@pytest.mark.parametrize("backend", ["bitops", "kron", "cached"])
+def test_batch_matches_single_points(backend):
+    points = [tfim(5, h) for h in (0.3, 0.8, 1.4)]
+    default_cache.clear()
+    batch = diagonalize_batch(points, backend=backend)
+    # only the "cached" backend keeps operator bases after the batch
+    assert (default_cache.stats()["entries"] > 0) == (backend == "cached")
+    for params, spectra in zip(points, batch):
+        ref = diagonalize_point(params)[0]["eigvals"]
+        np.testing.assert_allclose(spectra[0]["eigvals"], ref, atol=1e-10)
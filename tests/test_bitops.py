@@ -0,0 +1,40 @@
+import numpy as np
+
+from builders.hambuilder import SpinModelBuilder
+from core.spin import PauliFactory
+
+N = 5
+
+
+def random_model(builder, seed=0):
+    rng = np.random.default_rng(seed)
+    for axis in "XYZ":
+        builder.add_spin_field(axis, rng.normal(size=N))
+    for ops in ("XX", "YY", "ZZ", "XZ"):
+        builder.add_spin_coupling(ops, np.triu(rng.normal(size=(N, N)), k=1))
+    return builder
+
+
+def test_bitops_matches_kron():
+    ref = random_model(SpinModelBuilder(PauliFactory(N), "kron")).build()
+    H = random_model(SpinModelBuilder(PauliFactory(N), "bitops")).build()
+    assert H.dtype == ref.dtype
+    assert abs(H - ref).max() < 1e-12
+    np.testing.assert_allclose(H.toarray(), H.toarray().conj().T, atol=1e-12)
+
+
+def complex_hopping(builder):
+    # J e^{iφ} σ+_i σ-_j + h.c., complex through its coefficients only
+    J = np.exp(0.9j) * np.eye(N, k=1)
+    builder.add_spin_coupling("+-", J).add_spin_coupling("-+", J.conj())
+    builder.add_spin_field("Z", np.linspace(0.1, 0.5, N))
+    return builder
+
+
+def test_complex_coefficients_are_kept():
+    ref = complex_hopping(SpinModelBuilder(PauliFactory(N), "kron")).build()
+    H = complex_hopping(SpinModelBuilder(PauliFactory(N), "bitops")).build()
+    assert H.dtype == np.complex128
+    assert abs(H - ref).max() < 1e-12
+    np.testing.assert_allclose(np.linalg.eigvalsh(H.toarray()),
+                               np.linalg.eigvalsh(ref.toarray()), atol=1e-12)
@@ -0,0 +1,19 @@
+import numpy as np
+
+from core import boson
+from core.boson import boson_operator
+
+
+def test_fixed_operators_are_shared_and_read_only():
+    a = boson_operator(4, "a")
+    assert boson_operator(4, "a") is a
+    assert not a.data.flags.writeable
+    np.testing.assert_allclose((a.T @ a).diagonal(), np.arange(5))
+
+
+def test_displacements_are_not_cached():
+    before = len(boson._OPERATORS)
+    D = boson_operator(6, "D:0.3+0.1j").toarray()
+    boson_operator(6, "D:0.4")
+    assert len(boson._OPERATORS) == before
+    np.testing.assert_allclose(D.conj().T @ D, np.eye(7), atol=1e-12)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from db import codecs
+from db.database import SpectrumDatabase
+
+
+@pytest.fixture
+def arrays():
+    rng = np.random.default_rng(0)
+    real = rng.normal(size=(16, 4))
+    return {"real": real, "complex": real + 1j * rng.normal(size=(16, 4))}
+
+
+@pytest.mark.parametrize("spec", ["zlib", "lzma", "zlib:9", "f32", "f32+zlib",
+                                  "sparse:1e-8+lzma"])
+@pytest.mark.parametrize("kind", ["real", "complex"])
+def test_codec_round_trip(arrays, spec, kind):
+    arr = arrays[kind]
+    data, info = codecs.encode(arr, spec)
+    out = codecs.decode(data, info, arr.shape, str(arr.dtype))
+    assert out.shape == arr.shape and out.dtype == arr.dtype
+    assert np.max(np.abs(out - arr)) <= info["max_abs_error"] + 1e-15
+    if "f32" not in spec and "sparse" not in spec:
+        np.testing.assert_array_equal(out, arr)
+
+
+def test_sparse_codec_drops_small_entries():
+    arr = np.array([1.0, 1e-12, 0.0, -2.0])
+    data, info = codecs.encode(arr, "sparse:1e-8")
+    np.testing.assert_array_equal(codecs.decode(data, info, arr.shape, "float64"),
+                                  [1.0, 0.0, 0.0, -2.0])
+
+
+def test_database_decodes_with_the_stored_codec(tmp_path, arrays):
+    path = str(tmp_path / "c.db")
+    db = SpectrumDatabase(path, codecs={"eigvecs": "f32+zlib", "eigvals": "zlib"})
+    eigvals, eigvecs = np.arange(4.0), arrays["complex"]
+    run_id = db.add_run(eigvals, eigvecs, {"N": 4})
+    # a reader with other settings still decodes the row
+    reader = SpectrumDatabase(path)
+    np.testing.assert_array_equal(reader.get_eigvals(run_id), eigvals)
+    np.testing.assert_allclose(reader.get_eigvecs(run_id), eigvecs, atol=1e-6)
+    assert reader.get_codecs(run_id)["eigvecs"]["spec"] == "f32+zlib"
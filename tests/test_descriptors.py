@@ -0,0 +1,22 @@
+import numpy as np
+
+from db.database import SpectrumDatabase
+from db.descriptors import interaction_range
+
+N = 6
+
+
+def test_interaction_range_on_a_ring():
+    chain = np.eye(N, k=1)
+    assert interaction_range({"N": N, "JXX": chain}) == 1
+    assert interaction_range({"N": N, "JXX": chain + np.eye(N, k=N - 1)}) == 1
+    assert interaction_range({"N": N, "JZZ": np.eye(N, k=3)}) == 3
+    assert interaction_range({"N": N, "hZ": np.ones(N)}) is None
+
+
+def test_query_finds_periodic_chains(tmp_path):
+    db = SpectrumDatabase(str(tmp_path / "d.db"))
+    ring = np.eye(N, k=1) + np.eye(N, k=N - 1)
+    run_id = db.add_run(np.zeros(2), None, {"N": N, "JXX": ring})
+    db.add_run(np.zeros(2), None, {"N": N, "JXX": np.eye(N, k=2)})
+    assert [r["id"] for r in db.query_runs(interaction_range=(None, 1))] == [run_id]
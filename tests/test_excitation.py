@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from builders.hambuilder import SpinBosonModelBuilder
+from core.boson import BosonMode
+from core.spin import PauliFactory
+
+
+def tavis_cummings(N=2, n_max=3, exchange=True):
+    mode = BosonMode(n_max)
+    b = SpinBosonModelBuilder(PauliFactory(N), mode)
+    b.add_boson_term("n", 1.0)
+    b.add_spin_field("Z", 0.4 * np.ones(N))
+    if exchange:
+        # σxσx + σyσy = 2(σ+σ- + σ-σ+) conserves K, neither string does alone
+        J = 0.3 * np.eye(N, k=1)
+        b.add_spin_coupling("XX", J)
+        b.add_spin_coupling("YY", J)
+    b.add_spin_boson("a", "+", 0.2)
+    b.add_spin_boson("adag", "-", 0.2)
+    return b
+
+
+@pytest.mark.parametrize("exchange", [False, True])
+def test_blocks_are_restrictions_of_full_hamiltonian(exchange):
+    b = tavis_cummings(exchange=exchange)
+    H = b.build().toarray()
+    for K in range(4):
+        flat = b.excitation_basis(K)[0]
+        block = b.build_excitation_block(K).toarray()
+        np.testing.assert_allclose(block, H[np.ix_(flat, flat)], atol=1e-12)
+
+
+def test_blocks_leave_no_coupling_outside():
+    b = tavis_cummings()
+    H = b.build().toarray()
+    flat = np.concatenate([b.excitation_basis(K)[0] for K in range(4)])
+    rest = np.setdiff1d(np.arange(H.shape[0]), flat)
+    # states with K > n_max couple only among themselves
+    np.testing.assert_allclose(H[np.ix_(flat, rest)], 0, atol=1e-12)
+
+
+def test_non_conserving_term_raises():
+    b = tavis_cummings()
+    b.add_spin_field("X", 0.1 * np.ones(2))
+    with pytest.raises(ValueError):
+        b.build_excitation_block(1)
+
+
+def test_block_spectra_cover_the_full_spectrum():
+    b = tavis_cummings(N=2, n_max=3)
+    full = np.linalg.eigvalsh(b.build().toarray())
+    blocks = [b.build_excitation_block(K).toarray() for K in range(3 + 2 + 1)]
+    union = np.sort(np.concatenate([np.linalg.eigvalsh(B) for B in blocks if len(B)]))
+    np.testing.assert_allclose(union, full, atol=1e-10)
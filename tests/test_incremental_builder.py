@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from builders.hambuilder import SpinBosonModelBuilder, SpinModelBuilder
+from core.boson import BosonMode
+from core.spin import PauliFactory
+
+N = 6
+
+
+def fresh(backend, h, J):
+    b = SpinModelBuilder(PauliFactory(N), backend)
+    b.add_spin_field("Z", h).add_spin_coupling("XX", J).add_spin_coupling("YY", J)
+    return b.build()
+
+
+@pytest.mark.parametrize("backend", ["bitops", "kron", "cached"])
+def test_updates_match_fresh_build(backend):
+    rng = np.random.default_rng(1)
+    h, J = rng.random(N), np.eye(N, k=1) * rng.random(N)
+    b = SpinModelBuilder(PauliFactory(N), backend)
+    b.add_spin_field("Z", h).add_spin_field("X", 0.3 * h)
+    b.add_spin_coupling("XX", J).add_spin_coupling("YY", 0.7 * J)
+    b.build()
+    b.update_spin_coupling(1, "YY", 0.2 * J)
+    b.build()
+    b.remove_spin_field(1)
+    b.build()
+    b.update_spin_coupling(1, "YY", J)
+    H, F = b.build(), fresh(backend, h, J)
+    assert abs(H - F).max() < 1e-12
+    assert H.nnz == F.nnz
+
+
+def test_in_place_mutation_does_not_leak_into_descriptors():
+    h, J = 0.5 * np.ones(N), np.eye(N, k=1)
+    b = SpinModelBuilder(PauliFactory(N))
+    b.add_spin_field("Z", h).add_spin_coupling("XX", J).add_spin_coupling("YY", J)
+    b.build()
+    h *= 2
+    b.update_spin_field(0, "Z", h)
+    assert abs(b.build() - fresh("bitops", h, J)).max() < 1e-12
+
+
+def test_spinboson_updates_match_fresh_build():
+    def make():
+        b = SpinBosonModelBuilder(PauliFactory(3), BosonMode(3))
+        b.add_boson_term("n", 1.0).add_spin_field("Z", 0.4 * np.ones(3))
+        b.add_spin_boson("a", "+", 0.2).add_spin_boson("adag", "-", 0.2)
+        return b
+
+    b = make()
+    b.build()
+    b.update_spin_boson(0, "a", "+", 0.5)
+    b.build()
+    b.update_spin_boson(0, "a", "+", 0.2)
+    H, F = b.build(), make().build()
+    assert abs(H - F).max() < 1e-12
+    assert H.nnz == F.nnz
+
+
+def test_tiny_untouched_entries_survive_updates():
+    # a field 1e-16 times the others is kept by a fresh build, and must be kept
+    # when an unrelated term is updated
+    h_small = np.full(N, 1e-16)
+    b = SpinModelBuilder(PauliFactory(N))
+    b.add_spin_field("X", h_small).add_spin_coupling("ZZ", np.eye(N, k=1))
+    b.build()
+    b.update_spin_coupling(0, "ZZ", 2 * np.eye(N, k=1))
+    F = SpinModelBuilder(PauliFactory(N))
+    F.add_spin_field("X", h_small).add_spin_coupling("ZZ", 2 * np.eye(N, k=1))
+    H, F = b.build(), F.build()
+    assert H.nnz == F.nnz
+    assert abs(H - F).max() < 1e-12
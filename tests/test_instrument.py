@@ -0,0 +1,21 @@
+import sys
+
+from core import instrument
+
+
+def test_snapshot_records_stages_and_counts():
+    with instrument.recording() as rec:
+        with instrument.stage("build"):
+            instrument.count("pauli_hit", 2)
+    snap = rec.snapshot()
+    assert snap["build_calls"] == 1 and snap["pauli_hit"] == 2
+    assert snap["peak_rss_bytes"] > 0
+
+
+def test_snapshot_without_resource_module(monkeypatch):
+    # None in sys.modules makes `import resource` raise ImportError, as on Windows
+    monkeypatch.setitem(sys.modules, "resource", None)
+    with instrument.recording() as rec:
+        instrument.count("pauli_miss")
+    snap = rec.snapshot()
+    assert snap["pauli_miss"] == 1 and "peak_rss_bytes" not in snap
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from scipy.sparse.linalg import aslinearoperator
+
+from utils import kpm
+from utils.helper import build_spin_hamiltonian
+from utils.kpm import chebyshev_moments, gershgorin_bounds, spectral_bounds
+
+PARAMS = {"N": 8, "JXX": np.eye(8, k=1), "hZ": 0.7 * np.ones(8)}
+
+
+@pytest.fixture(scope="module")
+def H():
+    return build_spin_hamiltonian(PARAMS)
+
+
+def test_bounds_enclose_the_spectrum(H):
+    e = np.linalg.eigvalsh(H.toarray())
+    for lo, hi in (spectral_bounds(H), gershgorin_bounds(H)):
+        assert lo < e[0] and e[-1] < hi
+
+
+def test_moments_stay_bounded(H):
+    moments, *_ = chebyshev_moments(H, n_moments=64, n_random=4)
+    assert np.isclose(moments[0], 1) and np.all(np.abs(moments) <= 1 + 1e-8)
+
+
+def test_too_narrow_bounds_raise_for_operators(H):
+    with pytest.raises(ValueError):
+        chebyshev_moments(aslinearoperator(H), n_moments=64, n_random=2, bounds=(-1.0, 1.0))
+
+
+def test_underestimated_bounds_fall_back_to_gershgorin(H, monkeypatch):
+    monkeypatch.setattr(kpm, "spectral_bounds", lambda *args: (-1.0, 1.0))
+    moments, _, _, bounds = chebyshev_moments(H, n_moments=64, n_random=2)
+    assert bounds == gershgorin_bounds(H)
+    assert np.all(np.abs(moments) <= 1 + 1e-8)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from builders.hambuilder import SpinBosonModelBuilder, SpinModelBuilder
+from core.boson import BosonMode
+from core.spin import PauliFactory
+
+N = 5
+
+
+def dense(op):
+    return op @ np.eye(op.shape[1])
+
+
+def test_spin_operator_matches_matrix():
+    rng = np.random.default_rng(0)
+    b = SpinModelBuilder(PauliFactory(N))
+    for axis in "XYZ":
+        b.add_spin_field(axis, rng.normal(size=N))
+    for ops in ("XX", "YY", "ZZ"):
+        b.add_spin_coupling(ops, np.triu(rng.normal(size=(N, N)), k=1))
+    np.testing.assert_allclose(dense(b.build_operator()), b.build().toarray(), atol=1e-12)
+
+
+def test_spinboson_operator_matches_matrix():
+    b = SpinBosonModelBuilder(PauliFactory(3), BosonMode(3))
+    b.add_spin_field("Z", np.array([0.3, 0.5, 0.7])).add_spin_coupling("XX", np.eye(3, k=1))
+    b.add_boson_term("n", 1.0).add_spin_boson("x", "Z", 0.2)
+    np.testing.assert_allclose(dense(b.build_operator()), b.build().toarray(), atol=1e-12)
+
+
+def test_complex_coefficients():
+    J = np.exp(0.9j) * np.eye(N, k=1)
+    b = SpinModelBuilder(PauliFactory(N))
+    b.add_spin_coupling("+-", J).add_spin_coupling("-+", J.conj())
+    b.add_spin_field("Z", np.linspace(0.1, 0.5, N))
+    op = b.build_operator()
+    assert op.dtype == np.complex128
+    np.testing.assert_allclose(dense(op), b.build().toarray(), atol=1e-12)
+
+
+def test_spinboson_operator_with_complex_spin_coupling():
+    b = SpinBosonModelBuilder(PauliFactory(3), BosonMode(3))
+    J = np.exp(0.4j) * np.eye(3, k=1)
+    b.add_spin_coupling("+-", J).add_spin_coupling("-+", J.conj())
+    b.add_boson_term("n", 1.0).add_spin_boson("a", "+", 0.2).add_spin_boson("adag", "-", 0.2)
+    np.testing.assert_allclose(dense(b.build_operator()), b.build().toarray(), atol=1e-12)
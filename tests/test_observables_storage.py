@@ -0,0 +1,65 @@
+import numpy as np
+
+from db.database import SpectrumDatabase
+from utils.helper import process_runs
+
+
+def tfim(N, h=0.7):
+    return {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+
+
+POINTS = [tfim(4, h) for h in (0.2, 0.5, 0.8, 1.1)]
+
+
+def test_per_state_observable_is_stored(tmp_path):
+    # magnetization has shape (observable_states,) = (1,), a size-1 array with ndim 1
+    path = str(tmp_path / "obs.db")
+    process_runs([tfim(4)], path, observables=["gap", "magnetization"])
+    db = SpectrumDatabase(path)
+    run_id = db.get_run_param(tfim(4))[0]
+    obs = db.get_observables(run_id)
+    eigvals = db.get_eigvals(run_id)
+    assert np.isclose(obs["gap"], eigvals[1] - eigvals[0])
+    assert np.shape(obs["magnetization"]) == (1,)
+
+
+def test_add_observables_size_one_array(tmp_path):
+    db = SpectrumDatabase(str(tmp_path / "obs.db"))
+    run_id = db.add_run(np.zeros(2), None, {"N": 1})
+    db.add_observables(run_id, {"m": np.array([0.25]), "c": np.array([1.0 + 1.0j])})
+    value = db.conn.execute("SELECT value FROM run_observables WHERE run_id = ? AND name = 'm'",
+                            (run_id,)).fetchone()[0]
+    assert value == 0.25
+    obs = db.get_observables(run_id)
+    assert np.allclose(obs["m"], [0.25]) and np.allclose(obs["c"], [1.0 + 1.0j])
+
+
+def test_observables_without_eigenvectors(tmp_path):
+    path = str(tmp_path / "s.db")
+    options = dict(observables=["gap", "magnetization", "fidelity"], store_eigvecs=False,
+                   dense_batch=2)
+    process_runs(POINTS, path, **options)
+    db = SpectrumDatabase(path)
+    for i, params in enumerate(POINTS):
+        (run_id,) = db.get_run_param(params)
+        eigvals, obs = db.get_eigvals(run_id), db.get_observables(run_id)
+        assert db.get_eigvecs(run_id) is None
+        assert np.isclose(obs["gap"], eigvals[1] - eigvals[0])
+        # fidelity compares with the previous point, so the first one has none
+        assert set(obs) == {"gap", "magnetization"} | ({"fidelity"} if i else set())
+        if i:
+            assert 0 < obs["fidelity"] <= 1 + 1e-12
+
+
+def test_sector_runs_store_a_sector_gap(tmp_path):
+    path = str(tmp_path / "obs.db")
+    ring = np.eye(4, k=1) + np.eye(4, k=3)
+    params = {"N": 4, "JXX": ring, "JYY": ring, "hZ": 0.2 * np.ones(4)}
+    process_runs([params], path, observables=["gap"], symmetries=["U1"])
+    db = SpectrumDatabase(path)
+    run_ids = db.get_run_param(params)
+    assert len(run_ids) > 1
+    names = set()
+    for run_id in run_ids:
+        names |= set(db.get_observables(run_id))
+    assert names == {"sector_gap"}
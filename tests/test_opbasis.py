@@ -0,0 +1,29 @@
+import numpy as np
+
+from builders.hambuilder import SpinModelBuilder
+from core.opbasis import OperatorBasisCache
+from core.spin import PauliFactory
+
+N = 5
+
+
+def xxz(builder, jz, h):
+    builder.add_spin_coupling("XX", np.eye(N, k=1)).add_spin_coupling("YY", np.eye(N, k=1))
+    builder.add_spin_coupling("ZZ", jz * np.eye(N, k=1)).add_spin_field("Z", h * np.ones(N))
+    return builder
+
+
+def test_cached_backend_matches_bitops():
+    for jz, h in ((0.5, 0.1), (1.5, 0.7)):
+        ref = xxz(SpinModelBuilder(PauliFactory(N)), jz, h).build()
+        H = xxz(SpinModelBuilder(PauliFactory(N), "cached"), jz, h).build()
+        assert abs(H - ref).max() < 1e-12
+
+
+def test_points_with_one_term_structure_share_a_basis():
+    cache = OperatorBasisCache()
+    for jz, h in ((0.5, 0.1), (1.5, 0.7), (2.0, 0.3)):
+        b = xxz(SpinModelBuilder(PauliFactory(N)), jz, h)
+        H = cache.assemble(N, b._onesitespin_builder._descr, b._twositespin_builder._descr)
+        assert abs(H - b.build()).max() < 1e-12
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 2
@@ -0,0 +1,21 @@
+import numpy as np
+
+from db.database import SpectrumDatabase
+from utils.helper import process_runs
+
+
+def tfim(N, h):
+    return {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+
+
+POINTS = [tfim(4, h) for h in (0.2, 0.5, 0.8, 1.1)]
+
+
+def test_parallel_sweep_matches_serial(tmp_path):
+    serial, parallel = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    process_runs(POINTS, serial)
+    assert process_runs(POINTS, parallel, workers=2) == []
+    a, b = SpectrumDatabase(serial), SpectrumDatabase(parallel)
+    for params in POINTS:
+        np.testing.assert_allclose(a.get_eigvals(a.get_run_param(params)[0]),
+                                   b.get_eigvals(b.get_run_param(params)[0]), atol=1e-12)
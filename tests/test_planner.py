@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from db.database import SpectrumDatabase
+from utils import helper
+from utils.helper import process_runs, stream_runs
+from utils.planner import FULL_SPECTRUM, LOWEST, plan_point
+
+
+def tfim(N, h=0.7):
+    return {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+
+
+def test_auto_prefers_the_full_spectrum_when_it_fits():
+    plan = plan_point(tfim(8), memory_budget=2**30)
+    assert plan["strategy"] in FULL_SPECTRUM and plan["spectrum"] == "full"
+
+
+def test_auto_falls_back_to_lowest_when_full_does_not_fit():
+    plan = plan_point(tfim(10), memory_budget=10 * 2**20)
+    assert plan["strategy"] in LOWEST and plan["spectrum"] == "lowest"
+
+
+def test_lowest_spectrum_needs_opt_in():
+    plan = plan_point(tfim(8), memory_budget=2**30, spectrum="lowest")
+    assert plan["strategy"] in LOWEST
+    with pytest.raises(AssertionError):
+        plan_point(tfim(8), spectrum="some")
+
+
+def test_planned_point_stores_the_full_spectrum(tmp_path):
+    path = str(tmp_path / "plan.db")
+    process_runs([tfim(8)], path, planner=True, memory_budget=2**30)
+    db = SpectrumDatabase(path)
+    run_id = db.get_run_param(tfim(8))[0]
+    assert len(db.get_eigvals(run_id)) == 256
+    assert db.get_plan(run_id)["spectrum"] == "full"
+
+
+def count_plans(monkeypatch):
+    calls = []
+
+    def counted(params, **kwargs):
+        calls.append(params["N"])
+        return plan_point(params, **kwargs)
+    monkeypatch.setattr(helper, "plan_point", counted)
+    return calls
+
+
+def test_process_runs_plans_each_point_once(tmp_path, monkeypatch):
+    calls = count_plans(monkeypatch)
+    points = [tfim(4, h) for h in (0.1, 0.2, 0.3)]
+    process_runs(points, str(tmp_path / "plan.db"), planner=True, dense_batch=2)
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("dense_batch", [1, 2])
+def test_stream_runs_logs_every_plan(tmp_path, monkeypatch, capsys, dense_batch):
+    calls = count_plans(monkeypatch)
+    points = [tfim(4, h) for h in (0.1, 0.2, 0.3)]
+    runs = list(stream_runs(iter(points), str(tmp_path / "plan.db"), planner=True,
+                            dense_batch=dense_batch))
+    assert len(runs) == 3 and len(calls) == 3
+    assert capsys.readouterr().out.count("Planned point") == 3
@@ -0,0 +1,36 @@
+import numpy as np
+
+from db.database import SpectrumDatabase
+from utils.helper import process_runs
+
+
+def tfim(N, h):
+    return {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+
+
+POINTS = [tfim(4, h) for h in (0.2, 0.5, 0.8, 1.1)]
+
+
+def n_runs(path):
+    return SpectrumDatabase(path).conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+def test_process_runs_resume_skips_done_points(tmp_path, capsys):
+    path = str(tmp_path / "s.db")
+    process_runs(POINTS[:2], path)
+    process_runs(POINTS, path)
+    assert n_runs(path) == len(POINTS)
+    assert capsys.readouterr().out.count("already computed") == 2
+    assert SpectrumDatabase(path).status_counts() == {"done": len(POINTS)}
+
+
+def test_resume_replaces_partial_results(tmp_path):
+    path = str(tmp_path / "s.db")
+    db = SpectrumDatabase(path)
+    # a point left running by an interrupted sweep, with a stale run stored
+    db.add_run(np.zeros(3), None, POINTS[0])
+    db.set_status(POINTS[0], "running")
+    process_runs(POINTS[:1], path)
+    db = SpectrumDatabase(path)
+    (run_id,) = db.get_run_param(POINTS[0])
+    assert len(db.get_eigvals(run_id)) == 16
@@ -0,0 +1,32 @@
+import numpy as np
+
+from core.spin import DEFAULT_MAX_BYTES, PauliFactory
+
+N = 6
+
+
+def test_pauli_factory_caches_one_form_per_lookup():
+    factory = PauliFactory(N)
+    factory.get("X", 0)
+    assert factory.stats()["misses"] == 1
+    assert factory.stats()["entries"] == 1
+    factory.get("X", 0)
+    assert factory.stats()["hits"] == 1
+    op = factory.get("X", 0)
+    assert factory.stats()["bytes"] == op.data.nbytes + op.indices.nbytes + op.indptr.nbytes
+
+
+def test_builders_keep_the_factory_within_its_budget():
+    from utils.helper import make_spin_builder
+
+    params = {"N": 8, "JXX": np.eye(8, k=1), "JZZ": np.eye(8, k=1), "hZ": 0.3 * np.ones(8)}
+    budget = 20_000
+    builder = make_spin_builder(params, backend="kron", max_bytes=budget)
+    H = builder.build()
+    stats = builder.factory.stats()
+    assert 0 < stats["bytes"] <= budget and stats["evictions"] > 0
+    assert abs(H - make_spin_builder(params).build()).max() < 1e-12
+
+
+def test_default_budget():
+    assert PauliFactory(N).max_bytes == DEFAULT_MAX_BYTES
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from builders.hambuilder import SpinBosonModelBuilder
+from core.boson import BosonMode
+from core.spin import PauliFactory
+
+
+def two_mode_model(backend):
+    b = SpinBosonModelBuilder(PauliFactory(3), [BosonMode(2), BosonMode(3)], backend)
+    b.add_spin_field("Z", np.array([0.3, 0.5, 0.7])).add_spin_coupling("XX", np.eye(3, k=1))
+    b.add_boson_term("n", 1.0).add_boson_term("x", 0.4, mode=1)
+    b.add_spin_boson("x", "Z", 0.2).add_spin_boson("a", "+", np.array([0.1, 0.2, 0.3]), mode=1)
+    return b
+
+
+@pytest.mark.parametrize("backend", ["bitops", "cached"])
+def test_multi_mode_backends_agree(backend):
+    ref = two_mode_model("kron").build()
+    assert ref.shape == (3 * 4 * 2**3,) * 2
+    assert abs(two_mode_model(backend).build() - ref).max() < 1e-12
@@ -0,0 +1,59 @@
+import numpy as np
+
+from db.database import SpectrumDatabase
+from utils.helper import stream_runs
+
+
+def tfim(N, h):
+    return {"N": N, "JXX": np.eye(N, k=1), "hZ": h * np.ones(N)}
+
+
+POINTS = [tfim(4, h) for h in (0.2, 0.5, 0.8, 1.1)]
+
+
+def n_runs(path):
+    return SpectrumDatabase(path).conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+def test_stream_runs_resumes_after_early_stop(tmp_path):
+    path = str(tmp_path / "s.db")
+    stream = stream_runs(iter(POINTS), path)
+    first = next(stream)
+    stream.close()
+    rest = list(stream_runs(iter(POINTS), path))
+    assert len(rest) == len(POINTS) - 1
+    assert first[0] not in [run_id for run_id, *_ in rest]
+    assert n_runs(path) == len(POINTS)
+
+
+def test_stream_runs_stores_observables(tmp_path):
+    path = str(tmp_path / "s.db")
+    runs = list(stream_runs(iter(POINTS), path, observables=["gap"], store_eigvecs=False,
+                            dense_batch=2))
+    db = SpectrumDatabase(path)
+    for run_id, params, eigvals, _ in runs:
+        assert db.get_eigvecs(run_id) is None
+        assert np.isclose(db.get_observables(run_id)["gap"], eigvals[1] - eigvals[0])
+
+
+def test_both_sweeps_share_the_failure_handling(tmp_path):
+    from utils.helper import process_runs
+
+    bad = {"N": 4, "JXX": np.eye(3)}   # wrong shape, fails in the worker
+    points = [POINTS[0], bad, POINTS[1]]
+    failures = process_runs(points, str(tmp_path / "p.db"), workers=2)
+    assert [(index, params["N"]) for index, params, _ in failures] == [(1, 4)]
+    runs = list(stream_runs(iter(points), str(tmp_path / "s.db"), workers=2))
+    assert len(runs) == 2
+    for path in ("p.db", "s.db"):
+        db = SpectrumDatabase(str(tmp_path / path))
+        assert db.get_status(bad) == "failed"
+        assert db.status_counts() == {"done": 2, "failed": 1}
+
+
+def test_process_runs_with_background_writer(tmp_path):
+    from utils.helper import process_runs
+
+    path = str(tmp_path / "b.db")
+    process_runs(POINTS, path, background_writer=True, dense_batch=2, flush_size=3)
+    assert n_runs(path) == len(POINTS)
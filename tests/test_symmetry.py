@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from utils.helper import diagonalize_point, make_spin_builder
+
+N = 6
+RING = np.eye(N, k=1) + np.eye(N, k=N - 1)
+
+
+def full_spectrum(params):
+    return np.linalg.eigvalsh(make_spin_builder(params).build().toarray())
+
+
+@pytest.mark.parametrize("params, symmetries", [
+    ({"N": N, "JXX": RING, "JYY": RING, "JZZ": 0.6 * RING}, "auto"),
+    ({"N": N, "JXX": RING, "JYY": RING, "hZ": 0.3 * np.ones(N)}, ["U1"]),
+    ({"N": N, "JZZ": RING, "hX": 0.7 * np.ones(N)}, ["Z2", "T"]),
+    ({"N": N, "JXX": RING, "JYY": RING, "JZZ": 0.6 * RING}, ["U1", "Z2", "T"]),
+])
+def test_sector_spectra_cover_the_full_spectrum(params, symmetries):
+    spectra = diagonalize_point(params, symmetries=symmetries)
+    assert len(spectra) > 1
+    union = np.sort(np.concatenate([spec["eigvals"] for spec in spectra]))
+    np.testing.assert_allclose(union, full_spectrum(params), atol=1e-10)
+
+
+def test_detected_symmetries():
+    assert make_spin_builder({"N": N, "JXX": RING, "JYY": RING}).symmetries() \
+        == {"U1", "Z2", "T"}
+    assert "U1" not in make_spin_builder({"N": N, "JZZ": RING, "hX": np.ones(N)}).symmetries()
+
+
+@pytest.mark.parametrize("symmetries", [["U1"], ["U1", "T"]])
+def test_complex_hopping_sectors(symmetries):
+    # σ+_i σ-_{i+1} e^{iφ} + h.c. around the ring, complex through its coefficients only
+    phase = np.exp(0.9j)
+    Jpm = phase * np.eye(N, k=1) + phase.conjugate() * np.eye(N, k=N - 1)
+    builder = make_spin_builder({"N": N, "hZ": 0.3 * np.ones(N)}, backend="kron")
+    builder.add_spin_coupling("+-", Jpm).add_spin_coupling("-+", Jpm.conj())
+    full = np.linalg.eigvalsh(builder.build().toarray())
+    blocks = [builder.build_sector(sector).toarray() for sector in builder.sectors(symmetries)]
+    union = np.sort(np.concatenate([np.linalg.eigvalsh(B) for B in blocks if len(B)]))
+    np.testing.assert_allclose(union, full, atol=1e-10)
@@ -0,0 +1,20 @@
+import os
+
+import numpy as np
+
+from db.database import SpectrumDatabase
+
+
+def test_vector_store_round_trip(tmp_path):
+    eigvecs = np.random.default_rng(0).normal(size=(16, 4))
+    path, vector_dir = str(tmp_path / "v.db"), str(tmp_path / "vectors")
+    db = SpectrumDatabase(path, vector_dir=vector_dir)
+    run_id = db.add_run(np.arange(4.0), eigvecs, {"N": 4})
+    assert len(os.listdir(vector_dir)) == 1
+    reader = SpectrumDatabase(path)
+    np.testing.assert_array_equal(reader.get_eigvecs(run_id), eigvecs)
+    np.testing.assert_array_equal(reader.get_eigvecs(run_id, indices=0), eigvecs[:, 0])
+    np.testing.assert_array_equal(reader.get_eigvecs(run_id, indices=[1, 3], rows=slice(2, 5)),
+                                  eigvecs[2:5][:, [1, 3]])
+    db.delete_runs({"N": 4})
+    assert os.listdir(vector_dir) == []
@@ -0,0 +1,33 @@
+import sqlite3
+from functools import partial
+
+import numpy as np
+import pytest
+
+from db import writer as writer_module
+from db.database import SpectrumDatabase
+from db.writer import BackgroundWriter
+
+
+def test_writer_commits_and_closes_its_connection(tmp_path, monkeypatch):
+    opened = []
+
+    class Tracked(SpectrumDatabase):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            opened.append(self)
+    monkeypatch.setattr(writer_module, "SpectrumDatabase", Tracked)
+    # usable from this thread, so that only a closed connection raises below
+    monkeypatch.setattr(sqlite3, "connect", partial(sqlite3.connect, check_same_thread=False))
+
+    path = str(tmp_path / "w.db")
+    writer = BackgroundWriter(path, flush_size=10)
+    run_ids = []
+    writer.submit("add_run", np.arange(3.0), None, {"N": 2}, callback=run_ids.append)
+    writer.close()
+
+    assert len(opened) == 1
+    with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+        opened[0].conn.execute("SELECT 1")
+    np.testing.assert_array_equal(SpectrumDatabase(path).get_eigvals(run_ids[0]),
+                                  np.arange(3.0))